@@ -1,20 +1,117 @@
+import sys
+import json
+from typing import Any, Dict, Optional
+
 import typer
 from rich import print
 
-from packages.agents.coordinator import Coordinator
+from packages.tracing import trace
 
+# Commands import asyncio and the agents and clients they use inside their
+# bodies, so `--help` and light commands don't pay for the pipeline's imports.
 app = typer.Typer(no_args_is_help=True)
 
 
+def _start_profile(profile: bool, trace_file: Optional[str]) -> Optional[trace.Tracer]:
+    return trace.enable() if profile or trace_file else None
+
+
+def _check_bound(bound: bool, scan: int, top: int) -> None:
+    # Without a scan every search hit is in the result, so there's nothing to skip
+    if bound and scan <= top:
+        raise typer.BadParameter("needs --scan larger than --top", param_hint="--bound")
+
+
+def _finish_profile(
+    tracer: Optional[trace.Tracer],
+    profile: bool,
+    trace_file: Optional[str],
+    stderr: bool = False,
+    saved: Optional[Dict[str, int]] = None,
+    limits: Optional[Dict[str, Dict[str, float]]] = None,
+) -> None:
+    if tracer is None:
+        return
+    trace.disable()
+    if trace_file:
+        tracer.dump(trace_file)
+    if not profile:
+        return
+
+    from rich.console import Console
+    from rich.table import Table
+
+    # Concurrent spans overlap, so totals can add up to more than the wall time
+    table = Table(title="Profile", show_lines=False)
+    for column in ("kind", "name", "count", "total s", "max s", "cache", "status", "min remaining"):
+        table.add_column(
+            column,
+            justify="left" if column in ("kind", "name", "cache", "status") else "right",
+            overflow="fold",
+        )
+    for kind in ("run", "agent", "llm", "github", "http"):
+        rows = tracer.summary().get(kind, {})
+        for name, row in sorted(rows.items(), key=lambda kv: -kv[1]["total_s"]):
+            table.add_row(
+                kind,
+                name,
+                str(row["count"]),
+                f"{row['total_s']:.3f}",
+                f"{row['max_s']:.3f}",
+                " ".join(f"{k}:{v}" for k, v in sorted(row["cache"].items())),
+                " ".join(f"{k}:{v}" for k, v in sorted(row["status"].items())),
+                str(row.get("min_ratelimit_remaining", "")),
+            )
+    if saved:
+        table.caption = f"GitHub requests saved: {saved['memo']} memoized, {saved['joined']} joined in flight"
+    console = Console(stderr=stderr)
+    console.print(table)
+
+    if limits:
+        # Per rate-limit resource, as the scheduler saw it (RateLimitScheduler.summary)
+        table = Table(title="Rate limits", show_lines=False)
+        table.add_column("resource")
+        for column in ("requests", "retries", "throttled s", "remaining"):
+            table.add_column(column, justify="right")
+        for name, row in sorted(limits.items()):
+            remaining = int(row["remaining"])
+            table.add_row(
+                name,
+                str(int(row["requests"])),
+                str(int(row["retries"])),
+                f"{row['throttled_seconds']:.3f}",
+                str(remaining) if remaining >= 0 else "",
+            )
+        console.print(table)
+
+
 @app.command()
 def search(
     q: str = typer.Option(..., "--q", help="GitHub search query"),
     top: int = typer.Option(10, "--top", min=1, max=50, help="Number of repos to return"),
+    scan: int = typer.Option(0, "--scan", min=0, max=100000, help="Stream and rank this many search results (past 1000 by star slices)"),
+    bound: bool = typer.Option(False, "--bound", help="With --scan, refresh only the hits that could still make the top results"),
+    concurrency: int = typer.Option(8, "--concurrency", min=1, max=64, help="Max GitHub requests in flight"),
+    offline: bool = typer.Option(False, "--offline", help="Rank repos from the local corpus (see `crawl`) without network"),
+    profile: bool = typer.Option(False, "--profile", help="Print a per-agent / per-endpoint time breakdown"),
+    trace_file: Optional[str] = typer.Option(None, "--trace-file", help="Write a Chrome trace-event JSON file"),
 ) -> None:
-    coord = Coordinator()
-    result = coord.run(query=q, top_n=top, analyze_n=0)
+    _check_bound(bound, scan, top)
+    tracer = _start_profile(profile, trace_file)
+    if offline:
+        from packages.corpus.store import Corpus
 
-    for i, c in enumerate(result["top"], start=1):
+        try:
+            top_repos = [c.model_dump() for c in Corpus().search(q, top_n=top)]
+        except ValueError as err:
+            raise typer.BadParameter(str(err), param_hint="--q")
+    else:
+        from packages.agents.coordinator import Coordinator
+
+        coord = Coordinator(concurrency=concurrency, rank="bound" if bound else "full")
+        top_repos = coord.run(query=q, top_n=top, analyze_n=0, scan=scan)["top"]
+
+    for i, c in enumerate(top_repos, start=1):
         repo = c["repo"]
         score = c["score"]
         reasons = ", ".join(c["reasons"][:3])
@@ -22,71 +119,217 @@ def search(
         if reasons:
             print(f"   {reasons}")
 
+    _finish_profile(
+        tracer,
+        profile,
+        trace_file,
+        saved=None if offline else coord.gh.saved,
+        limits=None if offline else coord.gh.scheduler.summary(),
+    )
+
+
+@app.command()
+def crawl(
+    q: str = typer.Option(..., "--q", help="GitHub search query"),
+    max_results: int = typer.Option(1000, "--max", min=1, max=100000, help="Search results to crawl (past 1000 by star slices)"),
+    concurrency: int = typer.Option(8, "--concurrency", min=1, max=64, help="Max GitHub requests in flight"),
+) -> None:
+    """Store search results in the local corpus; repos unchanged since the last crawl are not re-fetched."""
+    import asyncio
+
+    from packages.agents.crawler import CorpusCrawler
+    from packages.corpus.store import Corpus
+    from packages.github_client.client import GitHubClient
+
+    # The corpus is the cache here: always ask GitHub for current listings
+    gh = GitHubClient(concurrency=concurrency, use_cache=False)
+    corpus = Corpus()
+
+    async def go():
+        try:
+            return await CorpusCrawler(gh, corpus).crawl(q, max_results=max_results)
+        finally:
+            await gh.aclose()
+
+    stats = asyncio.run(go())
+    print(
+        f"Crawled {stats.seen} repos: {stats.added} new, {stats.refreshed} refreshed, "
+        f"{stats.unchanged} unchanged ({len(corpus)} in corpus)"
+    )
+
 
 @app.command()
 def run(
     q: str = typer.Option(..., "--q", help="GitHub search query"),
     top: int = typer.Option(10, "--top", min=1, max=50, help="Number of repos to consider"),
+    scan: int = typer.Option(0, "--scan", min=0, max=100000, help="Stream and rank this many search results (past 1000 by star slices)"),
+    bound: bool = typer.Option(False, "--bound", help="With --scan, refresh only the hits that could still make the top results"),
     analyze: int = typer.Option(3, "--analyze", min=0, max=10, help="Number of top repos to analyze"),
+    concurrency: int = typer.Option(8, "--concurrency", min=1, max=64, help="Max GitHub requests in flight"),
+    archive: bool = typer.Option(False, "--archive", help="Download one tarball per analyzed repo instead of per-file API calls"),
+    fresh: bool = typer.Option(False, "--fresh", help="Recompute every analysis instead of reusing results for unchanged repos"),
+    workers: int = typer.Option(0, "--workers", min=0, max=64, help="Analyze repos in this many worker processes"),
+    queue: Optional[str] = typer.Option(None, "--queue", help="Queue directory shared with `scout worker` processes, here or on other machines"),
+    profile: bool = typer.Option(False, "--profile", help="Print a per-agent / per-endpoint time breakdown"),
+    trace_file: Optional[str] = typer.Option(None, "--trace-file", help="Write a Chrome trace-event JSON file"),
+    jsonl: bool = typer.Option(False, "--jsonl", help="Stream results to stdout as JSON lines"),
 ) -> None:
-    coord = Coordinator()
-    result = coord.run(query=q, top_n=top, analyze_n=analyze)
+    import asyncio
+
+    from packages.agents.coordinator import Coordinator
 
-    print(f"[bold]Query:[/bold] {result['query']}\n")
+    _check_bound(bound, scan, top)
+    tracer = _start_profile(profile, trace_file)
+    coord = Coordinator(
+        concurrency=concurrency,
+        archive=archive,
+        incremental=not fresh,
+        workers=workers,
+        queue_dir=queue,
+        rank="bound" if bound else "full",
+    )
+
+    async def go() -> None:
+        # Each repo's block is printed as soon as its analysis completes
+        async for event in coord.stream(query=q, top_n=top, analyze_n=analyze, scan=scan):
+            if jsonl:
+                sys.stdout.write(json.dumps(event) + "\n")
+                sys.stdout.flush()
+            elif event["type"] == "ranking":
+                _print_ranking(event)
+                if analyze:
+                    print("\n[bold]Analysis:[/bold]")
+            else:
+                _print_analysis(event["result"])
+
+    asyncio.run(go())
+    _finish_profile(
+        tracer,
+        profile,
+        trace_file,
+        stderr=jsonl,
+        saved=coord.gh.saved,
+        limits=coord.gh.scheduler.summary(),
+    )
+
+
+def _print_ranking(event: Dict[str, Any]) -> None:
+    print(f"[bold]Query:[/bold] {event['query']}\n")
 
     print("[bold]Top Repos:[/bold]")
-    for i, c in enumerate(result["top"], start=1):
+    for i, c in enumerate(event["top"], start=1):
         repo = c["repo"]
         print(f"{i}. {repo['full_name']} ({c['score']}) - {repo['url']}")
 
-    if analyze == 0:
-        return
 
-    print("\n[bold]Analysis:[/bold]")
-    for block in result["analyzed"]:
-        repo = block["repo"]["repo"]
-        print(f"\n[bold]{repo['full_name']}[/bold] - {repo['url']}")
-
-        analysis = block["analysis"]
-        if analysis.get("summary"):
-            print(f"  [bold]Summary:[/bold] {analysis['summary']}")
-        if analysis.get("how_to_run"):
-            print("  [bold]How to run:[/bold]")
-            print(f"{analysis['how_to_run'][:800]}")
-
-        stack = block["stack"]
-        if stack.get("languages"):
-            langs = ", ".join([f"{k}" for k in stack["languages"].keys()])
-            print(f"  [bold]Languages:[/bold] {langs}")
-        if stack.get("frameworks"):
-            print(f"  [bold]Frameworks:[/bold] {', '.join(stack['frameworks'])}")
-        if stack.get("tools"):
-            print(f"  [bold]Tools:[/bold] {', '.join(stack['tools'])}")
-        if stack.get("infra_signals"):
-            print(f"  [bold]Infra:[/bold] {', '.join(stack['infra_signals'])}")
-
-        contrib = block["contrib"]
-        issues = contrib.get("issues", [])
-        print("  [bold]Contribution issues:[/bold]")
-        if not issues:
-            print("    None found (try browsing open issues manually).")
-        else:
-            for it in issues[:5]:
-                print(f"    - {it['title']} ({it['url']})")
-
-        improve = block["improve"]
-        quick_wins = improve.get("quick_wins", [])
-        evidence = improve.get("evidence", [])
-
-        if quick_wins:
-            print("  [bold]Quick wins:[/bold]")
-            for s in quick_wins[:5]:
-                print(f"    - {s}")
-
-        if evidence:
-            print("  [bold]Evidence:[/bold]")
-            for e in evidence[:8]:
-                print(f"    - {e}")
+def _print_analysis(block: Dict[str, Any]) -> None:
+    repo = block["repo"]["repo"]
+    print(f"\n[bold]#{block['rank']} {repo['full_name']}[/bold] - {repo['url']}")
+
+    analysis = block["analysis"]
+    if analysis.get("summary"):
+        print(f"  [bold]Summary:[/bold] {analysis['summary']}")
+    if analysis.get("how_to_run"):
+        print("  [bold]How to run:[/bold]")
+        print(f"{analysis['how_to_run'][:800]}")
+
+    stack = block["stack"]
+    if stack.get("languages"):
+        langs = ", ".join([f"{k}" for k in stack["languages"].keys()])
+        print(f"  [bold]Languages:[/bold] {langs}")
+    if stack.get("frameworks"):
+        print(f"  [bold]Frameworks:[/bold] {', '.join(stack['frameworks'])}")
+    if stack.get("tools"):
+        print(f"  [bold]Tools:[/bold] {', '.join(stack['tools'])}")
+    if stack.get("infra_signals"):
+        print(f"  [bold]Infra:[/bold] {', '.join(stack['infra_signals'])}")
+
+    contrib = block["contrib"]
+    issues = contrib.get("issues", [])
+    print("  [bold]Contribution issues:[/bold]")
+    if not issues:
+        print("    None found (try browsing open issues manually).")
+    else:
+        for it in issues[:5]:
+            print(f"    - {it['title']} ({it['url']})")
+
+    improve = block["improve"]
+    quick_wins = improve.get("quick_wins", [])
+    evidence = improve.get("evidence", [])
+
+    if quick_wins:
+        print("  [bold]Quick wins:[/bold]")
+        for s in quick_wins[:5]:
+            print(f"    - {s}")
+
+    if evidence:
+        print("  [bold]Evidence:[/bold]")
+        for e in evidence[:8]:
+            print(f"    - {e}")
+
+
+@app.command()
+def batch(
+    file: str = typer.Option(..., "--file", help="Queries, one per line (blank lines and # comments ignored)"),
+    out: Optional[str] = typer.Option(None, "--out", help="Write JSONL here instead of stdout"),
+    top: int = typer.Option(10, "--top", min=1, max=50, help="Number of repos to rank per query"),
+    scan: int = typer.Option(0, "--scan", min=0, max=100000, help="Stream and rank this many search results per query"),
+    bound: bool = typer.Option(False, "--bound", help="With --scan, refresh only the hits that could still make the top results"),
+    analyze: int = typer.Option(3, "--analyze", min=0, max=10, help="Number of top repos to analyze per query"),
+    concurrency: int = typer.Option(8, "--concurrency", min=1, max=64, help="Max GitHub requests in flight"),
+    archive: bool = typer.Option(False, "--archive", help="Download one tarball per analyzed repo instead of per-file API calls"),
+    fresh: bool = typer.Option(False, "--fresh", help="Recompute every analysis instead of reusing results for unchanged repos"),
+    workers: int = typer.Option(0, "--workers", min=0, max=64, help="Analyze repos in this many worker processes"),
+    queue: Optional[str] = typer.Option(None, "--queue", help="Queue directory shared with `scout worker` processes, here or on other machines"),
+    llm_batch: bool = typer.Option(False, "--llm-batch", help="Summarize READMEs in one OpenAI Batch job (cheaper; can take hours)"),
+) -> None:
+    """Run many queries at once; a repo picked by several queries is analyzed once."""
+    _check_bound(bound, scan, top)
+    with open(file, encoding="utf-8") as f:
+        queries = [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+    import asyncio
+
+    from packages.agents.coordinator import Coordinator
+
+    coord = Coordinator(
+        concurrency=concurrency,
+        archive=archive,
+        incremental=not fresh,
+        workers=workers,
+        queue_dir=queue,
+        rank="bound" if bound else "full",
+        llm_batch=llm_batch,
+    )
+    sink = open(out, "w", encoding="utf-8") if out else sys.stdout
+
+    async def go() -> None:
+        async for record in coord.stream_batch(queries, top_n=top, analyze_n=analyze, scan=scan):
+            sink.write(json.dumps(record) + "\n")
+            sink.flush()
+
+    try:
+        asyncio.run(go())
+    finally:
+        if out:
+            sink.close()
+
+
+@app.command()
+def worker(
+    queue: str = typer.Option(..., "--queue", help="Queue directory to take analysis jobs from"),
+    jobs: int = typer.Option(4, "--jobs", min=1, max=64, help="Repos analyzed at once"),
+    concurrency: int = typer.Option(8, "--concurrency", min=1, max=64, help="Max GitHub requests in flight"),
+    archive: bool = typer.Option(False, "--archive", help="Download one tarball per analyzed repo instead of per-file API calls"),
+    fresh: bool = typer.Option(False, "--fresh", help="Recompute every analysis instead of reusing results for unchanged repos"),
+) -> None:
+    """Analyze repos queued by `run`/`batch --queue` until the queue is closed and drained (or Ctrl-C)."""
+    import asyncio
+
+    from packages.workers.pool import serve
+
+    handled = asyncio.run(serve(queue, jobs=jobs, concurrency=concurrency, archive=archive, incremental=not fresh))
+    print(f"Handled {handled} jobs")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,195 @@
+"""
+Deterministic synthetic fixtures in the recorded format, so the suite runs
+without a recording. Shapes and sizes follow real API responses: search
+hits, repo objects, READMEs with install/usage sections, recursive trees
+of a few hundred entries, manifests and labelled issue lists.
+"""
+from __future__ import annotations
+
+import json
+import random
+import hashlib
+from typing import Dict, Iterable, List
+from urllib.parse import urlencode
+
+from benchmarks.replay import Fixtures
+from packages.agents.contrib import LABEL_SETS, _labels, issue_query, pack_queries
+from packages.github_client.client import SEARCH_PAGE_SIZE, repo_stats_from_json
+from packages.scoring.rank import score_repo
+
+DEFAULT_QUERY = "topic:cli language:python"
+# Repo counts the contrib agent batches issue searches for (agents and pipeline cases)
+ISSUE_BATCHES = (1, 3, 5, 10)
+
+_STACKS = [
+    {
+        "language": "Python",
+        "manifests": {
+            "requirements.txt": "fastapi>=0.110\nuvicorn\npydantic\npytest\n",
+            "pyproject.toml": '[project]\nname = "x"\ndependencies = ["django>=5", "ruff"]\n',
+        },
+    },
+    {
+        "language": "TypeScript",
+        "manifests": {
+            "package.json": json.dumps(
+                {"dependencies": {"react": "^18", "next": "^14", "express": "^4"}, "devDependencies": {"eslint": "^8", "jest": "^29"}}
+            ),
+        },
+    },
+    {
+        "language": "Java",
+        "manifests": {
+            "pom.xml": "<project><dependencies><dependency><artifactId>spring-boot-starter</artifactId>"
+            "</dependency></dependencies></project>",
+        },
+    },
+]
+
+
+def _sha(*parts: object) -> str:
+    return hashlib.sha1("/".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+
+def _key(path: str, params: Dict[str, object] | None = None) -> str:
+    query = urlencode(sorted((k, str(v)) for k, v in (params or {}).items()))
+    return f"GET {path}?{query}"
+
+
+def _json(fixtures: Fixtures, path: str, payload: object, params: Dict[str, object] | None = None) -> None:
+    body = json.dumps(payload)
+    headers = {"content-type": "application/json; charset=utf-8", "etag": f'W/"{_sha(body)}"'}
+    fixtures.add(_key(path, params), 200, body, headers)
+
+
+def _raw(fixtures: Fixtures, path: str, text: str) -> None:
+    # File contents as the client asks for them: the raw media type
+    headers = {"content-type": "application/vnd.github.raw+json; charset=utf-8", "etag": f'"{_sha(text)}"'}
+    fixtures.add(_key(path) + " raw", 200, text, headers)
+
+
+def _issue_search(fixtures: Fixtures, names: List[str], issues: Dict[str, List[Dict]]) -> None:
+    # Hits across the repos, newest first, paged like the search API
+    items = sorted((it for name in names for it in issues[name]), key=lambda it: it["created_at"], reverse=True)
+    params: Dict[str, object] = {"q": issue_query(names, _labels()), "sort": "created", "order": "desc", "per_page": 100}
+    pages = [items[i:i + 100] for i in range(0, len(items), 100)] or [[]]
+    for n, page in enumerate(pages, start=1):
+        page_params = params if n == 1 else {**params, "page": n}
+        body = json.dumps({"total_count": len(items), "incomplete_results": False, "items": page})
+        headers = {"content-type": "application/json; charset=utf-8"}
+        if n < len(pages):
+            nxt = urlencode(sorted((k, str(v)) for k, v in {**params, "page": n + 1}.items()))
+            headers["link"] = f'<https://api.github.com/search/issues?{nxt}>; rel="next"'
+        fixtures.add(_key("/search/issues", page_params), 200, body, headers)
+
+
+def _readme(rng: random.Random, name: str) -> str:
+    filler = " ".join(rng.choice(["fast", "simple", "tool", "library", "data", "command", "line", "api"]) for _ in range(400))
+    return (
+        f"# {name}\n\n"
+        "[![build](https://img.shields.io/badge/build-passing-green)](https://ci)\n\n"
+        f"{name} is a {filler[:200]}.\n\n"
+        "## Installation\n\n```bash\npip install " + name + "\n# not a heading\n```\n\n"
+        "## Usage\n\n```bash\n" + name + " --help\n```\n\n"
+        "## Details\n\n" + filler + "\n\n## License\n\nMIT\n"
+    )
+
+
+def _tree(rng: random.Random, manifests: Iterable[str], size: int) -> List[str]:
+    paths = ["README.md", "LICENSE", "CONTRIBUTING.md", "Dockerfile", ".github/workflows/ci.yml", "docs/index.md"]
+    paths += list(manifests)
+    for i in range(size):
+        depth = rng.randint(1, 4)
+        parts = [f"d{rng.randint(0, 9)}" for _ in range(depth)]
+        paths.append("src/" + "/".join(parts) + f"/file{i}.{rng.choice(['py', 'ts', 'java', 'md'])}")
+    return paths
+
+
+def synthetic(
+    n_repos: int = 50,
+    query: str = DEFAULT_QUERY,
+    page_sizes: Iterable[int] = (5, 10, 25, 50),
+    tree_size: int = 300,
+    seed: int = 0,
+) -> Fixtures:
+    rng = random.Random(seed)
+    fixtures = Fixtures(meta={"source": "synthetic", "query": query, "repos": n_repos, "seed": seed})
+
+    repos = []
+    issues: Dict[str, List[Dict]] = {}
+    for i in range(n_repos):
+        owner, name = f"owner{i}", f"project{i}"
+        full_name = f"{owner}/{name}"
+        stack = _STACKS[i % len(_STACKS)]
+        repos.append(
+            {
+                "id": i,
+                "name": name,
+                "full_name": full_name,
+                "owner": {"login": owner},
+                "html_url": f"https://github.com/{full_name}",
+                "description": f"Synthetic project {i}" if i % 7 else None,
+                "stargazers_count": int(100_000 / (i + 1)),
+                "forks_count": int(10_000 / (i + 1)),
+                "open_issues_count": rng.randint(0, 900),
+                "pushed_at": f"2026-{rng.randint(1, 10):02d}-{rng.randint(1, 28):02d}T12:00:00Z",
+                "updated_at": "2026-10-01T00:00:00Z",
+                "topics": ["cli", "tools"] if i % 3 else [],
+                "license": {"key": "mit", "name": "MIT License"} if i % 4 else None,
+                "language": stack["language"],
+                "default_branch": "main",
+            }
+        )
+
+    for size in page_sizes:
+        params = {"q": query, "sort": "stars", "order": "desc", "per_page": min(size, 50)}
+        _json(fixtures, "/search/repositories", {"total_count": n_repos, "items": repos[: min(size, 50)]}, params)
+    # Scanning streams full pages of every hit
+    params = {"q": query, "sort": "stars", "order": "desc", "per_page": SEARCH_PAGE_SIZE}
+    _json(fixtures, "/search/repositories", {"total_count": n_repos, "items": repos[:SEARCH_PAGE_SIZE]}, params)
+
+    for i, repo in enumerate(repos):
+        full_name = repo["full_name"]
+        stack = _STACKS[i % len(_STACKS)]
+        commit_sha, tree_sha = _sha(full_name, "commit"), _sha(full_name, "tree")
+
+        _json(fixtures, f"/repos/{full_name}", repo)
+        _json(fixtures, f"/repos/{full_name}/languages", {stack["language"]: rng.randint(10_000, 5_000_000)})
+
+        _raw(fixtures, f"/repos/{full_name}/readme", _readme(rng, repo["name"]))
+
+        issues[full_name] = [
+            {
+                "title": f"{labels[0]} issue {n} in {repo['name']}",
+                "html_url": f"https://github.com/{full_name}/issues/{k * 100 + n}",
+                "repository_url": f"https://api.github.com/repos/{full_name}",
+                "labels": [{"name": label} for label in labels],
+                "created_at": f"2026-09-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00Z",
+                "updated_at": "2026-09-30T00:00:00Z",
+            }
+            for k, labels in enumerate(LABEL_SETS)
+            for n in range(rng.randint(0, 10))
+        ]
+
+        _json(fixtures, f"/repos/{full_name}/git/ref/heads/main", {"ref": "refs/heads/main", "object": {"sha": commit_sha, "type": "commit"}})
+        _json(fixtures, f"/repos/{full_name}/git/commits/{commit_sha}", {"sha": commit_sha, "tree": {"sha": tree_sha}})
+
+        paths = _tree(rng, stack["manifests"], tree_size)
+        tree = [{"path": p, "type": "blob", "sha": _sha(full_name, p), "size": rng.randint(100, 20_000)} for p in paths]
+        dirs = sorted({p.rsplit("/", 1)[0] for p in paths if "/" in p})
+        tree += [{"path": d, "type": "tree", "sha": _sha(full_name, d)} for d in dirs]
+        _json(fixtures, f"/repos/{full_name}/git/trees/{tree_sha}", {"sha": tree_sha, "truncated": False, "tree": tree}, {"recursive": 1})
+
+        for path, text in stack["manifests"].items():
+            _raw(fixtures, f"/repos/{full_name}/contents/{path}", text)
+
+    for repo in repos:
+        _issue_search(fixtures, [repo["full_name"]], issues)
+    # The coordinator batches the issue search for its best-scored picks from each page
+    for size in page_sizes:
+        page = sorted(repos[: min(size, 50)], key=lambda r: -score_repo(repo_stats_from_json(r))[0])
+        for n in ISSUE_BATCHES:
+            for group in pack_queries(sorted((r["full_name"] for r in page[:n]), key=str.lower), _labels()):
+                _issue_search(fixtures, group, issues)
+
+    return fixtures
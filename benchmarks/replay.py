@@ -0,0 +1,127 @@
+"""
+Recorded GitHub responses and the transports that replay or record them.
+
+A fixture file is JSON: {"meta": {...}, "responses": {key: response}}, where
+key is "METHOD /path?sorted-query" and response is {status, headers, body}.
+Requests without a recorded response get a 404, like a probe for a missing
+file would.
+"""
+from __future__ import annotations
+
+import json
+import base64
+import asyncio
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode
+
+import httpx
+
+from packages.tracing.trace import endpoint
+
+# Response headers worth keeping; the rest only adds noise to fixture files
+KEPT_HEADERS = ("content-type", "etag", "last-modified", "link")
+_FRAMING_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+def request_key(request: httpx.Request) -> str:
+    query = urlencode(sorted(parse_qsl(request.url.query.decode("ascii"), keep_blank_values=True)))
+    # raw-media reads of a path get a different body than the JSON envelope
+    raw = " raw" if "raw" in request.headers.get("accept", "") else ""
+    return f"{request.method} {request.url.path}?{query}{raw}"
+
+
+@dataclass
+class TrafficStats:
+    requests: Counter = field(default_factory=Counter)
+    bytes_in: int = 0
+    bytes_out: int = 0
+
+    def add(self, name: str, sent: int, received: int) -> None:
+        self.requests[name] += 1
+        self.bytes_out += sent
+        self.bytes_in += received
+
+    def reset(self) -> None:
+        self.requests.clear()
+        self.bytes_in = self.bytes_out = 0
+
+
+@dataclass
+class Fixtures:
+    responses: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path | str) -> "Fixtures":
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls(responses=data["responses"], meta=data.get("meta", {}))
+
+    def save(self, path: Path | str) -> None:
+        Path(path).write_text(
+            json.dumps({"meta": self.meta, "responses": self.responses}, indent=1, sort_keys=True),
+            encoding="utf-8",
+        )
+
+    def add(self, key: str, status: int, body: bytes | str, headers: Optional[Dict[str, str]] = None) -> None:
+        entry: Dict[str, Any] = {"status": status, "headers": headers or {"content-type": "application/json"}}
+        if isinstance(body, bytes):
+            try:
+                body = body.decode("utf-8")
+            except UnicodeDecodeError:
+                # tarballs and other binary payloads
+                entry["encoding"] = "base64"
+                body = base64.b64encode(body).decode("ascii")
+        entry["body"] = body
+        self.responses[key] = entry
+
+    def body(self, key: str) -> Optional[bytes]:
+        entry = self.responses.get(key)
+        if entry is None:
+            return None
+        if entry.get("encoding") == "base64":
+            return base64.b64decode(entry["body"])
+        return entry["body"].encode("utf-8")
+
+
+def replay_transport(fixtures: Fixtures, stats: TrafficStats, latency: float = 0.0) -> httpx.MockTransport:
+    """Serves recorded responses after `latency` seconds, counting traffic into `stats`."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if latency:
+            await asyncio.sleep(latency)
+        key = request_key(request)
+        recorded = fixtures.responses.get(key)
+        if recorded is None:
+            response = httpx.Response(404, json={"message": "Not Found"})
+        else:
+            response = httpx.Response(recorded["status"], headers=recorded["headers"], content=fixtures.body(key))
+        stats.add(endpoint(request.method, request.url.path), len(request.content), len(response.content))
+        return response
+
+    return httpx.MockTransport(handler)
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Passes requests to the real API and stores every response in `fixtures`."""
+
+    def __init__(self, fixtures: Fixtures, inner: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        self.fixtures = fixtures
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        # Recorded unconditionally, so replays never see a 304
+        for name in ("if-none-match", "if-modified-since"):
+            request.headers.pop(name, None)
+        response = await self.inner.handle_async_request(request)
+        body = await response.aread()
+        headers = {k: v for k, v in response.headers.items() if k.lower() in KEPT_HEADERS}
+        self.fixtures.add(request_key(request), response.status_code, body, headers)
+        # body is already decoded, so drop the transfer framing headers
+        passed = [(k, v) for k, v in response.headers.items() if k.lower() not in _FRAMING_HEADERS]
+        return httpx.Response(response.status_code, headers=passed, content=body, request=request)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
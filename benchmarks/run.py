@@ -0,0 +1,267 @@
+"""
+Benchmarks for the agent pipeline against replayed GitHub/OpenAI traffic.
+
+    python -m benchmarks.run                                # synthetic fixtures
+    python -m benchmarks.run --latency 0.05 --out bench.json
+    python -m benchmarks.run --baseline bench.json          # exit 1 on regression
+    python -m benchmarks.run --record fixtures.json --q "topic:cli"   # real API
+
+Every case starts from an empty cache. Each case reports median wall time
+over --repeat runs, requests per endpoint, bytes sent/received and peak
+Python heap (tracemalloc, measured on a separate run so it doesn't skew
+timings).
+"""
+from __future__ import annotations
+
+import os
+import sys
+import json
+import time
+import atexit
+import shutil
+import asyncio
+import argparse
+import platform
+import statistics
+import tempfile
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Isolate the benchmark cache and replay the anonymous REST path; both are
+# read when the client modules are imported.
+os.environ["SCOUT_CACHE_DIR"] = _CACHE_DIR = tempfile.mkdtemp(prefix="scout-bench-")
+atexit.register(shutil.rmtree, _CACHE_DIR, ignore_errors=True)
+os.environ.pop("GITHUB_TOKEN", None)
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from benchmarks.fixtures import DEFAULT_QUERY, synthetic  # noqa: E402
+from benchmarks.replay import Fixtures, RecordingTransport, TrafficStats, replay_transport  # noqa: E402
+from benchmarks.stub_llm import StubLLM  # noqa: E402
+from packages.agents.analyst import RepoAnalystAgent  # noqa: E402
+from packages.agents.contrib import ContributionAgent  # noqa: E402
+from packages.agents.coordinator import Coordinator  # noqa: E402
+from packages.agents.finder import RepoFinderAgent  # noqa: E402
+from packages.agents.improve import ImprovementAdvisorAgent  # noqa: E402
+from packages.agents.stack import TechStackAgent  # noqa: E402
+from packages.github_client import cache  # noqa: E402
+from packages.github_client.client import GitHubClient  # noqa: E402
+from packages.github_client.ratelimit import AUTHENTICATED_LIMITS, RateLimitScheduler  # noqa: E402
+from packages.llm.client import LLMClient  # noqa: E402
+
+FINDER_SIZES = (5, 10, 25)
+# Search hits the scanning finder cases rank from (the synthetic corpus size)
+FINDER_SCAN = 50
+AGENT_SIZES = (1, 5)
+PIPELINE_SIZES = ((5, 1), (10, 3), (25, 10))
+# A case regresses when its median wall time grows by more than this fraction
+DEFAULT_TOLERANCE = 0.2
+
+
+@dataclass
+class Env:
+    """One benchmark run's clients, wired to the replay transport and LLM stub."""
+
+    gh: GitHubClient
+    llm: LLMClient
+    query: str
+
+
+Case = Callable[[Env], Awaitable[Any]]
+
+
+def _repo_names(fixtures: Fixtures, n: int) -> List[str]:
+    # Agents are benchmarked on the top search hits, as the coordinator would pick them
+    pages = [
+        json.loads(fixtures.body(key) or b"{}").get("items", [])
+        for key in fixtures.responses
+        if key.startswith("GET /search/repositories?")
+    ]
+    items = max(pages, key=len, default=[])
+    return [item["full_name"] for item in items[:n]]
+
+
+def cases(fixtures: Fixtures) -> Dict[str, Case]:
+    out: Dict[str, Case] = {}
+
+    for top in FINDER_SIZES:
+        out[f"finder.find[top={top}]"] = lambda env, top=top: RepoFinderAgent(env.gh).find(env.query, top_n=top)
+    for top in FINDER_SIZES:
+        for rank in ("full", "bound"):
+            out[f"finder.find[top={top},scan={FINDER_SCAN},{rank}]"] = lambda env, top=top, rank=rank: RepoFinderAgent(
+                env.gh
+            ).find(env.query, top_n=top, scan=FINDER_SCAN, rank=rank)
+
+    agents: Dict[str, Callable[[Env, str], Awaitable[Any]]] = {
+        "analyst.analyze": lambda env, name: RepoAnalystAgent(env.gh, env.llm).analyze(name),
+        "stack.detect": lambda env, name: TechStackAgent(env.gh).detect(name),
+        "contrib.find_issues": lambda env, name: ContributionAgent(env.gh).find_issues(name),
+        "improve.suggest": lambda env, name: ImprovementAdvisorAgent(env.gh).suggest(name),
+    }
+    for label, agent in agents.items():
+        for n in AGENT_SIZES:
+            names = _repo_names(fixtures, n)
+
+            async def run_agent(env: Env, agent=agent, names=names) -> Any:
+                return await asyncio.gather(*(agent(env, name) for name in names))
+
+            out[f"{label}[repos={n}]"] = run_agent
+
+    for top, analyze in PIPELINE_SIZES:
+
+        async def pipeline(env: Env, top=top, analyze=analyze) -> Any:
+            coord = Coordinator(gh=env.gh, llm=env.llm, incremental=False)
+            return await coord.arun(query=env.query, top_n=top, analyze_n=analyze)
+
+        out[f"coordinator.run[top={top},analyze={analyze}]"] = pipeline
+
+    return out
+
+
+async def _run_once(case: Case, transport: Any, llm_url: str, query: str) -> None:
+    cache.default_cache().clear()
+    gh = GitHubClient(transport=transport)
+    # Replayed responses carry no rate-limit headers, and the request budget
+    # isn't what's being measured: never throttle locally.
+    gh.scheduler = RateLimitScheduler({name: (10**9, 60.0) for name in AUTHENTICATED_LIMITS})
+    env = Env(gh=gh, llm=LLMClient(base_url=llm_url, use_cache=True), query=query)
+    try:
+        await case(env)
+    finally:
+        await env.gh.aclose()
+
+
+def measure(
+    case: Case,
+    fixtures: Fixtures,
+    query: str,
+    repeat: int,
+    latency: float,
+    llm_latency: float,
+) -> Dict[str, Any]:
+    gh_stats, llm_stats = TrafficStats(), TrafficStats()
+    transport = replay_transport(fixtures, gh_stats, latency=latency)
+    with StubLLM(llm_stats, latency=llm_latency, summaries=fixtures.meta.get("llm")) as llm:
+        walls: List[float] = []
+        for _ in range(repeat):
+            gh_stats.reset()
+            llm_stats.reset()
+            start = time.perf_counter()
+            asyncio.run(_run_once(case, transport, llm.url, query))
+            walls.append(time.perf_counter() - start)
+
+        requests = dict(sorted((gh_stats.requests + llm_stats.requests).items()))
+        bytes_in = gh_stats.bytes_in + llm_stats.bytes_in
+        bytes_out = gh_stats.bytes_out + llm_stats.bytes_out
+
+        tracemalloc.start()
+        try:
+            asyncio.run(_run_once(case, transport, llm.url, query))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "wall_s": statistics.median(walls),
+        "wall_runs": walls,
+        "requests": requests,
+        "requests_total": sum(requests.values()),
+        "bytes_in": bytes_in,
+        "bytes_out": bytes_out,
+        "peak_mem_bytes": peak,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions of `results` against `baseline`: slower wall time, or more requests/bytes."""
+    problems: List[str] = []
+    for name, now in results["cases"].items():
+        before = baseline.get("cases", {}).get(name)
+        if before is None:
+            continue
+        if now["wall_s"] > before["wall_s"] * (1 + tolerance):
+            problems.append(f"{name}: wall {before['wall_s']:.3f}s -> {now['wall_s']:.3f}s")
+        if now["requests_total"] > before["requests_total"]:
+            problems.append(f"{name}: requests {before['requests_total']} -> {now['requests_total']}")
+        if now["bytes_in"] > before["bytes_in"] * (1 + tolerance):
+            problems.append(f"{name}: bytes in {before['bytes_in']} -> {now['bytes_in']}")
+    return problems
+
+
+async def _record(fixtures: Fixtures, query: str) -> None:
+    # One pass over the largest pipeline records everything the cases replay
+    top, analyze = PIPELINE_SIZES[-1]
+    recorder = RecordingTransport(fixtures)
+    gh = GitHubClient(use_cache=False, transport=recorder)
+    try:
+        for size in FINDER_SIZES:
+            await gh.search_repositories(query, top_n=size)
+        coord = Coordinator(gh=gh, incremental=False)
+        await coord.arun(query=query, top_n=top, analyze_n=analyze)
+    finally:
+        await gh.aclose()
+
+
+def _print_table(results: Dict[str, Any]) -> None:
+    print(f"{'case':48} {'wall':>9} {'reqs':>6} {'in KiB':>9} {'peak KiB':>9}")
+    for name, r in results["cases"].items():
+        print(
+            f"{name:48} {r['wall_s'] * 1000:7.1f}ms {r['requests_total']:6d} "
+            f"{r['bytes_in'] / 1024:9.1f} {r['peak_mem_bytes'] / 1024:9.1f}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="Recorded fixture file (default: synthetic)")
+    parser.add_argument("--q", default=None, help="Search query the fixtures were recorded for")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to each GitHub response")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds added to each LLM response")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this")
+    parser.add_argument("--out", help="Write JSON results here")
+    parser.add_argument("--baseline", help="Compare against a previous --out file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--record", metavar="PATH", help="Record fixtures from the live API to PATH and exit")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        query = args.q or DEFAULT_QUERY
+        fixtures = Fixtures(meta={"source": "recorded", "query": query})
+        asyncio.run(_record(fixtures, query))
+        fixtures.save(args.record)
+        print(f"Recorded {len(fixtures.responses)} responses to {args.record}")
+        return 0
+
+    fixtures = Fixtures.load(args.fixtures) if args.fixtures else synthetic()
+    query = args.q or fixtures.meta.get("query", DEFAULT_QUERY)
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "python": platform.python_version(),
+            "fixtures": args.fixtures or "synthetic",
+            "latency": args.latency,
+            "llm_latency": args.llm_latency,
+            "repeat": args.repeat,
+        },
+        "cases": {},
+    }
+    for name, case in cases(fixtures).items():
+        if args.filter in name:
+            results["cases"][name] = measure(case, fixtures, query, args.repeat, args.latency, args.llm_latency)
+
+    _print_table(results)
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        problems = compare(results, json.loads(Path(args.baseline).read_text(encoding="utf-8")), args.tolerance)
+        for p in problems:
+            print(f"REGRESSION {p}")
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+CLI startup benchmark: wall time of fresh `scout` processes.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 20 --out startup.json
+    python -m benchmarks.startup --baseline startup.json   # exit 1 on regression
+
+Each case runs in a new interpreter with an empty cache directory and no
+network access needed. Besides timings, each case reports which of the
+heavy dependencies it ended up importing; `--help` and `search --offline`
+should load none of the analysis stack.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Modules whose presence after a command means it paid for the pipeline
+HEAVY = ("openai", "httpx", "pydantic", "packages.agents.coordinator", "packages.agents.analyst")
+
+CASES: Dict[str, Optional[List[str]]] = {
+    "python": None,  # bare interpreter, the floor for every other case
+    "--help": ["--help"],
+    "search --help": ["search", "--help"],
+    "run --help": ["run", "--help"],
+    "search --offline": ["search", "--offline", "--q", "language:python", "--top", "5"],
+}
+DEFAULT_REPEAT = 10
+DEFAULT_TOLERANCE = 0.2
+
+# Runs the CLI in-process, then reports which heavy modules got imported
+_DRIVER = """
+import sys, json
+try:
+    from apps.cli.main import app
+    app(sys.argv[1:], prog_name="scout", standalone_mode=False)
+finally:
+    sys.stderr.write("\\n" + json.dumps([m for m in {heavy!r} if m in sys.modules]) + "\\n")
+"""
+
+
+def _command(args: Optional[List[str]]) -> List[str]:
+    if args is None:
+        return [sys.executable, "-c", "pass"]
+    return [sys.executable, "-c", _DRIVER.format(heavy=HEAVY), *args]
+
+
+def measure(args: Optional[List[str]], repeat: int, env: Dict[str, str]) -> Dict[str, Any]:
+    walls: List[float] = []
+    loaded: List[str] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run(_command(args), env=env, capture_output=True, text=True)
+        walls.append(time.perf_counter() - start)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{args} exited with {proc.returncode}:\n{proc.stderr}")
+        if args is not None:
+            loaded = json.loads(proc.stderr.strip().splitlines()[-1])
+    return {"wall_s": statistics.median(walls), "min_s": min(walls), "wall_runs": walls, "heavy_imports": loaded}
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    problems: List[str] = []
+    for name, now in results["cases"].items():
+        before = baseline.get("cases", {}).get(name)
+        if before is None:
+            continue
+        if now["wall_s"] > before["wall_s"] * (1 + tolerance):
+            problems.append(f"{name}: wall {before['wall_s']:.3f}s -> {now['wall_s']:.3f}s")
+        added = sorted(set(now["heavy_imports"]) - set(before["heavy_imports"]))
+        if added:
+            problems.append(f"{name}: now imports {', '.join(added)}")
+    return problems
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this")
+    parser.add_argument("--out", help="Write JSON results here")
+    parser.add_argument("--baseline", help="Compare against a previous --out file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    cache_dir = tempfile.mkdtemp(prefix="scout-startup-")
+    env = {**os.environ, "SCOUT_CACHE_DIR": cache_dir, "PYTHONPATH": str(Path(__file__).resolve().parent.parent)}
+    results: Dict[str, Any] = {"meta": {"python": platform.python_version(), "repeat": args.repeat}, "cases": {}}
+    try:
+        for name, cmd in CASES.items():
+            if args.filter in name:
+                results["cases"][name] = measure(cmd, args.repeat, env)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print(f"{'case':24} {'median':>9} {'min':>9}  heavy imports")
+    for name, r in results["cases"].items():
+        print(f"{name:24} {r['wall_s'] * 1000:7.1f}ms {r['min_s'] * 1000:7.1f}ms  {', '.join(r['heavy_imports']) or '-'}")
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        problems = compare(results, json.loads(Path(args.baseline).read_text(encoding="utf-8")), args.tolerance)
+        for p in problems:
+            print(f"REGRESSION {p}")
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
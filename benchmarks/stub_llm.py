@@ -0,0 +1,92 @@
+"""
+Local stand-in for the OpenAI chat completions endpoint.
+
+Runs an HTTP server on a background thread; point LLMClient(base_url=...)
+at `StubLLM.url`. Summaries are canned, or looked up by prompt hash from
+recorded fixtures ({"llm": {sha256(prompt): text}}).
+"""
+from __future__ import annotations
+
+import json
+import time
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from benchmarks.replay import TrafficStats
+
+CANNED_SUMMARY = (
+    "A library for the thing described in its README. It provides the features listed there. "
+    "Best for: developers evaluating the project."
+)
+
+
+class StubLLM:
+    def __init__(
+        self,
+        stats: TrafficStats,
+        latency: float = 0.0,
+        summaries: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.stats = stats
+        self.latency = latency
+        self.summaries = summaries or {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def __enter__(self) -> "StubLLM":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self) -> type:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args: object) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if not self.path.endswith("/chat/completions"):
+                    return self._reply(404, {"error": {"message": "not stubbed"}}, len(data))
+                if stub.latency:
+                    time.sleep(stub.latency)
+                prompt = json.loads(data)["messages"][0]["content"]
+                digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+                content = stub.summaries.get(digest, CANNED_SUMMARY)
+                self._reply(
+                    200,
+                    {
+                        "id": "chatcmpl-stub",
+                        "object": "chat.completion",
+                        "created": 0,
+                        "model": "stub",
+                        "choices": [
+                            {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}
+                        ],
+                    },
+                    len(data),
+                )
+
+            def _reply(self, status: int, payload: dict, received: int) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                with stub._lock:
+                    stub.stats.add(f"POST {self.path.removeprefix('/v1')}", received, len(body))
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
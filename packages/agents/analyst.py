@@ -1,56 +1,59 @@
 from __future__ import annotations
 
-import re
-from typing import Optional
+import hashlib
+from typing import TYPE_CHECKING, Optional
 
+from packages.agents.readme_outline import ReadmeOutline
+from packages.github_client import cache
 from packages.github_client.client import GitHubClient
 from packages.models.schemas import RepoAnalysis
-from packages.llm.client import LLMClient
+from packages.tracing import trace
 
+if TYPE_CHECKING:
+    from packages.llm.client import LLMClient
 
-def _first_nonempty_paragraph(md: str) -> Optional[str]:
-    lines = [ln.strip() for ln in md.splitlines()]
-    cleaned = []
-    for ln in lines:
-        if not ln:
-            cleaned.append("")
-            continue
-        if ln.startswith("![") or ln.startswith("[![") or ln.startswith("<img"):
-            continue
-        cleaned.append(ln)
 
-    text = "\n".join(cleaned).strip()
-    parts = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
-    return parts[0] if parts else None
+OUTLINE_TTL = 30 * 24 * 60 * 60
 
 
-def _extract_section(md: str, names: list[str]) -> Optional[str]:
-    pattern = r"(?im)^(#{1,6})\s*(" + "|".join(map(re.escape, names)) + r")\s*$"
-    m = re.search(pattern, md)
-    if not m:
-        return None
-
-    start = m.end()
-    m2 = re.search(r"(?im)^#{1,6}\s+.+$", md[start:])
-    end = start + (m2.start() if m2 else len(md[start:]))
-    section = md[start:end].strip()
-    return section if section else None
+def _outline(readme: str) -> ReadmeOutline:
+    """Parse the README outline, reusing a cached index for identical text."""
+    key = f"readme-outline:{hashlib.sha256(readme.encode('utf-8')).hexdigest()}"
+    data = cache.get(key)
+    outline = ReadmeOutline.from_dict(readme, data) if data else None
+    if outline is None:
+        outline = ReadmeOutline.parse(readme)
+        cache.set(key, outline.to_dict(), ttl_seconds=OUTLINE_TTL)
+    return outline
 
 
 class RepoAnalystAgent:
-    def __init__(self, gh: GitHubClient) -> None:
+    def __init__(self, gh: GitHubClient, llm: Optional[LLMClient] = None) -> None:
         self.gh = gh
-        self.llm = LLMClient()
+        self._llm = llm
+
+    @property
+    def llm(self) -> LLMClient:
+        # Created on first use: ranking-only runs never need an LLM client
+        if self._llm is None:
+            from packages.llm.client import LLMClient
+
+            self._llm = LLMClient()
+        return self._llm
 
-    def analyze(self, full_name: str) -> RepoAnalysis:
-        readme = self.gh.get_readme(full_name) or ""
+    @trace.traced("analyst")
+    async def analyze(self, full_name: str, readme: Optional[str] = None) -> RepoAnalysis:
+        if readme is None:
+            readme = await self.gh.get_readme(full_name)
+        readme = readme or ""
 
         # LLM-powered grounded summary
-        llm_summary = self.llm.summarize_repo_readme(readme)
+        llm_summary = await self.llm.asummarize_repo_readme(readme)
 
         # Deterministic "how to run"
-        install = _extract_section(readme, ["Installation", "Install", "Setup"])
-        usage = _extract_section(readme, ["Usage", "Quickstart", "Getting Started", "Run"])
+        outline = _outline(readme)
+        install = outline.section(["Installation", "Install", "Setup"])
+        usage = outline.section(["Usage", "Quickstart", "Getting Started", "Run"])
         how_to_run = "\n\n".join(p for p in [install, usage] if p) or None
 
         return RepoAnalysis(
@@ -1,29 +1,175 @@
 from __future__ import annotations
 
-from typing import List
+import asyncio
+import hashlib
+from typing import Dict, List, Optional, Tuple
 
-from packages.github_client.client import GitHubClient
+from packages.github_client.client import SEARCH_PAGE_SIZE, GitHubClient
 from packages.models.schemas import ContributionIssue, ContributionReport
+from packages.tracing import trace
+
+
+LABEL_SETS: List[List[str]] = [
+    ["good first issue"],
+    ["help wanted"],
+    ["documentation"],
+]
+
+# GitHub rejects search queries longer than this
+MAX_QUERY_CHARS = 256
+# Results read per batched query; repos still short after that get their own query
+BATCH_RESULTS = 3 * SEARCH_PAGE_SIZE
+
+
+def _labels() -> List[str]:
+    return list(dict.fromkeys(label for labels in LABEL_SETS for label in labels))
+
+
+def issue_query(full_names: List[str], labels: List[str]) -> str:
+    """Open issues (not PRs) with any of `labels` in any of the repos."""
+    any_label = ",".join(f'"{label}"' if " " in label else label for label in labels)
+    return " ".join(["is:issue", "is:open", f"label:{any_label}", *(f"repo:{name}" for name in full_names)])
+
+
+def pack_queries(full_names: List[str], labels: List[str]) -> List[List[str]]:
+    """Groups repos into as few issue queries as fit MAX_QUERY_CHARS."""
+    groups: List[List[str]] = []
+    for name in full_names:
+        if groups and len(issue_query(groups[-1] + [name], labels)) <= MAX_QUERY_CHARS:
+            groups[-1].append(name)
+        else:
+            groups.append([name])
+    return groups
+
+
+def _repo_of(item: Dict) -> str:
+    # repository_url is https://api.github.com/repos/{owner}/{name}
+    return "/".join(item.get("repository_url", "").rsplit("/", 2)[-2:]).lower()
 
 
 class ContributionAgent:
+    """
+    Finds beginner-friendly issues per LABEL_SETS, in label-set priority.
+
+    Issues come from the issue search API: one query covers every label
+    (OR'd) and as many repos as fit, PRs are excluded by `is:issue`, and
+    hits are mapped back to their repos and label sets. `prefetch` starts
+    that search for all repos a run will look at; `fetch` for a repo that
+    wasn't prefetched, or whose prefetch failed, searches it on its own.
+    """
+
     def __init__(self, gh: GitHubClient) -> None:
         self.gh = gh
+        self._prefetched: Dict[str, Tuple[int, asyncio.Task]] = {}
+
+    async def find_issues(self, full_name: str, top_n: int = 10) -> ContributionReport:
+        results, _ = await self.fetch(full_name, top_n)
+        return self.report(results, top_n)
+
+    def prefetch(self, full_names: List[str], top_n: int = 10) -> Optional[asyncio.Task]:
+        """
+        Starts one batched search for `full_names`; later fetches await it.
+        The caller owns the returned task and calls `forget` once its run ends.
+        """
+        full_names = [n for n in dict.fromkeys(full_names) if n not in self._prefetched]
+        if not full_names:
+            return None
+        task = asyncio.ensure_future(self.fetch_many(full_names, top_n))
+        for name in full_names:
+            self._prefetched[name] = (top_n, task)
+        return task
+
+    def forget(self) -> None:
+        """Drops prefetches nobody fetched, e.g. for repos whose analysis failed early."""
+        self._prefetched.clear()
+
+    @trace.traced("contrib")
+    async def fetch(self, full_name: str, top_n: int = 10) -> Tuple[List[List[Dict]], List[Optional[str]]]:
+        """
+        Issue lists per label set, and a digest of them that changes
+        whenever any listed issue does.
+        """
+        prefetched = self._prefetched.pop(full_name, None)
+        results: Optional[List[List[Dict]]] = None
+        if prefetched is not None and prefetched[0] == top_n:
+            try:
+                results = (await prefetched[1])[full_name]
+            except Exception:
+                # The shared search failed, possibly over another repo; search this one alone
+                results = None
+        if results is None:
+            results = (await self.fetch_many([full_name], top_n))[full_name]
+        digest = hashlib.sha256(
+            "\n".join(f"{it.get('html_url')} {it.get('updated_at')}" for issues in results for it in issues).encode("utf-8")
+        ).hexdigest()
+        return results, [digest]
+
+    async def fetch_many(self, full_names: List[str], top_n: int = 10) -> Dict[str, List[List[Dict]]]:
+        """Issue lists per label set for many repos, newest first, top_n per set."""
+        labels = _labels()
+        out: Dict[str, List[List[Dict]]] = {}
+        short: List[str] = []
+
+        # Sorted, so the same set of repos always makes the same (cacheable) queries
+        groups = pack_queries(sorted(set(full_names), key=str.lower), labels)
+        batches = await asyncio.gather(
+            *(self._search(group, labels, top_n, BATCH_RESULTS) for group in groups),
+            return_exceptions=True,
+        )
+        for group, batch in zip(groups, batches):
+            if isinstance(batch, BaseException):
+                # One bad repo (a 404 or 422) fails the whole query; retry its repos one by one
+                if len(group) == 1:
+                    raise batch
+                short.extend(group)
+                continue
+            found, exhausted = batch
+            for name, results in found.items():
+                if exhausted or all(len(issues) >= top_n for issues in results):
+                    out[name] = results
+                else:
+                    short.append(name)
+
+        # Busy repos crowd the batch; each gets one page of its own. Sets still
+        # short after that stay short rather than paging the search bucket dry.
+        singles = await asyncio.gather(*(self._search([name], labels, top_n, SEARCH_PAGE_SIZE) for name in short))
+        for found, _ in singles:
+            out.update(found)
+        return {name: out[name] for name in full_names}
 
-    def find_issues(self, full_name: str, top_n: int = 10) -> ContributionReport:
-        label_sets: List[List[str]] = [
-            ["good first issue"],
-            ["help wanted"],
-            ["documentation"],
-        ]
+    async def _search(
+        self,
+        full_names: List[str],
+        labels: List[str],
+        top_n: int,
+        max_results: int,
+    ) -> Tuple[Dict[str, List[List[Dict]]], bool]:
+        """Per-repo issue lists from one query, and whether the results ran out."""
+        by_lower = {name.lower(): name for name in full_names}
+        found: Dict[str, List[List[Dict]]] = {name: [[] for _ in LABEL_SETS] for name in full_names}
+        params = {"q": issue_query(full_names, labels), "sort": "created", "order": "desc"}
+        fetched = 0
+        async for item in self.gh.iter_search_pages("/search/issues", params, max_results=max_results):
+            fetched += 1
+            name = by_lower.get(_repo_of(item))
+            if name is None:
+                continue
+            names = {l["name"].lower() for l in item.get("labels", [])}
+            for results, labels_wanted in zip(found[name], LABEL_SETS):
+                if len(results) < top_n and all(l.lower() in names for l in labels_wanted):
+                    results.append(item)
+            if len(full_names) == 1 and all(len(issues) >= top_n for issues in found[name]):
+                return found, True
+        return found, fetched < max_results
 
+    def report(self, results: List[List[Dict]], top_n: int = 10) -> ContributionReport:
         issues_out: List[ContributionIssue] = []
         seen = set()
 
-        for labels in label_sets:
-            issues = self.gh.list_issues(full_name, labels=labels, top_n=top_n)
+        # results keep LABEL_SETS order, so dedupe precedence is unchanged
+        for issues in results:
             for it in issues:
-                # skip PRs (GitHub issues API returns PRs too)
+                # is:issue keeps PRs out of search results; lists from the issues API include them
                 if "pull_request" in it:
                     continue
                 url = it.get("html_url")
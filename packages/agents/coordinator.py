@@ -1,43 +1,368 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import shutil
+import asyncio
+import tarfile
+import tempfile
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from packages.github_client.client import GitHubClient
-from packages.agents.finder import RepoFinderAgent
-from packages.agents.analyst import RepoAnalystAgent
-from packages.agents.stack import TechStackAgent
-from packages.agents.contrib import ContributionAgent
-from packages.agents.improve import ImprovementAdvisorAgent
+import httpx
+
+from packages.github_client.archive import ArchiveTooLarge
+from packages.github_client.client import DEFAULT_CONCURRENCY, GitHubClient
+from packages.github_client.snapshot import RepoHead, RepoSnapshot
+from packages.agents.registry import AgentRegistry
+from packages.agents.results import ResultStore
+from packages.llm.client import PROMPT_VERSION
+from packages.tracing import trace
+from packages.workers.queue import DEFAULT_LEASE, DirQueue
+from packages.models.schemas import (
+    ContributionReport,
+    ImprovementReport,
+    RepoAnalysis,
+    RepoCandidate,
+    TechStackReport,
+)
+
+if TYPE_CHECKING:
+    from packages.agents.analyst import RepoAnalystAgent
+    from packages.agents.contrib import ContributionAgent
+    from packages.agents.finder import RepoFinderAgent
+    from packages.agents.improve import ImprovementAdvisorAgent
+    from packages.agents.stack import TechStackAgent
+    from packages.llm.client import LLMClient
 
 
 class Coordinator:
-    def __init__(self) -> None:
-        gh = GitHubClient()
-        self.finder = RepoFinderAgent(gh)
-        self.analyst = RepoAnalystAgent(gh)
-        self.stack = TechStackAgent(gh)
-        self.contrib = ContributionAgent(gh)
-        self.improve = ImprovementAdvisorAgent(gh)
-
-    def run(self, query: str, top_n: int = 10, analyze_n: int = 3) -> Dict[str, Any]:
-        repos = self.finder.find(query=query, top_n=top_n)
-        analyze_n = min(analyze_n, len(repos))
-
-        analyzed: List[Dict[str, Any]] = []
-        for c in repos[:analyze_n]:
-            full_name = c.repo.full_name
-            analyzed.append(
-                {
-                    "repo": c.model_dump(),
-                    "analysis": self.analyst.analyze(full_name).model_dump(),
-                    "stack": self.stack.detect(full_name).model_dump(),
-                    "contrib": self.contrib.find_issues(full_name).model_dump(),
-                    "improve": self.improve.suggest(full_name).model_dump(),
-                }
-            )
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        archive: bool = False,
+        incremental: bool = True,
+        gh: Optional[GitHubClient] = None,
+        llm: Optional[LLMClient] = None,
+        workers: int = 0,
+        queue_dir: Optional[str] = None,
+        rank: str = "full",
+        llm_batch: bool = False,
+    ) -> None:
+        # One shared client: its semaphore bounds requests in flight across all agents
+        self.gh = gh = gh or GitHubClient(concurrency=concurrency)
+        # Analyze in `workers` local processes and/or via workers on `queue_dir`
+        # (see packages.workers); searching and ranking stay in this process.
+        self.workers = workers
+        self.queue_dir = queue_dir
+        self._worker_options = {"concurrency": concurrency, "archive": archive, "incremental": incremental}
+        if queue_dir:
+            # closed along with the client at the end of each run
+            gh.scheduler.shared = DirQueue(queue_dir).budget(gh.scheduler.limits)
+        # Read analyzed repos from one tarball each instead of the tree + contents APIs
+        self.archive = archive
+        # "bound": when scanning, refresh only the hits that could still make the top
+        self.rank = rank
+        # stream_batch: summarize every picked README in one OpenAI Batch job first
+        self.llm_batch = llm_batch
+        # Reuse stored agent outputs while the tree / README / issue lists are unchanged
+        self.results: Optional[ResultStore] = ResultStore() if incremental else None
+        # Agents are built on first use; a ranking-only run builds just the finder
+        self.agents = AgentRegistry(gh, llm)
+
+    @property
+    def finder(self) -> RepoFinderAgent:
+        return self.agents.get("finder")
+
+    @property
+    def analyst(self) -> RepoAnalystAgent:
+        return self.agents.get("analyst")
+
+    @property
+    def stack(self) -> TechStackAgent:
+        return self.agents.get("stack")
+
+    @property
+    def contrib(self) -> ContributionAgent:
+        return self.agents.get("contrib")
+
+    @property
+    def improve(self) -> ImprovementAdvisorAgent:
+        return self.agents.get("improve")
+
+    def run(self, query: str, top_n: int = 10, analyze_n: int = 3, scan: int = 0) -> Dict[str, Any]:
+        return asyncio.run(self.arun(query=query, top_n=top_n, analyze_n=analyze_n, scan=scan))
+
+    async def arun(self, query: str, top_n: int = 10, analyze_n: int = 3, scan: int = 0) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"query": query, "top": [], "analyzed": []}
+        async for event in self.stream(query=query, top_n=top_n, analyze_n=analyze_n, scan=scan):
+            if event["type"] == "ranking":
+                result["top"] = event["top"]
+            else:
+                result["analyzed"].append(event["result"])
+        result["analyzed"].sort(key=lambda block: block["rank"])
+        return result
+
+    async def stream(
+        self,
+        query: str,
+        top_n: int = 10,
+        analyze_n: int = 3,
+        scan: int = 0,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields {"type": "ranking", "query", "top"} as soon as the ranking is
+        known, then one {"type": "analysis", "query", "result"} per analyzed
+        repo in completion order; result["rank"] is its 1-based position in top.
+        """
+        with trace.span("coordinator.run", "run", query=query):
+            tasks: List[asyncio.Task] = []
+            prefetch: Optional[asyncio.Task] = None
+            try:
+                repos = await self.finder.find(query=query, top_n=top_n, scan=scan, rank=self.rank)
+                yield {"type": "ranking", "query": query, "top": [c.model_dump() for c in repos]}
+
+                if self.workers or self.queue_dir:
+                    async for i, outcome in self._pooled(repos[:analyze_n]):
+                        if "error" in outcome:
+                            raise RuntimeError(f"analysis of {repos[i].repo.full_name} failed: {outcome['error']}")
+                        yield {"type": "analysis", "query": query, "result": {"rank": i + 1, **outcome["result"]}}
+                    return
+
+                # One issue search for all picked repos instead of one per repo
+                if repos[:analyze_n]:
+                    prefetch = self.contrib.prefetch([c.repo.full_name for c in repos[:analyze_n]])
+                tasks = [
+                    asyncio.create_task(self._ranked(c, rank))
+                    for rank, c in enumerate(repos[:analyze_n], start=1)
+                ]
+                for done in asyncio.as_completed(tasks):
+                    yield {"type": "analysis", "query": query, "result": await done}
+            finally:
+                # The consumer may stop early; don't leave analyses running
+                await self._cancel(tasks, prefetch)
+                await self.gh.aclose()
+
+    async def stream_batch(
+        self,
+        queries: List[str],
+        top_n: int = 10,
+        analyze_n: int = 3,
+        scan: int = 0,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Runs several queries with one client and cache.
+
+        All searches run concurrently; each yields a {"type": "ranking"}
+        record whose "analyzed" lists the full names picked for analysis.
+        The picks are merged by full_name and each unique repo is analyzed
+        once, yielding {"type": "analysis", "full_name", "queries", "result"}
+        in completion order. A failed search or analysis yields its record
+        with an "error" instead of stopping the batch. With llm_batch, the
+        picked repos' READMEs are summarized in one Batch API job before any
+        analysis starts.
+        """
+        queries = list(dict.fromkeys(queries))
+        with trace.span("coordinator.batch", "run", queries=len(queries)):
+            tasks: List[asyncio.Task] = []
+            prefetch: Optional[asyncio.Task] = None
+            try:
+                found = await asyncio.gather(
+                    *(self.finder.find(query=q, top_n=top_n, scan=scan, rank=self.rank) for q in queries),
+                    return_exceptions=True,
+                )
+
+                picked: Dict[str, RepoCandidate] = {}
+                wanted_by: Dict[str, List[str]] = {}
+                for query, repos in zip(queries, found):
+                    if isinstance(repos, BaseException):
+                        yield {"type": "ranking", "query": query, "top": [], "analyzed": [], "error": repr(repos)}
+                        continue
+                    names = [c.repo.full_name for c in repos[:analyze_n]]
+                    for c in repos[:analyze_n]:
+                        picked.setdefault(c.repo.full_name, c)
+                        wanted_by.setdefault(c.repo.full_name, []).append(query)
+                    yield {"type": "ranking", "query": query, "top": [c.model_dump() for c in repos], "analyzed": names}
+
+                if self.llm_batch and picked:
+                    await self._summarize_ahead(list(picked))
+
+                if self.workers or self.queue_dir:
+                    names = list(picked)
+                    async for i, outcome in self._pooled(list(picked.values())):
+                        yield {"type": "analysis", "full_name": names[i], "queries": wanted_by[names[i]], **outcome}
+                    return
 
+                if picked:
+                    prefetch = self.contrib.prefetch(list(picked))
+                tasks = [asyncio.create_task(self._shared(c, wanted_by[name])) for name, c in picked.items()]
+                for done in asyncio.as_completed(tasks):
+                    yield await done
+            finally:
+                await self._cancel(tasks, prefetch)
+                await self.gh.aclose()
+
+    async def _summarize_ahead(self, full_names: List[str]) -> None:
+        # The summaries land in the shared cache, where the analyses (local or
+        # in workers) find them; a README that fails to load is left to them.
+        readmes = await asyncio.gather(*(self.gh.get_readme(n) for n in full_names), return_exceptions=True)
+        texts = [r for r in readmes if isinstance(r, str) and r]
+        if texts:
+            await self.analyst.llm.summarize_many(texts, batch=True)
+
+    async def _cancel(self, tasks: List[asyncio.Task], prefetch: Optional[asyncio.Task]) -> None:
+        # The prefetched issue search belongs to this run's event loop, so it
+        # goes with the analyses; a later run must not await it.
+        pending = tasks + ([prefetch] if prefetch is not None else [])
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        if prefetch is not None:
+            self.contrib.forget()
+
+    async def _pooled(self, candidates: List[RepoCandidate]) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Queues one job per candidate and yields (index, {"result"} or
+        {"error"}) as workers finish them.
+
+        Without a queue_dir the queue is a private temp directory, closed
+        once filled so the local workers exit when it drains. A shared
+        queue_dir is left open for other producers and its workers keep
+        running; claims older than DEFAULT_LEASE are requeued.
+        """
+        from packages.workers import pool
+
+        root = self.queue_dir or tempfile.mkdtemp(prefix="scout-queue-")
+        queue = DirQueue(root)
+        pending = {queue.put({"candidate": c.model_dump()}): i for i, c in enumerate(candidates)}
+        if not self.queue_dir:
+            queue.close()
+        procs = pool.spawn(root, self.workers, self._worker_options) if self.workers and pending else []
+        try:
+            while pending:
+                for outcome in queue.results(list(pending)):
+                    yield pending.pop(outcome.pop("id")), outcome
+                if not pending:
+                    break
+                if procs and not any(p.is_alive() for p in procs) and not self.queue_dir:
+                    # a last look: results may have landed after the read above
+                    for outcome in queue.results(list(pending)):
+                        yield pending.pop(outcome.pop("id")), outcome
+                    if pending:
+                        raise RuntimeError(f"worker processes exited with {len(pending)} jobs unfinished")
+                queue.requeue_stale(DEFAULT_LEASE)
+                await asyncio.sleep(pool.POLL_INTERVAL)
+        finally:
+            for p in procs:
+                if p.is_alive():
+                    p.terminate()
+            await asyncio.gather(*(asyncio.to_thread(p.join, 5.0) for p in procs))
+            if not self.queue_dir:
+                shutil.rmtree(root, ignore_errors=True)
+
+    async def analyze(self, c: RepoCandidate) -> Dict[str, Any]:
+        """Every agent's output for one candidate; what a worker runs per job."""
+        return await self._analyze_one(c)
+
+    async def _ranked(self, c: RepoCandidate, rank: int) -> Dict[str, Any]:
+        return {"rank": rank, **await self._analyze_one(c)}
+
+    async def _shared(self, c: RepoCandidate, queries: List[str]) -> Dict[str, Any]:
+        record: Dict[str, Any] = {"type": "analysis", "full_name": c.repo.full_name, "queries": queries}
+        try:
+            record["result"] = await self._analyze_one(c)
+        except Exception as err:
+            # one bad repo shouldn't sink the other queries' results
+            record["error"] = repr(err)
+        return record
+
+    async def _analyze_one(self, c: RepoCandidate) -> Dict[str, Any]:
+        full_name = c.repo.full_name
+        reused: List[str] = []
+        # The head (three small, ETag-revalidated requests) is the freshness check
+        # for everything derived from the repo's files.
+        with trace.span("coordinator.repo", "run", repo=full_name) as sp:
+            head = await self.gh.get_head(full_name) if self.results else None
+            analysis, contrib, (stack, improve) = await asyncio.gather(
+                self._analysis(full_name, head, reused),
+                self._contrib(full_name, reused),
+                self._tree_agents(full_name, head, reused),
+            )
+            sp.set(reused=sorted(reused))
         return {
-            "query": query,
-            "top": [c.model_dump() for c in repos],
-            "analyzed": analyzed,
+            "repo": c.model_dump(),
+            "analysis": analysis.model_dump(),
+            "stack": stack.model_dump(),
+            "contrib": contrib.model_dump(),
+            "improve": improve.model_dump(),
+            "reused": sorted(reused),
         }
+
+    async def _analysis(self, full_name: str, head: Optional[RepoHead], reused: List[str]) -> RepoAnalysis:
+        if self.results is None or head is None:
+            return await self.analyst.analyze(full_name)
+
+        versions = {"model": self.analyst.llm.model, "prompt": PROMPT_VERSION}
+        entry = self.results.entry(full_name, "analysis")
+        stored = entry["inputs"] if entry else {}
+        # Same tree means same README; otherwise compare the README blob itself
+        if entry and stored == {**versions, "tree": head.tree_sha, "readme": stored.get("readme")}:
+            reused.append("analysis")
+            return RepoAnalysis.model_validate(entry["output"])
+
+        readme_version, readme = await self.gh.get_readme_blob(full_name)
+        inputs = {**versions, "tree": head.tree_sha, "readme": readme_version}
+        if entry and readme_version is not None and stored == {**inputs, "tree": stored.get("tree")}:
+            reused.append("analysis")
+            analysis = RepoAnalysis.model_validate(entry["output"])
+        else:
+            analysis = await self.analyst.analyze(full_name, readme=readme or "")
+        self.results.save(full_name, "analysis", inputs, analysis.model_dump())
+        return analysis
+
+    async def _contrib(self, full_name: str, reused: List[str]) -> ContributionReport:
+        if self.results is None:
+            return await self.contrib.find_issues(full_name)
+
+        # Unchanged issue lists come back from the cache or as 304s
+        results, etags = await self.contrib.fetch(full_name)
+        inputs = {"issues": etags}
+        stored = self.results.load(full_name, "contrib", inputs)
+        if stored is not None:
+            reused.append("contrib")
+            return ContributionReport.model_validate(stored)
+        report = self.contrib.report(results)
+        self.results.save(full_name, "contrib", inputs, report.model_dump())
+        return report
+
+    async def _tree_agents(
+        self,
+        full_name: str,
+        head: Optional[RepoHead],
+        reused: List[str],
+    ) -> Tuple[TechStackReport, ImprovementReport]:
+        inputs = {"tree": head.tree_sha} if head else {}
+        # a changed rule pack re-detects stacks even for an unchanged tree
+        stack_inputs = {**inputs, "rules": self.stack.rules.version}
+        if self.results is not None and head is not None:
+            stack = self.results.load(full_name, "stack", stack_inputs)
+            improve = self.results.load(full_name, "improve", inputs)
+            if stack is not None and improve is not None:
+                reused.extend(["stack", "improve"])
+                return TechStackReport.model_validate(stack), ImprovementReport.model_validate(improve)
+
+        # One tree fetch shared by both file-inspecting agents
+        snapshot = await self._snapshot(full_name, head)
+        stack, improve = await asyncio.gather(
+            self.stack.detect(full_name, snapshot),
+            self.improve.suggest(full_name, snapshot),
+        )
+        if self.results is not None and head is not None:
+            self.results.save(full_name, "stack", stack_inputs, stack.model_dump())
+            self.results.save(full_name, "improve", inputs, improve.model_dump())
+        return stack, improve
+
+    async def _snapshot(self, full_name: str, head: Optional[RepoHead] = None) -> RepoSnapshot:
+        if self.archive:
+            try:
+                return await self.gh.get_archive(full_name, head=head)
+            except (httpx.HTTPError, ArchiveTooLarge, tarfile.TarError):
+                pass
+        return await self.gh.get_snapshot(full_name, head=head)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from packages.corpus.store import Corpus
+from packages.github_client.client import GRAPHQL_BATCH, SEARCH_RESULT_CAP, GitHubClient
+
+
+@dataclass
+class CrawlStats:
+    seen: int = 0
+    added: int = 0
+    refreshed: int = 0
+    unchanged: int = 0
+
+
+class CorpusCrawler:
+    """
+    Fills a Corpus from repository search results.
+
+    Search hits already carry `pushed_at` and `updated_at`; a repo is only
+    re-fetched (and rewritten) when either differs from what its hit said on
+    the last crawl. The refreshed stats can't be compared: search lags them.
+    """
+
+    def __init__(self, gh: GitHubClient, corpus: Corpus) -> None:
+        self.gh = gh
+        self.corpus = corpus
+
+    async def crawl(self, query: str, max_results: int = SEARCH_RESULT_CAP) -> CrawlStats:
+        stats = CrawlStats()
+        page: List[Dict[str, Any]] = []
+        async for item in self.gh.iter_search_repositories(query, max_results=max_results):
+            page.append(item)
+            if len(page) >= GRAPHQL_BATCH:
+                await self._store(page, stats)
+                page = []
+        if page:
+            await self._store(page, stats)
+        return stats
+
+    async def _store(self, items: List[Dict[str, Any]], stats: CrawlStats) -> None:
+        known = self.corpus.versions(item["full_name"] for item in items)
+        changed: List[Dict[str, Any]] = []
+        unchanged: List[str] = []
+        for item in items:
+            name = item["full_name"]
+            if known.get(name) == (item.get("pushed_at"), item.get("updated_at")):
+                unchanged.append(name)
+            else:
+                changed.append(item)
+                if name in known:
+                    stats.refreshed += 1
+                else:
+                    stats.added += 1
+
+        if changed:
+            fresh = await self.gh.get_repos([item["full_name"] for item in changed])
+            self.corpus.upsert([(item, fresh[item["full_name"]]) for item in changed])
+        if unchanged:
+            self.corpus.touch(unchanged)
+
+        stats.seen += len(items)
+        stats.unchanged += len(unchanged)
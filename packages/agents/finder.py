@@ -1,35 +1,130 @@
 from __future__ import annotations
 
-from typing import List
+import heapq
+from typing import AsyncIterator, Dict, List, Tuple
 
-from packages.github_client.client import GitHubClient
+from packages.github_client.client import GitHubClient, repo_stats_from_json
 from packages.models.schemas import RepoCandidate, RepoRef, RepoStats
-from packages.scoring.rank import score_repo, rank_repos
+from packages.scoring.rank import TopK, rank_repos, score_bounds, score_repo
+from packages.tracing import trace
+
+RANK_MODES = ("full", "bound")
+# Candidates enriched per request once the first top_n are known
+ENRICH_BATCH = 10
+
+
+def _ref_from_item(item: Dict) -> RepoRef:
+    return RepoRef(
+        owner=item["owner"]["login"],
+        name=item["name"],
+        full_name=item["full_name"],
+        url=item["html_url"],
+    )
+
+
+def _candidate(ref: RepoRef, stats: RepoStats) -> RepoCandidate:
+    score, reasons = score_repo(stats)
+    return RepoCandidate(repo=ref, stats=stats, score=score, reasons=reasons)
 
 
 class RepoFinderAgent:
     def __init__(self, gh: GitHubClient) -> None:
         self.gh = gh
 
-    def find(self, query: str, top_n: int = 10) -> List[RepoCandidate]:
-        items = self.gh.search_repositories(query=query, top_n=top_n)
+    @trace.traced("finder")
+    async def find(self, query: str, top_n: int = 10, scan: int = 0, rank: str = "full") -> List[RepoCandidate]:
+        """
+        Ranks the first `top_n` search hits, or, with `scan` > top_n, streams up
+        to `scan` hits and keeps the best `top_n` of them.
+
+        rank="full" refreshes every hit's stats before scoring (only the
+        winners, when scanning). rank="bound", with `scan`, bounds each hit's
+        score from search data and refreshes hits best-first, stopping once
+        none left can make the top `top_n` (see _bounded); without `scan`
+        every hit is in the result, so it ranks as "full".
+        """
+        if rank not in RANK_MODES:
+            raise ValueError(f"rank must be one of {', '.join(RANK_MODES)}, not {rank!r}")
+        if rank == "bound" and scan > top_n:
+            return await self._bounded(self.gh.iter_search_repositories(query, max_results=scan), top_n)
+        if scan > top_n:
+            return await self._scan(query, top_n, scan)
+
+        items = await self.gh.search_repositories(query=query, top_n=top_n)
+
+        # pull richer stats for the whole page in one batched call
+        all_stats = await self.gh.get_repos([item["full_name"] for item in items])
 
         candidates: List[RepoCandidate] = []
         for item in items:
-            full_name = item["full_name"]
-            ref = RepoRef(
-                owner=item["owner"]["login"],
-                name=item["name"],
-                full_name=full_name,
-                url=item["html_url"],
-            )
-
-            # pull richer stats from /repos/{full_name}
-            stats: RepoStats = self.gh.get_repo(full_name)
-
-            score, reasons = score_repo(stats)
-            candidates.append(
-                RepoCandidate(repo=ref, stats=stats, score=score, reasons=reasons)
-            )
+            stats: RepoStats = all_stats[item["full_name"]]
+            candidates.append(_candidate(_ref_from_item(item), stats))
 
         return rank_repos(candidates)
+
+    async def _scan(self, query: str, top_n: int, scan: int) -> List[RepoCandidate]:
+        # Search hits carry the same fields as /repos/{name}, so candidates are
+        # scored as they stream in; only the winners get enriched afterwards.
+        top = TopK(top_n)
+        async for item in self.gh.iter_search_repositories(query, max_results=scan):
+            top.push(_candidate(_ref_from_item(item), repo_stats_from_json(item)))
+
+        winners = top.results()
+        fresh = await self.gh.get_repos([c.repo.full_name for c in winners])
+        return rank_repos([_candidate(c.repo, fresh[c.repo.full_name]) for c in winners])
+
+    async def _bounded(self, hits: AsyncIterator[Dict], top_n: int) -> List[RepoCandidate]:
+        """
+        Top `top_n` hits by refreshed score, refreshing as few as the bounds
+        allow; same result as refreshing every hit, given score_bounds holds.
+
+        Hits are visited by upper bound and refreshed in batches. Once the
+        k-th best score so far beats the next upper bound, no remaining hit
+        can get in.
+        """
+        # (high, order, ref); while streaming, a hit whose upper bound is
+        # below the k best lower bounds seen so far is dropped
+        pool: List[Tuple[float, int, RepoRef]] = []
+        floor: List[float] = []
+        seen = 0
+        async for item in hits:
+            low, high = score_bounds(repo_stats_from_json(item))
+            seen += 1
+            if len(floor) >= top_n and high < floor[0]:
+                continue
+            pool.append((high, len(pool), _ref_from_item(item)))
+            if len(floor) < top_n:
+                heapq.heappush(floor, low)
+            elif low > floor[0]:
+                heapq.heapreplace(floor, low)
+        if len(floor) >= top_n:
+            # The final k best lower bounds rule out more than they did mid-stream
+            pool = [hit for hit in pool if hit[0] >= floor[0]]
+        pool.sort(key=lambda hit: (-hit[0], hit[1]))
+
+        top = TopK(top_n)
+        ranked: List[Tuple[int, RepoCandidate]] = []
+        pending: List[Tuple[int, RepoRef]] = []
+        enriched = visited = 0
+        while True:
+            # Take hits until a refresh batch is full or the rest are out of reach
+            size = top_n if not ranked else ENRICH_BATCH
+            while visited < len(pool) and len(pending) < size:
+                high, order, ref = pool[visited]
+                if top.threshold is not None and high < top.threshold:
+                    break
+                visited += 1
+                pending.append((order, ref))
+            if not pending:
+                break
+            fresh = await self.gh.get_repos([ref.full_name for _, ref in pending])
+            enriched += len(pending)
+            for order, ref in pending:
+                candidate = _candidate(ref, fresh[ref.full_name])
+                ranked.append((order, candidate))
+                top.push(candidate)
+            pending = []
+
+        trace.annotate(hits=seen, scored=len(ranked), enriched=enriched)
+        # Search order breaks ties, as in rank="full"
+        return rank_repos([c for _, c in sorted(ranked, key=lambda r: r[0])])[:top_n]
@@ -1,25 +1,33 @@
 from __future__ import annotations
 
+import asyncio
+from typing import Optional
+
 from packages.github_client.client import GitHubClient
+from packages.github_client.snapshot import RepoSnapshot
 from packages.models.schemas import ImprovementReport
+from packages.tracing import trace
 
 
 class ImprovementAdvisorAgent:
     def __init__(self, gh: GitHubClient) -> None:
         self.gh = gh
 
-    def _dir_filenames(self, full_name: str, path: str) -> set[str]:
-        items = self.gh.list_dir(full_name, path)
-        return {it.get("name", "").lower() for it in items if it.get("type") == "file"}
-
-    def suggest(self, full_name: str) -> ImprovementReport:
+    @trace.traced("improve")
+    async def suggest(self, full_name: str, snapshot: Optional[RepoSnapshot] = None) -> ImprovementReport:
         quick_wins: list[str] = []
         evidence: list[str] = []
 
-        # Directory listings are reliable and cheap
-        root_files = self._dir_filenames(full_name, "")
-        gh_files = self._dir_filenames(full_name, ".github")
-        docs_files = self._dir_filenames(full_name, "docs")
+        if snapshot is None:
+            snapshot = await self.gh.get_snapshot(full_name)
+
+        # Directory listings come from the tree snapshot
+        root_files, gh_files, docs_files, workflow_files = await asyncio.gather(
+            snapshot.dir_files(""),
+            snapshot.dir_files(".github"),
+            snapshot.dir_files("docs"),
+            snapshot.dir_files(".github/workflows"),
+        )
 
         def found_in_common_places(candidates: list[str]) -> str | None:
             for name in candidates:
@@ -61,18 +69,15 @@ class ImprovementAdvisorAgent:
             quick_wins.append("Add a LICENSE file at repo root to clarify usage and contributions.")
 
         # CI workflows: directory presence is reliable
-        workflows = self.gh.list_dir(full_name, ".github/workflows")
-        if any(it.get("type") == "file" for it in workflows):
+        if workflow_files:
             evidence.append("GitHub Actions workflows detected under .github/workflows.")
         else:
             evidence.append("No files found under .github/workflows.")
             quick_wins.append("Add GitHub Actions workflows under .github/workflows to run tests/lint on PRs.")
 
         # Docker support (root): safe claim
-        dockerfile = self.gh.get_file_text(full_name, "Dockerfile")
-        compose_yml = self.gh.get_file_text(full_name, "docker-compose.yml")
-        compose_yaml = self.gh.get_file_text(full_name, "docker-compose.yaml")
-        if dockerfile or compose_yml or compose_yaml:
+        docker_paths = ["Dockerfile", "docker-compose.yml", "docker-compose.yaml"]
+        if any(await asyncio.gather(*(snapshot.has_file(p) for p in docker_paths))):
             evidence.append("Docker support detected at repo root (Dockerfile and/or docker-compose present).")
         else:
             evidence.append("No Dockerfile or docker-compose.yml/.yaml found at repo root.")
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Bump when parsing rules change so cached outlines are rebuilt
+OUTLINE_VERSION = 1
+
+# Only fence and heading lines matter to the outline; finditer skips the rest at C speed.
+# [^\S\n] is "whitespace other than newline".
+_LINE = re.compile(
+    r"^(?=[ #`~])(?:"
+    r"(?P<fence> {0,3}(?:`{3,}|~{3,}))(?P<info>[^\n]*)"
+    r"|(?P<hashes>#{1,6})(?!#)(?P<gap>[^\S\n]*)(?P<title>[^\n]*?)[^\S\n]*$"
+    r")",
+    re.M,
+)
+_CLOSING_HASHES = re.compile(r"\s+#+$")
+
+
+def _is_image(line: str) -> bool:
+    return line.startswith("![") or line.startswith("[![") or line.startswith("<img")
+
+
+def _first_paragraph(text: str) -> Optional[str]:
+    # Stops at the first blank line after some content, so it only reads the top
+    paragraph: List[str] = []
+    for line in _lines(text):
+        stripped = line.strip()
+        if not stripped:
+            if paragraph:
+                break
+        elif not _is_image(stripped):
+            paragraph.append(stripped)
+    return "\n".join(paragraph) if paragraph else None
+
+
+def _lines(text: str) -> Iterator[str]:
+    start = 0
+    while start <= len(text):
+        end = text.find("\n", start)
+        if end < 0:
+            end = len(text)
+        yield text[start:end]
+        start = end + 1
+
+
+class ReadmeOutline:
+    """
+    Heading -> section span index for a markdown document, built in one pass.
+
+    Headings inside fenced code blocks are ignored. A section runs from the end
+    of its heading line to the next heading of any level. Only heading and
+    fence lines are visited while parsing; lookups are dict reads plus one
+    slice, and the index serializes with `to_dict` so it can be cached next to
+    the README it was built from.
+    """
+
+    def __init__(self, text: str, spans: Dict[str, Tuple[int, int]]) -> None:
+        self.text = text
+        self.spans = spans
+        self._first_paragraph: Optional[str] = None
+        self._first_paragraph_done = False
+
+    @property
+    def first_paragraph(self) -> Optional[str]:
+        """First block of text, ignoring badge/image lines."""
+        if not self._first_paragraph_done:
+            self._first_paragraph = _first_paragraph(self.text)
+            self._first_paragraph_done = True
+        return self._first_paragraph
+
+    @classmethod
+    def parse(cls, text: str) -> "ReadmeOutline":
+        spans: Dict[str, Tuple[int, int]] = {}
+        open_titles: List[str] = []  # headings waiting for the next section break
+        fence: Optional[str] = None
+
+        for m in _LINE.finditer(text):
+            marker = m.group("fence")
+            if fence is not None:
+                if marker and marker.lstrip()[0] == fence[0] and len(marker.lstrip()) >= len(fence) and not m.group("info").strip():
+                    fence = None
+                continue
+            if marker:
+                fence = marker.lstrip()
+                continue
+
+            title = m.group("title")
+            if not title:
+                continue
+
+            # A heading ends the open sections only with whitespace after the hashes
+            if m.group("gap"):
+                for t in open_titles:
+                    spans[t] = (spans[t][0], m.start())
+                open_titles = []
+
+            key = _CLOSING_HASHES.sub("", title).strip().casefold()
+            if key and key not in spans:
+                spans[key] = (m.end(), len(text))
+                open_titles.append(key)
+
+        return cls(text, spans)
+
+    def section(self, names: Iterable[str]) -> Optional[str]:
+        """Body of the earliest heading whose title matches one of `names` (case-insensitive)."""
+        found = [self.spans[n.casefold()] for n in names if n.casefold() in self.spans]
+        if not found:
+            return None
+        start, end = min(found)
+        section = self.text[start:end].strip()
+        return section if section else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": OUTLINE_VERSION,
+            "spans": {title: list(span) for title, span in self.spans.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, text: str, data: Dict[str, Any]) -> Optional["ReadmeOutline"]:
+        if data.get("version") != OUTLINE_VERSION:
+            return None
+        spans = {title: (span[0], span[1]) for title, span in data["spans"].items()}
+        return cls(text, spans)
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from packages.github_client.client import GitHubClient
+    from packages.llm.client import LLMClient
+
+# name -> (module, class); every agent takes the shared GitHub client first
+AGENTS: Dict[str, Tuple[str, str]] = {
+    "finder": ("packages.agents.finder", "RepoFinderAgent"),
+    "analyst": ("packages.agents.analyst", "RepoAnalystAgent"),
+    "stack": ("packages.agents.stack", "TechStackAgent"),
+    "contrib": ("packages.agents.contrib", "ContributionAgent"),
+    "improve": ("packages.agents.improve", "ImprovementAdvisorAgent"),
+}
+
+
+class AgentRegistry:
+    """
+    Builds each agent on first use, importing its module only then, so a
+    search never loads (or constructs) the analysis agents and their clients.
+    """
+
+    def __init__(self, gh: GitHubClient, llm: Optional[LLMClient] = None) -> None:
+        self.gh = gh
+        self.llm = llm
+        self._agents: Dict[str, Any] = {}
+
+    def get(self, name: str) -> Any:
+        agent = self._agents.get(name)
+        if agent is None:
+            module, cls = AGENTS[name]
+            factory = getattr(importlib.import_module(module), cls)
+            agent = factory(self.gh, self.llm) if name == "analyst" else factory(self.gh)
+            self._agents[name] = agent
+        return agent
+
+    def loaded(self) -> Tuple[str, ...]:
+        return tuple(self._agents)
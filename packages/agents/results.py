@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from packages.github_client import cache
+
+# Bump when an agent's output for the same inputs changes shape or meaning
+RESULTS_VERSION = 1
+RESULTS_TTL = 90 * 24 * 60 * 60
+
+
+class ResultStore:
+    """
+    Per-repo agent outputs, persisted in the shared cache together with the
+    inputs they were computed from (tree SHA, the raw README's ETag, a digest
+    of the issue lists).
+    A stored output is only handed back while its inputs are unchanged.
+    """
+
+    def __init__(self, namespace: str = "default") -> None:
+        self.namespace = namespace
+
+    def _key(self, full_name: str, agent: str) -> str:
+        return f"results:v{RESULTS_VERSION}:{self.namespace}:{agent}:{full_name.lower()}"
+
+    def entry(self, full_name: str, agent: str) -> Optional[Dict[str, Any]]:
+        """The stored {"inputs", "output"} record, whatever its inputs."""
+        return cache.get(self._key(full_name, agent))
+
+    def load(self, full_name: str, agent: str, inputs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        entry = self.entry(full_name, agent)
+        if entry is None or entry["inputs"] != inputs:
+            return None
+        return entry["output"]
+
+    def save(self, full_name: str, agent: str, inputs: Dict[str, Any], output: Dict[str, Any]) -> None:
+        # Outputs computed from unknown inputs can never be matched again
+        if any(v is None or (isinstance(v, list) and None in v) for v in inputs.values()):
+            return
+        cache.set(self._key(full_name, agent), {"inputs": inputs, "output": output}, ttl_seconds=RESULTS_TTL)
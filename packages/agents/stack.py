@@ -1,9 +1,15 @@
 from __future__ import annotations
 
-from typing import List
+import asyncio
+import fnmatch
+import posixpath
+from typing import Dict, List, Optional
 
+from packages.agents.stack_rules import PACK, Rule, RulePack
 from packages.github_client.client import GitHubClient
+from packages.github_client.snapshot import RepoSnapshot
 from packages.models.schemas import TechStackReport
+from packages.tracing import trace
 
 
 def _add_unique(lst: List[str], item: str) -> None:
@@ -11,71 +17,62 @@ def _add_unique(lst: List[str], item: str) -> None:
         lst.append(item)
 
 
+def _is_literal(glob: str) -> bool:
+    return not any(ch in glob for ch in "*?[")
+
+
+async def _glob(snapshot: RepoSnapshot, glob: str) -> List[str]:
+    if not snapshot.truncated:
+        return snapshot.glob(glob)
+    # A truncated tree can't be globbed; list the directory instead
+    parent, name = posixpath.split(glob)
+    if not _is_literal(parent):
+        return []
+    return [posixpath.join(parent, f) for f in sorted(await snapshot.dir_files(parent)) if fnmatch.fnmatchcase(f, name)]
+
+
 class TechStackAgent:
-    def __init__(self, gh: GitHubClient) -> None:
+    """
+    Labels a repo's frameworks, tools and infra from the rules in
+    stack_rules.RULES. Presence-only globs are answered from the tree;
+    the rest are read once each and matched against all their rules at once.
+    """
+
+    def __init__(self, gh: GitHubClient, rules: RulePack = PACK) -> None:
         self.gh = gh
+        self.rules = rules
 
-    def detect(self, full_name: str) -> TechStackReport:
-        languages = self.gh.get_languages(full_name)
-
-        frameworks: List[str] = []
-        tools: List[str] = []
-        infra: List[str] = []
-
-        pom = self.gh.get_file_text(full_name, "pom.xml")
-        if pom:
-            if "spring-boot-starter" in pom:
-                _add_unique(frameworks, "Spring Boot")
-            _add_unique(tools, "Maven")
-
-        gradle = self.gh.get_file_text(full_name, "build.gradle")
-        if gradle:
-            if "org.springframework.boot" in gradle:
-                _add_unique(frameworks, "Spring Boot")
-            _add_unique(tools, "Gradle")
-
-        pkg = self.gh.get_file_text(full_name, "package.json")
-        if pkg:
-            if '"react"' in pkg or "'react'" in pkg:
-                _add_unique(frameworks, "React")
-            if '"next"' in pkg or '"nextjs"' in pkg:
-                _add_unique(frameworks, "Next.js")
-            if '"express"' in pkg:
-                _add_unique(frameworks, "Express")
-            _add_unique(tools, "Node.js")
-
-        req = self.gh.get_file_text(full_name, "requirements.txt")
-        if req:
-            if "fastapi" in req.lower():
-                _add_unique(frameworks, "FastAPI")
-            if "django" in req.lower():
-                _add_unique(frameworks, "Django")
-            _add_unique(tools, "pip")
-
-        pyproject = self.gh.get_file_text(full_name, "pyproject.toml")
-        if pyproject:
-            low = pyproject.lower()
-            if "poetry" in low:
-                _add_unique(tools, "Poetry")
-            if "fastapi" in low:
-                _add_unique(frameworks, "FastAPI")
-
-        dockerfile = self.gh.get_file_text(full_name, "Dockerfile")
-        if dockerfile:
-            _add_unique(infra, "Docker")
-
-        compose = self.gh.get_file_text(full_name, "docker-compose.yml")
-        if compose:
-            _add_unique(infra, "docker-compose")
-
-        # GitHub Actions heuristic: check if folder exists by trying a common workflow file
-        ci = self.gh.get_file_text(full_name, ".github/workflows/ci.yml")
-        if ci or self.gh.get_file_text(full_name, ".github/workflows/main.yml"):
-            _add_unique(infra, "GitHub Actions")
+    @trace.traced("stack")
+    async def detect(self, full_name: str, snapshot: Optional[RepoSnapshot] = None) -> TechStackReport:
+        if snapshot is None:
+            snapshot = await self.gh.get_snapshot(full_name)
+
+        globs = list(self.rules.globs)
+        languages, *matched = await asyncio.gather(
+            self.gh.get_languages(full_name),
+            *(self._match(snapshot, glob) for glob in globs),
+        )
+        hits = {rule for rules in matched for rule in rules}
+
+        labels: Dict[str, List[str]] = {"framework": [], "tool": [], "infra": []}
+        for rule in self.rules.rules:
+            if rule in hits:
+                _add_unique(labels[rule.kind], rule.label)
 
         return TechStackReport(
             languages=languages,
-            frameworks=frameworks,
-            tools=tools,
-            infra_signals=infra,
+            frameworks=labels["framework"],
+            tools=labels["tool"],
+            infra_signals=labels["infra"],
         )
+
+    async def _match(self, snapshot: RepoSnapshot, glob: str) -> List[Rule]:
+        literal = _is_literal(glob)
+        paths = [glob] if literal else await _glob(snapshot, glob)
+        if not self.rules.needs_content(glob):
+            # Globbed paths are known to exist; a literal one may cost a request on a truncated tree
+            found = await snapshot.has_file(glob) if literal else bool(paths)
+            return self.rules.globs[glob] if found else []
+        # Each file is fetched only until every rule for its glob has matched
+        texts = await asyncio.gather(*(snapshot.read_text(p, until=self.rules.detector(glob)) for p in paths))
+        return [rule for text in texts if text for rule in self.rules.match(glob, text)]
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import hashlib
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Set, Tuple, Union
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    `label` (a framework, tool or infra signal) applies when a file matching
+    `glob` contains any of `patterns`; with no patterns, the file existing is
+    enough. Patterns match case-insensitively.
+    """
+
+    glob: str
+    label: str
+    kind: str  # "framework" | "tool" | "infra"
+    patterns: Tuple[str, ...] = ()
+
+
+# Report order follows rule order. Globs without wildcards are root paths.
+RULES: List[Rule] = [
+    Rule("pom.xml", "Spring Boot", "framework", ("spring-boot-starter",)),
+    Rule("pom.xml", "Maven", "tool"),
+    Rule("build.gradle", "Spring Boot", "framework", ("org.springframework.boot",)),
+    Rule("build.gradle", "Gradle", "tool"),
+    Rule("build.gradle.kts", "Spring Boot", "framework", ("org.springframework.boot",)),
+    Rule("build.gradle.kts", "Gradle", "tool"),
+    Rule("package.json", "React", "framework", ('"react"', "'react'")),
+    Rule("package.json", "Next.js", "framework", ('"next"', '"nextjs"')),
+    Rule("package.json", "Express", "framework", ('"express"',)),
+    Rule("package.json", "Node.js", "tool"),
+    Rule("requirements.txt", "FastAPI", "framework", ("fastapi",)),
+    Rule("requirements.txt", "Django", "framework", ("django",)),
+    Rule("requirements.txt", "pip", "tool"),
+    Rule("pyproject.toml", "Poetry", "tool", ("poetry",)),
+    Rule("pyproject.toml", "FastAPI", "framework", ("fastapi",)),
+    Rule("Dockerfile", "Docker", "infra"),
+    Rule("docker-compose.yml", "docker-compose", "infra"),
+    Rule("docker-compose.yaml", "docker-compose", "infra"),
+    Rule(".github/workflows/*.yml", "GitHub Actions", "infra"),
+    Rule(".github/workflows/*.yaml", "GitHub Actions", "infra"),
+]
+
+# Below this many patterns per glob, one C-level substring search per pattern
+# beats a pure-Python automaton pass over the file; both find the same matches.
+AUTOMATON_MIN_PATTERNS = 128
+
+
+class Automaton:
+    """
+    Aho-Corasick matcher: finds which of many patterns occur in a text in one
+    pass over it, however many patterns there are.
+
+    Failure links are folded into the transition tables at build time, so
+    each character costs one dict lookup. `scan` can resume from a previous
+    state, which lets a streamed file be matched chunk by chunk.
+    """
+
+    start = 0
+
+    def __init__(self, patterns: Sequence[str]) -> None:
+        goto: List[Dict[str, int]] = [{}]
+        out: List[Set[int]] = [set()]
+        for i, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = goto[state][ch] = len(goto)
+                    goto.append({})
+                    out.append(set())
+                state = nxt
+            out[state].add(i)
+
+        # Breadth-first, so a state's failure target is complete before it's used
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        todo = deque(goto[0].values())
+        while todo:
+            state = todo.popleft()
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            out[state] |= out[fail[state]]
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0)
+                todo.append(nxt)
+
+        self.patterns = list(patterns)
+        self._delta = delta
+        self._out = [frozenset(o) for o in out]
+
+    def scan(self, text: str, state: int = 0) -> Tuple[int, Set[int]]:
+        """(state after `text`, indexes of the patterns that end inside it)."""
+        delta, out = self._delta, self._out
+        found: Set[int] = set()
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if out[state]:
+                found |= out[state]
+        return state, found
+
+
+class Substrings:
+    """Automaton's interface over plain `in` tests; the state is the tail a match could span."""
+
+    start = ""
+
+    def __init__(self, patterns: Sequence[str]) -> None:
+        self.patterns = list(patterns)
+        self._keep = max((len(p) for p in self.patterns), default=1) - 1
+
+    def scan(self, text: str, state: str = "") -> Tuple[str, Set[int]]:
+        text = state + text
+        found = {i for i, p in enumerate(self.patterns) if p in text}
+        return (text[-self._keep:] if self._keep else ""), found
+
+
+class RulePack:
+    """
+    RULES compiled for matching: one Automaton per glob over all of its
+    rules' patterns, so each file is scanned once, not once per rule (globs
+    with few patterns use Substrings instead).
+    """
+
+    def __init__(self, rules: Iterable[Rule]) -> None:
+        self.rules = list(rules)
+        self.globs: Dict[str, List[Rule]] = {}
+        for rule in self.rules:
+            self.globs.setdefault(rule.glob, []).append(rule)
+
+        self._matchers: Dict[str, Union[Automaton, Substrings]] = {}
+        self._ids: Dict[str, Dict[str, int]] = {}
+        for glob, rules in self.globs.items():
+            ids = {p.lower(): 0 for rule in rules for p in rule.patterns}
+            ids = {p: i for i, p in enumerate(ids)}
+            self._ids[glob] = ids
+            matcher = Automaton if len(ids) >= AUTOMATON_MIN_PATTERNS else Substrings
+            self._matchers[glob] = matcher(list(ids))
+
+        # Stored results depend on the rules, so they key on this
+        self.version = hashlib.sha256(repr(self.rules).encode("utf-8")).hexdigest()[:16]
+
+    def needs_content(self, glob: str) -> bool:
+        return bool(self._ids[glob])
+
+    def match(self, glob: str, text: str) -> List[Rule]:
+        """Rules for `glob` that a file with this text satisfies."""
+        _, found = self._matchers[glob].scan(text.lower())
+        ids = self._ids[glob]
+        return [r for r in self.globs[glob] if not r.patterns or any(ids[p.lower()] in found for p in r.patterns)]
+
+    def detector(self, glob: str) -> Callable[[str], bool]:
+        """
+        Stop condition for streaming a `glob` file: True once every rule for it
+        has matched, after which more text can't change the result. Called with
+        the growing text; only the new part is scanned.
+        """
+        matcher, ids, rules = self._matchers[glob], self._ids[glob], self.globs[glob]
+        wanted = [{ids[p.lower()] for p in r.patterns} for r in rules if r.patterns]
+        seen: str = ""
+        state: Any = matcher.start
+        found: Set[int] = set()
+
+        def done(text: str) -> bool:
+            nonlocal seen, state, found
+            if not text.startswith(seen):
+                seen, state, found = "", matcher.start, set()  # a different text: start over
+            state, new = matcher.scan(text[len(seen):].lower(), state)
+            seen = text
+            found |= new
+            return all(w & found for w in wanted)
+
+        return done
+
+
+PACK = RulePack(RULES)
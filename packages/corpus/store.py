@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import json
+import time
+import shlex
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from packages.github_client.cache import CACHE_DIR
+from packages.models.schemas import RepoCandidate, RepoRef, RepoStats
+from packages.scoring.rank import TopK, score_repo
+
+CORPUS_FILE = "corpus.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    full_name TEXT PRIMARY KEY COLLATE NOCASE,
+    owner TEXT NOT NULL COLLATE NOCASE,
+    name TEXT NOT NULL,
+    url TEXT NOT NULL,
+    stars INTEGER NOT NULL,
+    forks INTEGER NOT NULL,
+    open_issues INTEGER NOT NULL,
+    pushed_at TEXT,
+    updated_at TEXT,
+    -- pushed_at as the search hit reported it; search lags the repo, so
+    -- change detection compares hits with hits
+    hit_pushed_at TEXT,
+    description TEXT,
+    topics TEXT NOT NULL,
+    license TEXT,
+    license_key TEXT COLLATE NOCASE,
+    language TEXT COLLATE NOCASE,
+    search_text TEXT NOT NULL,
+    crawled_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS repos_stars ON repos (stars);
+CREATE INDEX IF NOT EXISTS repos_language ON repos (language, stars);
+CREATE INDEX IF NOT EXISTS repos_owner ON repos (owner);
+CREATE INDEX IF NOT EXISTS repos_pushed_at ON repos (pushed_at);
+
+CREATE TABLE IF NOT EXISTS topics (
+    full_name TEXT NOT NULL COLLATE NOCASE,
+    topic TEXT NOT NULL COLLATE NOCASE,
+    PRIMARY KEY (topic, full_name)
+) WITHOUT ROWID;
+"""
+
+_COLUMNS = (
+    "full_name, owner, name, url, stars, forks, open_issues, pushed_at, updated_at, hit_pushed_at, "
+    "description, topics, license, license_key, language, search_text, crawled_at"
+)
+
+# qualifier -> (column, kind)
+_RANGE_QUALIFIERS = {
+    "stars": ("stars", int),
+    "forks": ("forks", int),
+    "pushed": ("pushed_at", str),
+    "updated": ("updated_at", str),
+}
+_EQUAL_QUALIFIERS = {
+    "language": "language",
+    "license": "license_key",
+    "user": "owner",
+    "org": "owner",
+}
+
+
+def _range_bound(value: str, kind: type, upper: bool) -> Any:
+    # Date-only bounds cover the whole day, like GitHub's search syntax
+    if kind is str and upper and "T" not in value:
+        return value + "T23:59:59Z"
+    return kind(value)
+
+
+def _range_clause(column: str, kind: type, value: str) -> Tuple[str, List[Any]]:
+    if ".." in value:
+        low, high = value.split("..", 1)
+        clauses, params = [], []
+        if low != "*":
+            clauses.append(f"{column} >= ?")
+            params.append(_range_bound(low, kind, upper=False))
+        if high != "*":
+            clauses.append(f"{column} <= ?")
+            params.append(_range_bound(high, kind, upper=True))
+        return " AND ".join(clauses) or "1", params
+
+    for op, upper in ((">=", False), ("<=", True), (">", True), ("<", False)):
+        if value.startswith(op):
+            return f"{column} {op} ?", [_range_bound(value[len(op):], kind, upper)]
+    if kind is str:
+        return f"{column} >= ? AND {column} <= ?", [value, _range_bound(value, kind, upper=True)]
+    return f"{column} = ?", [kind(value)]
+
+
+def parse_query(query: str) -> Tuple[str, List[Any]]:
+    """
+    Translates the subset of GitHub's repository search syntax the corpus
+    stores into a SQL WHERE clause: free-text terms (matched against name,
+    description and topics), `language:`, `topic:`, `license:`, `user:`,
+    `org:` and `stars:`/`forks:`/`pushed:`/`updated:` ranges.
+    Raises ValueError on other qualifiers.
+    """
+    clauses: List[str] = []
+    params: List[Any] = []
+    for token in shlex.split(query):
+        qualifier, sep, value = token.partition(":")
+        if not sep or not value:
+            clauses.append("search_text LIKE ?")
+            params.append(f"%{token.lower()}%")
+            continue
+
+        qualifier = qualifier.lower()
+        try:
+            if qualifier in _RANGE_QUALIFIERS:
+                column, kind = _RANGE_QUALIFIERS[qualifier]
+                clause, values = _range_clause(column, kind, value)
+            elif qualifier in _EQUAL_QUALIFIERS:
+                clause, values = f"{_EQUAL_QUALIFIERS[qualifier]} = ?", [value]
+            elif qualifier == "topic":
+                clause, values = "full_name IN (SELECT full_name FROM topics WHERE topic = ?)", [value]
+            else:
+                raise ValueError(f"qualifier not supported offline: {qualifier}:")
+        except ValueError as err:
+            raise ValueError(f"bad search term {token!r}: {err}") from err
+        clauses.append(clause)
+        params.extend(values)
+
+    return " AND ".join(clauses) or "1", params
+
+
+class Corpus:
+    """
+    Local SQLite store of normalized repository records, filled by
+    `scout crawl` and queried by `scout search --offline`.
+
+    Each row keeps the `pushed_at`/`updated_at` its search hit reported at
+    crawl time so the next crawl only re-fetches repos that changed.
+    """
+
+    def __init__(self, path: Path | str | None = None) -> None:
+        self.path = Path(path) if path is not None else CACHE_DIR / CORPUS_FILE
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def versions(self, full_names: Iterable[str]) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """(pushed_at, updated_at) last seen in search hits for each of `full_names` already stored."""
+        names = list(full_names)
+        out: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        with self._lock:
+            db = self._db()
+            # stay under SQLite's bound-parameter limit
+            for i in range(0, len(names), 500):
+                chunk = names[i:i + 500]
+                rows = db.execute(
+                    f"SELECT full_name, hit_pushed_at, updated_at FROM repos WHERE full_name IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                for full_name, pushed_at, updated_at in rows:
+                    out[full_name] = (pushed_at, updated_at)
+        # callers look names up as given, whatever their case
+        lowered = {k.lower(): v for k, v in out.items()}
+        return {n: lowered[n.lower()] for n in names if n.lower() in lowered}
+
+    def upsert(self, records: List[Tuple[Dict[str, Any], RepoStats]]) -> None:
+        """Stores (search item, stats) pairs; the item supplies identity and crawl-only fields."""
+        now = time.time()
+        rows = []
+        for item, stats in records:
+            name = item["name"]
+            rows.append((
+                item["full_name"],
+                item["owner"]["login"],
+                name,
+                item["html_url"],
+                stats.stars,
+                stats.forks,
+                stats.open_issues,
+                stats.pushed_at,
+                item.get("updated_at"),
+                item.get("pushed_at"),
+                stats.description,
+                json.dumps(stats.topics),
+                stats.license,
+                (item.get("license") or {}).get("key"),
+                item.get("language"),
+                " ".join([name, stats.description or "", *stats.topics]).lower(),
+                now,
+            ))
+
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.executemany(
+                    f"INSERT OR REPLACE INTO repos ({_COLUMNS}) VALUES ({','.join('?' * 17)})",
+                    rows,
+                )
+                db.executemany("DELETE FROM topics WHERE full_name = ?", [(item["full_name"],) for item, _ in records])
+                db.executemany(
+                    "INSERT OR IGNORE INTO topics (full_name, topic) VALUES (?, ?)",
+                    [(item["full_name"], t) for item, stats in records for t in stats.topics],
+                )
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+
+    def touch(self, full_names: List[str]) -> None:
+        """Marks unchanged repos as seen by this crawl."""
+        with self._lock:
+            self._db().executemany(
+                "UPDATE repos SET crawled_at = ? WHERE full_name = ?",
+                [(time.time(), n) for n in full_names],
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db().execute("SELECT COUNT(*) FROM repos").fetchone()[0]
+
+    def search(self, query: str, top_n: int = 10) -> List[RepoCandidate]:
+        """Repos matching `query`, ranked with score_repo; no network involved."""
+        where, params = parse_query(query)
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT owner, name, full_name, url, stars, forks, open_issues, pushed_at, "
+                f"description, topics, license FROM repos WHERE {where} ORDER BY stars DESC, full_name",
+                params,
+            ).fetchall()
+
+        top = TopK(top_n)
+        for owner, name, full_name, url, stars, forks, open_issues, pushed_at, description, topics, license in rows:
+            # rows were validated on the way in
+            stats = RepoStats.model_construct(
+                stars=stars,
+                forks=forks,
+                open_issues=open_issues,
+                pushed_at=pushed_at,
+                description=description,
+                topics=json.loads(topics),
+                license=license,
+            )
+            score, reasons = score_repo(stats)
+            if top.threshold is not None and score <= top.threshold:
+                continue
+            ref = RepoRef(owner=owner, name=name, full_name=full_name, url=url)
+            top.push(RepoCandidate(repo=ref, stats=stats, score=score, reasons=reasons))
+        return top.results()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
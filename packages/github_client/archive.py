@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import io
+import queue
+import asyncio
+import tarfile
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+
+from packages.github_client.snapshot import RepoSnapshot, TreeEntry
+
+# Members larger than this are listed but their content is not kept
+DEFAULT_MAX_MEMBER_BYTES = 512 * 1024
+# Total text kept in memory per archive
+DEFAULT_MAX_TEXT_BYTES = 32 * 1024 * 1024
+# Give up on the archive (and fall back to the tree API) past this download size
+DEFAULT_MAX_ARCHIVE_BYTES = 256 * 1024 * 1024
+
+
+class ArchiveTooLarge(Exception):
+    pass
+
+
+@dataclass
+class RepoArchive(RepoSnapshot):
+    """
+    RepoSnapshot answered entirely from the repo's tarball.
+
+    Every regular file is listed; text content is kept for members under the
+    per-member cap, so presence checks and manifest reads need no requests.
+    """
+
+    texts: Dict[str, str] = field(default_factory=dict)
+
+    async def read_text(self, path: str, until: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        if path not in self.files:
+            return None
+        text = self.texts.get(path)
+        if text is None:
+            # listed but over the member cap: fetch it the usual way
+            return await self.gh.get_file_text(self.full_name, path, until=until)
+        return text or None
+
+
+class ChunkReader(io.RawIOBase):
+    """
+    Blocking file object over chunks fed from the event loop (None marks EOF).
+    Lets tarfile's stream mode consume an async download from a worker thread.
+
+    `feed` waits while `max_chunks` are queued and unread, so the download
+    stays at most that far ahead of parsing without blocking any thread.
+    Create it on the loop that feeds it.
+    """
+
+    def __init__(self, max_chunks: int = 16) -> None:
+        self.chunks: "queue.Queue[Optional[bytes]]" = queue.Queue()
+        self.buffer = b""
+        self.eof = False
+        self._loop = asyncio.get_running_loop()
+        self._room = asyncio.Semaphore(max_chunks)
+
+    async def feed(self, chunk: bytes) -> None:
+        await self._room.acquire()
+        self.chunks.put_nowait(chunk)
+
+    def feed_eof(self) -> None:
+        self.chunks.put_nowait(None)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:  # type: ignore[no-untyped-def]
+        while not self.buffer and not self.eof:
+            chunk = self.chunks.get()
+            if chunk is None:
+                self.eof = True
+            else:
+                self.buffer = chunk
+                try:
+                    self._loop.call_soon_threadsafe(self._room.release)
+                except RuntimeError:
+                    pass  # the loop is closed: nothing is feeding any more
+        n = min(len(b), len(self.buffer))
+        b[:n] = self.buffer[:n]
+        self.buffer = self.buffer[n:]
+        return n
+
+
+def scan_tarball(
+    fileobj: io.RawIOBase,
+    max_member_bytes: int = DEFAULT_MAX_MEMBER_BYTES,
+    max_text_bytes: int = DEFAULT_MAX_TEXT_BYTES,
+) -> Tuple[Dict[str, TreeEntry], Dict[str, str], str]:
+    """
+    Reads a gzipped tarball sequentially, without touching disk.
+    Returns (files, texts, commit_sha); paths have the archive's top-level
+    directory stripped.
+    """
+    files: Dict[str, TreeEntry] = {}
+    texts: Dict[str, str] = {}
+    kept = 0
+
+    with tarfile.open(fileobj=io.BufferedReader(fileobj), mode="r|gz") as tf:
+        for member in tf:
+            if not member.isfile():
+                continue
+            _, _, path = member.name.partition("/")
+            if not path:
+                continue
+            files[path] = TreeEntry(sha="", size=member.size)
+
+            if member.size > max_member_bytes or kept + member.size > max_text_bytes:
+                continue
+            f = tf.extractfile(member)
+            if f is None:
+                continue
+            data = f.read()
+            # binary files are recorded as empty so they are never fetched
+            texts[path] = "" if b"\0" in data[:1024] else data.decode("utf-8", errors="ignore")
+            kept += member.size
+
+        # git archive stores the commit id in the global pax header
+        commit_sha = tf.pax_headers.get("comment", "")
+
+    return files, texts, commit_sha
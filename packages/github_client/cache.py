@@ -1,43 +1,219 @@
 from __future__ import annotations
 
+import os
 import json
 import time
-import hashlib
+import zlib
+import sqlite3
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Optional, Tuple
 
 
-CACHE_DIR = Path(".cache")
-CACHE_DIR.mkdir(exist_ok=True)
+CACHE_DIR = Path(os.getenv("SCOUT_CACHE_DIR", ".cache"))
+CACHE_FILE = "scout.sqlite3"
 
+DEFAULT_MAX_BYTES = int(os.getenv("SCOUT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+DEFAULT_MEMORY_ITEMS = 1024
+# Payloads above this size (READMEs, trees, manifests) are zlib-compressed
+COMPRESS_MIN_BYTES = 4096
+# accessed_at is only rewritten when older than this, so reads rarely write
+TOUCH_INTERVAL = 60.0
 
-def _key_to_path(key: str) -> Path:
-    h = hashlib.sha256(key.encode("utf-8")).hexdigest()
-    return CACHE_DIR / f"{h}.json"
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    compressed INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at);
+
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta (name, value) VALUES ('total_bytes', 0);
+
+CREATE TRIGGER IF NOT EXISTS entries_ins AFTER INSERT ON entries BEGIN
+    UPDATE meta SET value = value + NEW.size WHERE name = 'total_bytes';
+END;
+CREATE TRIGGER IF NOT EXISTS entries_del AFTER DELETE ON entries BEGIN
+    UPDATE meta SET value = value - OLD.size WHERE name = 'total_bytes';
+END;
+CREATE TRIGGER IF NOT EXISTS entries_upd AFTER UPDATE OF size ON entries BEGIN
+    UPDATE meta SET value = value - OLD.size + NEW.size WHERE name = 'total_bytes';
+END;
+"""
+
+
+class Cache:
+    """
+    Two-tier key/value cache: an in-process LRU in front of a single SQLite file.
+
+    The SQLite tier runs in WAL mode with a busy timeout, so several processes
+    can share one file. Its total payload size is kept under `max_bytes` by
+    dropping expired entries first and then the least recently used ones.
+    Values must be JSON-serializable. `get` can return the memory tier's own
+    object, shared with later callers, so treat values as read-only.
+    """
+
+    def __init__(
+        self,
+        path: Path | str | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        memory_items: int = DEFAULT_MEMORY_ITEMS,
+        compress_min_bytes: int = COMPRESS_MIN_BYTES,
+    ) -> None:
+        self.path = Path(path) if path is not None else CACHE_DIR / CACHE_FILE
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.compress_min_bytes = compress_min_bytes
+
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, Tuple[Optional[float], Any]] = OrderedDict()
+        self._conn: sqlite3.Connection | None = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path,
+                timeout=30.0,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _remember(self, key: str, expires_at: Optional[float], value: Any) -> None:
+        if self.memory_items <= 0:
+            return
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                expires_at, value = hit
+                if expires_at is None or now <= expires_at:
+                    self._memory.move_to_end(key)
+                    return value
+                del self._memory[key]
+
+            try:
+                db = self._db()
+                row = db.execute(
+                    "SELECT value, compressed, expires_at, accessed_at FROM entries WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row is None:
+                    return None
+
+                blob, compressed, expires_at, accessed_at = row
+                if expires_at is not None and now > expires_at:
+                    db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    return None
+                if now - accessed_at > TOUCH_INTERVAL:
+                    db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+
+                raw = zlib.decompress(blob) if compressed else blob
+                value = json.loads(raw)
+            except Exception:
+                return None
+
+            self._remember(key, expires_at, value)
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: int = 3600) -> None:
+        now = time.time()
+        expires_at = now + ttl_seconds if ttl_seconds else None
+
+        raw = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        compressed = len(raw) >= self.compress_min_bytes
+        blob = zlib.compress(raw, 6) if compressed else raw
+
+        with self._lock:
+            self._remember(key, expires_at, value)
+            db = self._db()
+            # An upsert, not INSERT OR REPLACE: REPLACE's implicit delete doesn't
+            # fire entries_del, which left the old size counted in total_bytes.
+            db.execute(
+                "INSERT INTO entries (key, value, compressed, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, compressed = excluded.compressed, "
+                "size = excluded.size, expires_at = excluded.expires_at, accessed_at = excluded.accessed_at",
+                (key, blob, int(compressed), len(blob), expires_at, now),
+            )
+            total = db.execute("SELECT value FROM meta WHERE name = 'total_bytes'").fetchone()[0]
+            if total > self.max_bytes:
+                self._evict(db, now)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+            self._db().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._db().execute("DELETE FROM entries")
+
+    def _evict(self, db: sqlite3.Connection, now: float) -> None:
+        # Shrink to 90% of the budget so eviction doesn't run on every write.
+        target = int(self.max_bytes * 0.9)
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at < ?", (now,))
+            total = db.execute("SELECT value FROM meta WHERE name = 'total_bytes'").fetchone()[0]
+            if total > target:
+                cursor = db.execute("SELECT key, size FROM entries ORDER BY accessed_at")
+                victims = []
+                for key, size in cursor:
+                    if total <= target:
+                        break
+                    victims.append((key,))
+                    total -= size
+                cursor.close()
+                db.executemany("DELETE FROM entries WHERE key = ?", victims)
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        # Another process may still hold a copy; that's fine for a cache.
+        self._memory.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+
+
+_default: Cache | None = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> Cache:
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = Cache()
+    return _default
 
 
 def get(key: str) -> Optional[Any]:
-    path = _key_to_path(key)
-    if not path.exists():
-        return None
-
-    try:
-        with path.open("r", encoding="utf-8") as f:
-            payload = json.load(f)
-        expires_at = payload.get("expires_at")
-        if expires_at is not None and time.time() > expires_at:
-            path.unlink(missing_ok=True)
-            return None
-        return payload.get("value")
-    except Exception:
-        return None
+    return default_cache().get(key)
 
 
 def set(key: str, value: Any, ttl_seconds: int = 3600) -> None:
-    path = _key_to_path(key)
-    payload = {
-        "expires_at": time.time() + ttl_seconds if ttl_seconds else None,
-        "value": value,
-    }
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(payload, f)
+    default_cache().set(key, value, ttl_seconds=ttl_seconds)
@@ -1,12 +1,38 @@
 from __future__ import annotations
 
 import os
+import time
+import asyncio
 import base64
-from typing import List, Dict, Optional
+import codecs
+import hashlib
+import importlib.util
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, List, Dict, Optional, Tuple
+from urllib.parse import urlencode
 
 import httpx
 from dotenv import load_dotenv
 
+from packages.github_client import cache
+from packages.github_client.archive import (
+    DEFAULT_MAX_ARCHIVE_BYTES,
+    DEFAULT_MAX_MEMBER_BYTES,
+    ArchiveTooLarge,
+    ChunkReader,
+    RepoArchive,
+    scan_tarball,
+)
+from packages.github_client.ratelimit import (
+    ANONYMOUS_LIMITS,
+    AUTHENTICATED_LIMITS,
+    RateLimitScheduler,
+    priority_for,
+    resource_for,
+)
+from packages.github_client.snapshot import RepoHead, RepoSnapshot
+from packages.tracing import trace
 from packages.models.schemas import RepoRef, RepoStats
 
 load_dotenv()
@@ -14,71 +40,627 @@ load_dotenv()
 GITHUB_API = "https://api.github.com"
 TOKEN = os.getenv("GITHUB_TOKEN")
 
+DEFAULT_CONCURRENCY = 8
+
+# Freshness window per endpoint family. Past it, entries are revalidated with
+# If-None-Match / If-Modified-Since; a 304 does not count against the rate limit.
+CACHE_TTLS: Dict[str, int] = {
+    "search": 10 * 60,
+    "repo": 60 * 60,
+    "contents": 6 * 60 * 60,
+    "issues": 15 * 60,
+    "git": 7 * 24 * 60 * 60,  # commits/trees addressed by SHA never change
+}
+# How long an entry is kept for revalidation after it goes stale
+CACHE_RETENTION = 30 * 24 * 60 * 60
+
+# GitHub search never returns more than this many results for one query
+SEARCH_RESULT_CAP = 1000
+SEARCH_PAGE_SIZE = 100
+
+# Identical GETs within this many seconds are answered from the client's
+# in-memory memo, without touching the cache or the network
+MEMO_TTL = 60.0
+MEMO_MAX_ENTRIES = 512
+# Idle keep-alive connections are closed after this many seconds
+KEEPALIVE_EXPIRY = 30.0
+# HTTP/2 multiplexes concurrent requests over one connection; needs the h2
+# package (pip install "opensource-scout[http2]")
+HTTP2 = importlib.util.find_spec("h2") is not None
+# File contents are read as raw bytes (no JSON/base64 envelope), and only up
+# to a budget: summaries use the README's first 8000 characters and manifest
+# checks are substring tests, so a huge or generated file needn't be read whole.
+RAW_MEDIA_TYPE = "application/vnd.github.raw+json"
+README_BYTES = 64 * 1024
+FILE_TEXT_BYTES = 256 * 1024
+# Hop-by-hop/encoding headers that don't describe an already-decoded body
+_FRAMING_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+# Repositories per GraphQL enrichment request (aliases in one query)
+GRAPHQL_BATCH = 50
+
+_GRAPHQL_REPO_FIELDS = """
+fragment RepoFields on Repository {
+  stargazerCount
+  forkCount
+  pushedAt
+  description
+  issues(states: OPEN) { totalCount }
+  pullRequests(states: OPEN) { totalCount }
+  repositoryTopics(first: 20) { nodes { topic { name } } }
+  licenseInfo { name }
+}
+"""
+
+
+async def _stop(task: asyncio.Task) -> Optional[BaseException]:
+    """Cancels `task` unless it's done and waits for it; returns what it raised, if anything."""
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    return None if task.cancelled() else task.exception()
+
+
+def _remaining(r: httpx.Response) -> Optional[int]:
+    value = r.headers.get("x-ratelimit-remaining")
+    return int(value) if value and value.isdigit() else None
+
+
+def repo_stats_from_json(data: Dict[str, Any]) -> RepoStats:
+    """Map a REST repository object (from /repos/{name} or a search hit) to RepoStats."""
+    return RepoStats(
+        stars=data.get("stargazers_count", 0),
+        forks=data.get("forks_count", 0),
+        open_issues=data.get("open_issues_count", 0),
+        pushed_at=data.get("pushed_at"),
+        description=data.get("description"),
+        topics=data.get("topics", []),
+        license=(data.get("license") or {}).get("name"),
+    )
+
+
+def _copy(r: httpx.Response) -> httpx.Response:
+    """A fresh Response with the same (decoded) body, for another caller."""
+    headers = [(k, v) for k, v in r.headers.multi_items() if k.lower() not in _FRAMING_HEADERS]
+    return httpx.Response(r.status_code, headers=headers, content=r.content, request=r.request)
+
+
+def _endpoint_family(url: str) -> str:
+    parts = url.strip("/").split("/")
+    if parts[0] == "search":
+        return "search"
+    if parts[0] == "repos" and len(parts) > 3:
+        if parts[3] in ("contents", "readme"):
+            return "contents"
+        if parts[3] == "issues":
+            return "issues"
+        if parts[3] == "git" and len(parts) > 4 and parts[4] in ("commits", "trees"):
+            return "git"
+    return "repo"
+
 
 class GitHubClient:
-    def __init__(self) -> None:
+    """
+    Async GitHub REST client.
+
+    All requests go through `_get`, which serves them from the on-disk cache
+    when possible. Network requests are admitted by a rate-limit scheduler
+    (per-resource token buckets, search before analysis) and bounded in
+    flight so that concurrent agents can share one client safely.
+
+    GETs are also single-flighted: a request already in flight is joined
+    rather than sent again, and its response is memoized for MEMO_TTL
+    seconds. `saved` counts the requests answered that way.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        use_cache: bool = True,
+        cache_ttls: Optional[Dict[str, int]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
         headers = {
             "Accept": "application/vnd.github+json",
         }
         if TOKEN:
             headers["Authorization"] = f"Bearer {TOKEN}"
 
-        self.client = httpx.Client(base_url=GITHUB_API, headers=headers, timeout=30.0)
+        self.headers = headers
+        self.concurrency = max(1, concurrency)
+        self.use_cache = use_cache
+        self.cache_ttls = {**CACHE_TTLS, **(cache_ttls or {})}
+        # Keep entries fetched with different tokens apart (private repos)
+        self._cache_ns = hashlib.sha256(TOKEN.encode("utf-8")).hexdigest()[:12] if TOKEN else "anon"
+        self.scheduler = RateLimitScheduler(dict(AUTHENTICATED_LIMITS if TOKEN else ANONYMOUS_LIMITS))
+        # Replaces the network, e.g. with a replay transport in benchmarks
+        self.transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._sem: asyncio.Semaphore | None = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._memo: OrderedDict[str, Tuple[float, httpx.Response]] = OrderedDict()
+        self.saved: Dict[str, int] = {"memo": 0, "joined": 0}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created lazily so the client binds to the running event loop.
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=GITHUB_API,
+                headers=self.headers,
+                timeout=30.0,
+                limits=httpx.Limits(
+                    max_connections=self.concurrency,
+                    max_keepalive_connections=self.concurrency,
+                    keepalive_expiry=KEEPALIVE_EXPIRY,
+                ),
+                http2=HTTP2,
+                transport=self.transport,
+            )
+            self._sem = asyncio.Semaphore(self.concurrency)
+        return self._client
+
+    async def aclose(self) -> None:
+        for fut in self._inflight.values():
+            fut.cancel()
+        self._inflight.clear()
+        self._memo.clear()
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._sem = None
+        if self.scheduler.shared is not None:
+            await self.scheduler.shared.aclose()
+
+    async def __aenter__(self) -> "GitHubClient":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.aclose()
+
+    async def _request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Send one request through the rate-limit scheduler.
+        Throttling responses (403/429 rate limits, 502-504) are retried with backoff.
+        """
+        client = self.client
+        assert self._sem is not None
+        resource = resource_for(url)
+        priority = priority_for(url)
+
+        attempt = 0
+        while True:
+            await self.scheduler.acquire(resource, priority)
+            async with self._sem:
+                r = await client.request(method, url, **kwargs)
+            delay = self.scheduler.observe(resource, r, attempt)
+            trace.annotate(status=r.status_code, attempts=attempt + 1, ratelimit_remaining=_remaining(r))
+            if delay is None:
+                return r
+            attempt += 1
+            await self.scheduler.backoff(resource, delay)
+
+    @asynccontextmanager
+    async def _stream(self, url: str, headers: Optional[Dict[str, str]] = None) -> AsyncIterator[httpx.Response]:
+        """Streaming GET (following redirects) through the scheduler; not retried."""
+        client = self.client
+        assert self._sem is not None
+        resource = resource_for(url)
+        with trace.http("GET", url) as sp:
+            await self.scheduler.acquire(resource, priority_for(url))
+            async with self._sem:
+                async with client.stream("GET", url, headers=headers, follow_redirects=True) as r:
+                    if not r.is_success:
+                        # observe() may read an error body (secondary rate limits); they're small
+                        await r.aread()
+                    self.scheduler.observe(resource, r, self.scheduler.max_retries)
+                    sp.set(status=r.status_code, ratelimit_remaining=_remaining(r))
+                    yield r
+
+    async def _send(self, url: str, params: Optional[Dict[str, Any]], headers: Dict[str, str]) -> httpx.Response:
+        return await self._request("GET", url, params=params, headers=headers)
+
+    async def _post(self, url: str, payload: Dict[str, Any]) -> httpx.Response:
+        with trace.http("POST", url):
+            return await self._request("POST", url, json=payload)
 
-    def search_repositories(self, query: str, top_n: int = 10) -> List[Dict]:
+    async def _get(self, url: str, params: Optional[Dict[str, Any]] = None) -> httpx.Response:
+        """
+        Read-through cached GET.
+
+        Fresh entries are served without a request. Stale entries are revalidated
+        with their validators and refreshed in place on 304. Only 200 and 404
+        responses are stored. The X-Scout-Cache header on the returned response
+        tells hit / revalidated / miss apart. In front of all that, identical
+        GETs join one in-flight request or reuse its memoized response.
+        """
+        key = f"GET {url}?{urlencode(sorted((params or {}).items()))}"
+        with trace.http("GET", url) as sp:
+            memo = self._memo.get(key)
+            if memo is not None and time.monotonic() - memo[0] < MEMO_TTL:
+                self.saved["memo"] += 1
+                sp.set(status=memo[1].status_code, cache="memo")
+                return _copy(memo[1])
+
+            fut = self._inflight.get(key)
+            if fut is not None:
+                self.saved["joined"] += 1
+                # shielded: one caller giving up doesn't cancel the others' request
+                r = _copy(await asyncio.shield(fut))
+                sp.set(status=r.status_code, cache="joined")
+                return r
+
+            fut = asyncio.ensure_future(self._read_through(url, params))
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda f: self._settle(key, f))
+            r = await asyncio.shield(fut)
+            sp.set(status=r.status_code, cache=r.headers.get("X-Scout-Cache", "off"))
+            return r
+
+    def _settle(self, key: str, fut: asyncio.Future) -> None:
+        if self._inflight.get(key) is fut:
+            del self._inflight[key]
+        if fut.cancelled() or fut.exception() is not None:
+            return
+        r = fut.result()
+        if r.status_code in (200, 404):
+            self._memo[key] = (time.monotonic(), r)
+            self._memo.move_to_end(key)
+            while len(self._memo) > MEMO_MAX_ENTRIES:
+                self._memo.popitem(last=False)
+
+    async def _read_through(self, url: str, params: Optional[Dict[str, Any]]) -> httpx.Response:
+        if not self.use_cache:
+            return await self._send(url, params, {})
+
+        family = _endpoint_family(url)
+        query = urlencode(sorted((params or {}).items()))
+        key = f"gh:{self._cache_ns}:GET {url}?{query}"
+        entry = cache.get(key)
+
+        if entry is not None and time.time() - entry["fetched_at"] < self.cache_ttls[family]:
+            return self._from_entry(url, params, entry, "hit")
+
+        conditional: Dict[str, str] = {}
+        if entry is not None:
+            if entry.get("etag"):
+                conditional["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                conditional["If-Modified-Since"] = entry["last_modified"]
+
+        r = await self._send(url, params, conditional)
+
+        if r.status_code == 304 and entry is not None:
+            entry = {**entry, "fetched_at": time.time()}
+            cache.set(key, entry, ttl_seconds=CACHE_RETENTION)
+            return self._from_entry(url, params, entry, "revalidated")
+
+        if r.status_code in (200, 404):
+            cache.set(
+                key,
+                {
+                    "status": r.status_code,
+                    "body": r.text,
+                    "etag": r.headers.get("ETag"),
+                    "last_modified": r.headers.get("Last-Modified"),
+                    "link": r.headers.get("Link"),
+                    "fetched_at": time.time(),
+                },
+                ttl_seconds=CACHE_RETENTION,
+            )
+        r.headers["X-Scout-Cache"] = "miss"
+        return r
+
+    def _from_entry(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        entry: Dict[str, Any],
+        state: str,
+    ) -> httpx.Response:
+        headers = {"Content-Type": "application/json", "X-Scout-Cache": state}
+        for name, field in (("ETag", "etag"), ("Last-Modified", "last_modified"), ("Link", "link")):
+            if entry.get(field):
+                headers[name] = entry[field]
+        request = self.client.build_request("GET", url, params=params)
+        return httpx.Response(entry["status"], headers=headers, text=entry["body"], request=request)
+
+    @trace.traced("github.search_repositories", kind="github")
+    async def search_repositories(self, query: str, top_n: int = 10) -> List[Dict]:
         params = {
             "q": query,
             "sort": "stars",
             "order": "desc",
             "per_page": min(top_n, 50),
         }
-        r = self.client.get("/search/repositories", params=params)
+        r = await self._get("/search/repositories", params=params)
         r.raise_for_status()
         return r.json().get("items", [])
 
-    def get_repo(self, full_name: str) -> RepoStats:
-        r = self.client.get(f"/repos/{full_name}")
+    async def iter_search_pages(
+        self,
+        url: str,
+        params: Dict[str, Any],
+        max_results: int = SEARCH_RESULT_CAP,
+    ) -> AsyncIterator[Dict]:
+        """
+        Yields search items page by page, following the Link: rel="next" header.
+        Stops at max_results or GitHub's 1000-result ceiling, whichever is lower.
+        """
+        params = {**params, "per_page": SEARCH_PAGE_SIZE}
+        remaining = min(max_results, SEARCH_RESULT_CAP)
+        next_url: Optional[str] = url
+        while next_url and remaining > 0:
+            r = await self._get(next_url, params=params)
+            r.raise_for_status()
+            items = r.json().get("items", [])
+            for item in items[:remaining]:
+                yield item
+            remaining -= len(items)
+
+            link = r.links.get("next")
+            if not items or not link:
+                break
+            nxt = httpx.URL(link["url"])
+            next_url, params = nxt.path, dict(nxt.params)
+
+    async def iter_search_repositories(self, query: str, max_results: int = SEARCH_RESULT_CAP) -> AsyncIterator[Dict]:
+        """
+        Streams repository search results sorted by stars, past the 1000-result
+        ceiling when needed.
+
+        Each slice is capped at 1000 results; the next slice continues the query
+        with `stars:<=N`, N being the lowest star count seen so far, skipping
+        repos already yielded at the boundary. Queries that already carry a
+        `stars:` qualifier are not sliced.
+        """
+        # Only repos at the current lowest star count can show up again in the
+        # next slice, so that's all we remember.
+        boundary: set[str] = set()
+        lowest: Optional[int] = None
+        yielded = 0
+        sliceable = "stars:" not in query
+
+        while yielded < max_results:
+            q = query if lowest is None else f"{query} stars:<={lowest}"
+            params = {"q": q, "sort": "stars", "order": "desc"}
+            fetched = new = 0
+            async for item in self.iter_search_pages("/search/repositories", params):
+                fetched += 1
+                stars = item.get("stargazers_count", 0)
+                if item["full_name"] in boundary:
+                    continue
+                if stars != lowest:
+                    lowest = stars
+                    boundary = set()
+                boundary.add(item["full_name"])
+                new += 1
+                yielded += 1
+                yield item
+                if yielded >= max_results:
+                    return
+
+            # A slice smaller than the cap is the end of the result set; a slice
+            # with nothing new means one star count fills the whole window.
+            if not sliceable or fetched < SEARCH_RESULT_CAP or new == 0:
+                return
+
+    @trace.traced("github.get_repo", kind="github")
+    async def get_repo(self, full_name: str) -> RepoStats:
+        r = await self._get(f"/repos/{full_name}")
         r.raise_for_status()
-        data = r.json()
+        return repo_stats_from_json(r.json())
 
-        return RepoStats(
-            stars=data.get("stargazers_count", 0),
-            forks=data.get("forks_count", 0),
-            open_issues=data.get("open_issues_count", 0),
-            pushed_at=data.get("pushed_at"),
-            description=data.get("description"),
-            topics=data.get("topics", []),
-            license=(data.get("license") or {}).get("name"),
-        )
+    @trace.traced("github.get_repos", kind="github")
+    async def get_repos(self, full_names: List[str]) -> Dict[str, RepoStats]:
+        """
+        Stats for many repos at once.
+
+        Uses aliased GraphQL queries (GRAPHQL_BATCH repos per request) when a
+        token is configured. Repos GraphQL can't answer, including those in a
+        failed batch, are fetched one by one over REST.
+        """
+        out: Dict[str, RepoStats] = {}
+        pending = list(dict.fromkeys(full_names))
+
+        if self.use_cache:
+            for name in list(pending):
+                hit = cache.get(self._stats_key(name))
+                if hit is not None:
+                    out[name] = RepoStats(**hit)
+                    pending.remove(name)
+
+        if TOKEN and pending:
+            batches = [pending[i:i + GRAPHQL_BATCH] for i in range(0, len(pending), GRAPHQL_BATCH)]
+            results = await asyncio.gather(*(self._graphql_repos(b) for b in batches), return_exceptions=True)
+            for found in results:
+                # A failed batch leaves just its own repos to the REST path
+                if isinstance(found, (httpx.HTTPError, KeyError, ValueError)):
+                    continue
+                if isinstance(found, BaseException):
+                    raise found
+                for name, stats in found.items():
+                    out[name] = stats
+                    if self.use_cache:
+                        cache.set(self._stats_key(name), stats.model_dump(), ttl_seconds=self.cache_ttls["repo"])
+            pending = [n for n in pending if n not in out]
+
+        # REST fallback
+        rest = await asyncio.gather(*(self.get_repo(n) for n in pending))
+        out.update(zip(pending, rest))
+
+        return {n: out[n] for n in full_names}
+
+    def _stats_key(self, full_name: str) -> str:
+        return f"gh:{self._cache_ns}:stats {full_name}"
+
+    async def _graphql_repos(self, full_names: List[str]) -> Dict[str, RepoStats]:
+        var_defs: List[str] = []
+        fields: List[str] = []
+        variables: Dict[str, str] = {}
+        for i, name in enumerate(full_names):
+            owner, repo = name.split("/", 1)
+            var_defs.append(f"$o{i}: String!, $n{i}: String!")
+            fields.append(f"r{i}: repository(owner: $o{i}, name: $n{i}) {{ ...RepoFields }}")
+            variables[f"o{i}"] = owner
+            variables[f"n{i}"] = repo
+
+        query = f"query({', '.join(var_defs)}) {{\n  " + "\n  ".join(fields) + "\n}\n" + _GRAPHQL_REPO_FIELDS
+        r = await self._post("/graphql", {"query": query, "variables": variables})
+        r.raise_for_status()
+        data = r.json().get("data") or {}
+
+        out: Dict[str, RepoStats] = {}
+        for i, name in enumerate(full_names):
+            node = data.get(f"r{i}")
+            if not node:
+                # not found / no access: leave it to the REST path
+                continue
+            out[name] = RepoStats(
+                stars=node.get("stargazerCount", 0),
+                forks=node.get("forkCount", 0),
+                # REST open_issues_count includes open PRs
+                open_issues=node["issues"]["totalCount"] + node["pullRequests"]["totalCount"],
+                pushed_at=node.get("pushedAt"),
+                description=node.get("description"),
+                topics=[t["topic"]["name"] for t in node["repositoryTopics"]["nodes"]],
+                license=(node.get("licenseInfo") or {}).get("name"),
+            )
+        return out
 
-    def get_languages(self, full_name: str) -> Dict[str, int]:
-        r = self.client.get(f"/repos/{full_name}/languages")
+    @trace.traced("github.get_languages", kind="github")
+    async def get_languages(self, full_name: str) -> Dict[str, int]:
+        r = await self._get(f"/repos/{full_name}/languages")
         r.raise_for_status()
         return r.json()
 
-    def get_readme(self, full_name: str) -> Optional[str]:
-        r = self.client.get(f"/repos/{full_name}/readme")
+    async def get_readme(self, full_name: str) -> Optional[str]:
+        _, text = await self.get_readme_blob(full_name)
+        return text
+
+    @trace.traced("github.get_readme_blob", kind="github")
+    async def get_readme_blob(
+        self,
+        full_name: str,
+        max_bytes: int = README_BYTES,
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        (version, text) of the README GitHub picks for the repo, at most
+        `max_bytes` of it; (None, None) if absent. The version is the raw
+        response's ETag, which changes with the content.
+        """
+        found = await self._read_raw(f"/repos/{full_name}/readme", max_bytes)
+        if found is not None:
+            return found
+        # raw read failed (throttled, server error): the JSON envelope path retries
+        r = await self._get(f"/repos/{full_name}/readme")
         if r.status_code == 404:
-            return None
+            return None, None
         r.raise_for_status()
         data = r.json()
         content = data.get("content")
         if not content:
-            return None
-        return base64.b64decode(content).decode("utf-8", errors="ignore")
+            return r.headers.get("ETag"), None
+        return r.headers.get("ETag"), base64.b64decode(content).decode("utf-8", errors="ignore")
 
-    def get_file_text(self, full_name: str, path: str) -> Optional[str]:
-        r = self.client.get(f"/repos/{full_name}/contents/{path}")
+    @trace.traced("github.get_file_text", kind="github")
+    async def get_file_text(
+        self,
+        full_name: str,
+        path: str,
+        max_bytes: int = FILE_TEXT_BYTES,
+        until: Optional[Callable[[str], bool]] = None,
+    ) -> Optional[str]:
+        """
+        Text of a file, at most `max_bytes` of it. `until` is called with the
+        text read so far; once it returns True the rest isn't downloaded.
+        """
+        found = await self._read_raw(f"/repos/{full_name}/contents/{path}", max_bytes, until)
+        if found is not None:
+            return found[1] or None
+        r = await self._get(f"/repos/{full_name}/contents/{path}")
         if r.status_code == 404:
             return None
         r.raise_for_status()
         data = r.json()
-        content = data.get("content")
+        content = data.get("content") if isinstance(data, dict) else None
         if not content:
             return None
         return base64.b64decode(content).decode("utf-8", errors="ignore")
 
-    def list_issues(
+    async def _read_raw(
+        self,
+        url: str,
+        max_bytes: int,
+        until: Optional[Callable[[str], bool]] = None,
+    ) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        """
+        (ETag, text) of `url` fetched with the raw media type, decoded as it
+        streams in; (None, None) on 404. Returns None on any other status or
+        a failed stream, leaving retries and errors to the caller's JSON path.
+
+        Cache entries hold the text read and whether it is the whole file, so
+        a prefix only serves callers it is enough for.
+        """
+        key = f"gh:{self._cache_ns}:RAW {url}"
+        entry = cache.get(key) if self.use_cache else None
+        if entry is not None and not (
+            entry["status"] == 404
+            or entry["complete"]
+            or entry["bytes"] >= max_bytes
+            or (until is not None and until(entry["text"]))
+        ):
+            entry = None  # a shorter prefix than this caller needs
+        if entry is not None and time.time() - entry["fetched_at"] < self.cache_ttls["contents"]:
+            with trace.http("GET", url) as sp:
+                sp.set(status=entry["status"], cache="hit")
+            return (None, None) if entry["status"] == 404 else (entry["etag"], entry["text"])
+
+        headers = {"Accept": RAW_MEDIA_TYPE}
+        if entry is not None and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        try:
+            found = await self._stream_raw(url, headers, entry, max_bytes, until)
+        except (httpx.HTTPError, httpx.StreamError):
+            return None
+        if found is None:
+            return None
+        entry = found
+        if self.use_cache:
+            cache.set(key, entry, ttl_seconds=CACHE_RETENTION)
+        return (None, None) if entry["status"] == 404 else (entry["etag"], entry["text"])
+
+    async def _stream_raw(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        entry: Optional[Dict[str, Any]],
+        max_bytes: int,
+        until: Optional[Callable[[str], bool]],
+    ) -> Optional[Dict[str, Any]]:
+        async with self._stream(url, headers) as r:
+            if r.status_code == 304 and entry is not None:
+                trace.annotate(cache="revalidated")
+                return {**entry, "fetched_at": time.time()}
+            if r.status_code == 404:
+                return {"status": 404, "fetched_at": time.time()}
+            if r.status_code == 200:
+                etag = r.headers.get("ETag")
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+                text, read, complete = "", 0, False
+                async for chunk in r.aiter_bytes():
+                    chunk = chunk[: max_bytes - read]
+                    read += len(chunk)
+                    text += decoder.decode(chunk)
+                    if read >= max_bytes or (until is not None and until(text)):
+                        break
+                else:
+                    text += decoder.decode(b"", final=True)
+                    complete = True
+                trace.annotate(cache="miss", bytes=read, complete=complete)
+                return {"status": 200, "etag": etag, "text": text, "bytes": read, "complete": complete, "fetched_at": time.time()}
+            return None
+
+    async def list_issues(
         self,
         full_name: str,
         labels: List[str],
@@ -89,75 +671,149 @@ class GitHubClient:
             "labels": ",".join(labels),
             "per_page": min(top_n, 50),
         }
-        r = self.client.get(f"/repos/{full_name}/issues", params=params)
+        r = await self._get(f"/repos/{full_name}/issues", params=params)
         r.raise_for_status()
         return r.json()
-    
-    def list_dir(self, full_name: str, path: str) -> list[dict]:
+
+    @trace.traced("github.list_dir", kind="github")
+    async def list_dir(self, full_name: str, path: str) -> list[dict]:
         """
         List directory contents (files/folders) at a given path.
         Returns [] if path doesn't exist or isn't a directory.
         """
-        r = self.client.get(f"/repos/{full_name}/contents/{path}")
+        r = await self._get(f"/repos/{full_name}/contents/{path}")
         if r.status_code == 404:
             return []
         r.raise_for_status()
         data = r.json()
         return data if isinstance(data, list) else []
 
-    def list_repo_paths(self, full_name: str) -> list[str]:
+    @trace.traced("github.get_head", kind="github")
+    async def get_head(self, full_name: str) -> Optional[RepoHead]:
         """
-        Returns a list of all file paths in the repo (recursive) using the git tree API.
-        Correctly resolves the default branch -> commit SHA -> tree SHA.
+        Resolves the default branch -> commit SHA -> tree SHA (no tree listing).
+        None for an empty repository, which has no branch to resolve.
         """
         # Get default branch
-        r = self.client.get(f"/repos/{full_name}")
+        r = await self._get(f"/repos/{full_name}")
         r.raise_for_status()
         repo = r.json()
         branch = repo.get("default_branch", "main")
 
-        # Get branch ref -> commit SHA
-        r2 = self.client.get(f"/repos/{full_name}/git/ref/heads/{branch}")
+        # Get branch ref -> commit SHA; empty repos answer 409 (or 404)
+        r2 = await self._get(f"/repos/{full_name}/git/ref/heads/{branch}")
+        if r2.status_code in (404, 409):
+            return None
         r2.raise_for_status()
         ref = r2.json()
         commit_sha = ref["object"]["sha"]
 
         # Get commit -> tree SHA
-        r3 = self.client.get(f"/repos/{full_name}/git/commits/{commit_sha}")
+        r3 = await self._get(f"/repos/{full_name}/git/commits/{commit_sha}")
         r3.raise_for_status()
         commit = r3.json()
-        tree_sha = commit["tree"]["sha"]
+        return RepoHead(default_branch=branch, commit_sha=commit_sha, tree_sha=commit["tree"]["sha"])
+
+    @trace.traced("github.get_snapshot", kind="github")
+    async def get_snapshot(self, full_name: str, head: Optional[RepoHead] = None) -> RepoSnapshot:
+        """
+        Fetches the recursive git tree of the default branch once.
+        Pass `head` if it was already resolved with get_head. An empty
+        repository gets a snapshot with no files.
+        """
+        head = head or await self.get_head(full_name)
+        if head is None:
+            return RepoSnapshot(gh=self, full_name=full_name, default_branch="", commit_sha="", tree_sha="")
 
         # List tree recursively
-        r4 = self.client.get(f"/repos/{full_name}/git/trees/{tree_sha}", params={"recursive": "1"})
-        r4.raise_for_status()
-        tree = r4.json().get("tree", [])
-
-        return [
-            item["path"]
-            for item in tree
-            if item.get("type") == "blob" and "path" in item
-        ]
-    
-    def try_get_first_existing_text(self, full_name: str, paths: list[str]) -> tuple[str | None, str | None]:
+        r = await self._get(f"/repos/{full_name}/git/trees/{head.tree_sha}", params={"recursive": "1"})
+        r.raise_for_status()
+
+        return RepoSnapshot.from_tree(self, full_name, head.default_branch, head.commit_sha, r.json())
+
+    @trace.traced("github.get_archive", kind="github")
+    async def get_archive(
+        self,
+        full_name: str,
+        max_member_bytes: int = DEFAULT_MAX_MEMBER_BYTES,
+        max_archive_bytes: int = DEFAULT_MAX_ARCHIVE_BYTES,
+        head: Optional[RepoHead] = None,
+    ) -> RepoArchive:
+        """
+        Downloads the default branch's tarball once and indexes it in memory.
+
+        The archive is streamed through tarfile on a worker thread as it
+        arrives; nothing is extracted to disk. Raises ArchiveTooLarge past
+        max_archive_bytes so callers can fall back to get_snapshot. With
+        `head`, the archive is fetched at that commit.
+        """
+        if head is not None:
+            branch, ref = head.default_branch, head.commit_sha
+        else:
+            r = await self._get(f"/repos/{full_name}")
+            r.raise_for_status()
+            branch = ref = r.json().get("default_branch", "main")
+
+        reader = ChunkReader()
+
+        async def produce() -> None:
+            received = 0
+            try:
+                async with self._stream(f"/repos/{full_name}/tarball/{ref}") as resp:
+                    resp.raise_for_status()
+                    async for chunk in resp.aiter_bytes():
+                        received += len(chunk)
+                        if received > max_archive_bytes:
+                            raise ArchiveTooLarge(f"{full_name}: tarball exceeds {max_archive_bytes} bytes")
+                        await reader.feed(chunk)
+            finally:
+                reader.feed_eof()
+
+        producer = asyncio.create_task(produce())
+        try:
+            files, texts, commit_sha = await asyncio.to_thread(scan_tarball, reader, max_member_bytes=max_member_bytes)
+        except Exception:
+            # A failed download cuts the stream short; that's the error to report
+            failed = await _stop(producer)
+            if failed is not None:
+                raise failed
+            raise
+        finally:
+            # Parsed, unreadable or abandoned: the rest of the download isn't needed
+            await _stop(producer)
+        return RepoArchive(
+            gh=self,
+            full_name=full_name,
+            default_branch=branch,
+            commit_sha=commit_sha or (head.commit_sha if head else ""),
+            tree_sha=head.tree_sha if head else "",
+            files=files,
+            texts=texts,
+        )
+
+    async def list_repo_paths(self, full_name: str) -> list[str]:
+        """
+        Returns a list of all file paths in the repo (recursive) using the git tree API.
+        """
+        snapshot = await self.get_snapshot(full_name)
+        return snapshot.paths
+
+    async def try_get_first_existing_text(self, full_name: str, paths: list[str]) -> tuple[str | None, str | None]:
         """
         Returns (path, text) for the first path that exists and has readable text content.
         If none exist, returns (None, None).
         """
         for p in paths:
-            txt = self.get_file_text(full_name, p)
+            txt = await self.get_file_text(full_name, p)
             if txt:
                 return p, txt
         return None, None
-    
-    def search_code(self, query: str, top_n: int = 10) -> list[dict]:
+
+    @trace.traced("github.search_code", kind="github")
+    async def search_code(self, query: str, top_n: int = 10) -> list[dict]:
         """
-        GitHub code search. Example query:
+        GitHub code search, following result pages until `top_n` items
+        (at most 1000). Example query:
         'repo:langchain-ai/langchain filename:CONTRIBUTING'
         """
-        params = {"q": query, "per_page": min(top_n, 50)}
-        r = self.client.get("/search/code", params=params)
-        r.raise_for_status()
-        return r.json().get("items", [])
-
-
+        return [item async for item in self.iter_search_pages("/search/code", {"q": query}, max_results=top_n)]
@@ -0,0 +1,455 @@
+from __future__ import annotations
+
+import time
+import heapq
+import random
+import sqlite3
+import asyncio
+import threading
+import itertools
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import httpx
+
+# Priority lanes: lower runs first
+PRIORITY_HIGH = 0  # search and ranking
+PRIORITY_LOW = 1  # optional per-repo analysis fetches
+
+# (requests, window seconds) per resource class, as documented by GitHub
+AUTHENTICATED_LIMITS: Dict[str, Tuple[int, float]] = {
+    "core": (5000, 3600.0),
+    "search": (30, 60.0),
+    "code_search": (10, 60.0),
+    "graphql": (5000, 3600.0),
+}
+ANONYMOUS_LIMITS: Dict[str, Tuple[int, float]] = {
+    "core": (60, 3600.0),
+    "search": (10, 60.0),
+    "code_search": (10, 60.0),
+    "graphql": (0, 3600.0),
+}
+
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+RETRY_STATUSES = {429, 502, 503, 504}
+
+# A process leases tokens from a SharedBudget in blocks of this fraction of
+# the bucket (at least 1, at most SHARED_LEASE_MAX) and spends them locally,
+# so most requests never touch the shared file.
+SHARED_LEASE_FRACTION = 0.01
+SHARED_LEASE_MAX = 10
+# Rate-limit headers are written to the shared file at most this often,
+# unless they say the budget is exhausted
+SHARED_SYNC_INTERVAL = 1.0
+
+
+def resource_for(url: str) -> str:
+    path = url.split("?", 1)[0].rstrip("/")
+    if path.endswith("/search/code"):
+        return "code_search"
+    if "/search/" in path or path.startswith("search/"):
+        return "search"
+    if path.endswith("/graphql") or path == "graphql":
+        return "graphql"
+    return "core"
+
+
+def priority_for(url: str) -> int:
+    """Search, GraphQL enrichment and /repos/{name} feed ranking; the rest is analysis."""
+    parts = url.split("?", 1)[0].strip("/").split("/")
+    if parts[0] in ("search", "graphql"):
+        return PRIORITY_HIGH
+    if parts[0] == "repos" and len(parts) == 3:
+        return PRIORITY_HIGH
+    return PRIORITY_LOW
+
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at capacity/window.
+
+    `sync` lets the server's view (X-RateLimit-* headers) override the local
+    estimate, and `block_until` parks the bucket until a reset time.
+    """
+
+    def __init__(self, capacity: int, window: float) -> None:
+        self.capacity = float(capacity)
+        self.rate = capacity / window if window > 0 else 0.0
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self, amount: float = 1.0) -> float:
+        """Take `amount` tokens and return 0, or return how long to wait."""
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self._refill(now)
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return 0.0
+        if self.rate <= 0:
+            return BACKOFF_CAP
+        return (amount - self.tokens) / self.rate
+
+    def refund(self, amount: float = 1.0) -> None:
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def sync(self, limit: Optional[int], remaining: Optional[int], reset_epoch: Optional[float]) -> None:
+        now = time.monotonic()
+        self._refill(now)
+        if limit:
+            self.capacity = float(limit)
+        if remaining is not None:
+            self.tokens = min(self.capacity, float(remaining))
+            if remaining <= 0 and reset_epoch:
+                self.block_until(now + max(0.0, reset_epoch - time.time()))
+
+    def block_until(self, monotonic_deadline: float) -> None:
+        self.blocked_until = max(self.blocked_until, monotonic_deadline)
+
+
+class SharedBudget:
+    """
+    Token buckets kept in a SQLite file, so every process (or machine) that
+    opens the same path draws from one rate-limit budget.
+
+    Each file access is a short BEGIN IMMEDIATE transaction. Times are
+    wall-clock epochs since monotonic clocks aren't comparable across
+    processes. The file uses a rollback journal rather than WAL so it also
+    works on a shared network mount, which makes commits slow; so the
+    scheduler goes through `take`, `credit`, `sync_soon` and `block_soon`,
+    which lease tokens in blocks and run file access off the event loop.
+    """
+
+    def __init__(self, path: Path | str, limits: Dict[str, Tuple[int, float]]) -> None:
+        self.path = Path(path)
+        self.limits = dict(limits)
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        # Tokens this process has taken from the file but not spent yet
+        self._leased: Dict[str, float] = {}
+        self._synced: Dict[str, Tuple[float, Tuple[Optional[int], Optional[int], Optional[float]]]] = {}
+        self._writes: Set[asyncio.Future] = set()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "resource TEXT PRIMARY KEY, capacity REAL NOT NULL, rate REAL NOT NULL, "
+                "tokens REAL NOT NULL, updated REAL NOT NULL, blocked_until REAL NOT NULL)"
+            )
+            now = time.time()
+            for name, (capacity, window) in self.limits.items():
+                conn.execute(
+                    "INSERT OR IGNORE INTO buckets VALUES (?, ?, ?, ?, ?, 0)",
+                    (name, float(capacity), capacity / window if window > 0 else 0.0, float(capacity), now),
+                )
+            self._conn = conn
+        return self._conn
+
+    def _update(self, resource: str, fn: Callable[[float, Dict[str, float]], Any]) -> Any:
+        # Runs fn on the refilled row inside one write transaction and stores the row back
+        with self._lock:
+            conn = self._db()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT capacity, rate, tokens, updated, blocked_until FROM buckets WHERE resource = ?",
+                    (resource,),
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                now = time.time()
+                b = dict(zip(("capacity", "rate", "tokens", "updated", "blocked_until"), row))
+                b["tokens"] = min(b["capacity"], b["tokens"] + max(0.0, now - b["updated"]) * b["rate"])
+                b["updated"] = now
+                out = fn(now, b)
+                conn.execute(
+                    "UPDATE buckets SET capacity = ?, tokens = ?, updated = ?, blocked_until = ? WHERE resource = ?",
+                    (b["capacity"], b["tokens"], b["updated"], b["blocked_until"], resource),
+                )
+                conn.execute("COMMIT")
+                return out
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def try_take(self, resource: str, amount: float = 1.0, upto: float = 0.0) -> Tuple[float, float]:
+        """
+        (wait, taken): like TokenBucket.try_take against the shared row, but
+        takes up to `upto` tokens when more than `amount` are available.
+        """
+
+        def take(now: float, b: Dict[str, float]) -> Tuple[float, float]:
+            if now < b["blocked_until"]:
+                return b["blocked_until"] - now, 0.0
+            if b["tokens"] >= amount:
+                taken = max(amount, min(upto, b["tokens"]))
+                b["tokens"] -= taken
+                return 0.0, taken
+            if b["rate"] <= 0:
+                return BACKOFF_CAP, 0.0
+            return (amount - b["tokens"]) / b["rate"], 0.0
+
+        found = self._update(resource, take)
+        return found if found is not None else (0.0, amount)  # unknown resource: unlimited
+
+    def _lease_size(self, resource: str) -> float:
+        capacity = self.limits.get(resource, (0, 0.0))[0]
+        return float(max(1, min(SHARED_LEASE_MAX, int(capacity * SHARED_LEASE_FRACTION))))
+
+    async def take(self, resource: str, amount: float = 1.0) -> float:
+        """
+        Takes `amount` tokens and returns 0, or returns how long to wait.
+        Spends this process's lease first; renewing it runs in a thread.
+        """
+        leased = self._leased.get(resource, 0.0)
+        if leased >= amount:
+            self._leased[resource] = leased - amount
+            return 0.0
+        wait, taken = await asyncio.to_thread(self.try_take, resource, amount, self._lease_size(resource))
+        if wait <= 0:
+            self._leased[resource] = self._leased.get(resource, 0.0) + taken - amount
+        return wait
+
+    def credit(self, resource: str, amount: float = 1.0) -> None:
+        """Returns tokens to this process's lease (a 304 was free)."""
+        self._leased[resource] = self._leased.get(resource, 0.0) + amount
+
+    def sync_soon(self, resource: str, limit: Optional[int], remaining: Optional[int], reset_epoch: Optional[float]) -> None:
+        """`sync` in the background, skipped while the headers are unchanged or were just written."""
+        headers = (limit, remaining, reset_epoch)
+        last = self._synced.get(resource)
+        exhausted = remaining is not None and remaining <= 0
+        if last is not None and (last[1] == headers or (not exhausted and time.monotonic() - last[0] < SHARED_SYNC_INTERVAL)):
+            return
+        self._synced[resource] = (time.monotonic(), headers)
+        self._write(self.sync, resource, limit, remaining, reset_epoch)
+
+    def block_soon(self, resource: str, epoch: float) -> None:
+        """`block_until` in the background; this process's own bucket is blocked already."""
+        self._write(self.block_until, resource, epoch)
+
+    def _write(self, fn: Callable[..., Any], *args: Any) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            fn(*args)
+            return
+        future = loop.run_in_executor(None, fn, *args)
+        self._writes.add(future)
+        future.add_done_callback(self._writes.discard)
+
+    def refund(self, resource: str, amount: float = 1.0) -> None:
+        def give(now: float, b: Dict[str, float]) -> float:
+            b["tokens"] = min(b["capacity"], b["tokens"] + amount)
+            return 0.0
+
+        self._update(resource, give)
+
+    def sync(self, resource: str, limit: Optional[int], remaining: Optional[int], reset_epoch: Optional[float]) -> None:
+        def apply(now: float, b: Dict[str, float]) -> float:
+            if limit:
+                b["capacity"] = float(limit)
+            if remaining is not None:
+                b["tokens"] = min(b["capacity"], float(remaining))
+                if remaining <= 0 and reset_epoch:
+                    b["blocked_until"] = max(b["blocked_until"], float(reset_epoch))
+            return 0.0
+
+        self._update(resource, apply)
+
+    def block_until(self, resource: str, epoch: float) -> None:
+        def block(now: float, b: Dict[str, float]) -> float:
+            b["blocked_until"] = max(b["blocked_until"], epoch)
+            return 0.0
+
+        self._update(resource, block)
+
+    async def aclose(self) -> None:
+        # Background writes hold the connection; let them land first
+        await asyncio.gather(*list(self._writes), return_exceptions=True)
+        # Unspent leases go back to the other processes
+        leased, self._leased = self._leased, {}
+        for resource, amount in leased.items():
+            if amount > 0:
+                self.refund(resource, amount)
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+@dataclass
+class ThrottleStats:
+    requests: int = 0
+    retries: int = 0
+    throttled_seconds: float = 0.0
+    remaining: Optional[int] = None
+
+
+@dataclass
+class RateLimitScheduler:
+    """
+    Admits GitHub requests per resource class (core, search, code_search,
+    graphql) in priority order, keeps each class's bucket in sync with the
+    rate-limit headers, and turns throttling responses into jittered waits.
+
+    With `shared` set, a request also needs a token from the cross-process
+    budget, so worker processes together stay within the account's limits.
+    """
+
+    limits: Dict[str, Tuple[int, float]] = field(default_factory=lambda: dict(AUTHENTICATED_LIMITS))
+    max_retries: int = MAX_RETRIES
+    shared: Optional[SharedBudget] = None
+
+    def __post_init__(self) -> None:
+        self.buckets: Dict[str, TokenBucket] = {
+            name: TokenBucket(capacity, window) for name, (capacity, window) in self.limits.items()
+        }
+        self.stats: Dict[str, ThrottleStats] = {name: ThrottleStats() for name in self.limits}
+        self._seq = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._conds: Dict[str, asyncio.Condition] = {}
+        self._waiters: Dict[str, List[list]] = {}
+
+    def _lane(self, resource: str) -> Tuple[asyncio.Condition, List[list]]:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # asyncio primitives are bound to one loop; buckets outlive it
+            self._loop = loop
+            self._conds = {}
+            self._waiters = {}
+        if resource not in self._conds:
+            self._conds[resource] = asyncio.Condition()
+            self._waiters[resource] = []
+        return self._conds[resource], self._waiters[resource]
+
+    async def acquire(self, resource: str, priority: int = PRIORITY_LOW) -> None:
+        bucket = self.buckets[resource]
+        cond, heap = self._lane(resource)
+        entry = [priority, next(self._seq)]
+        started = time.monotonic()
+
+        async with cond:
+            heapq.heappush(heap, entry)
+            cond.notify_all()
+            try:
+                while True:
+                    if heap[0] is entry:
+                        wait = bucket.try_take()
+                        if wait <= 0 and self.shared is not None:
+                            wait = await self.shared.take(resource)
+                            if wait > 0:
+                                bucket.refund()
+                        if wait <= 0:
+                            heapq.heappop(heap)
+                            cond.notify_all()
+                            break
+                        try:
+                            await asyncio.wait_for(cond.wait(), timeout=wait)
+                        except asyncio.TimeoutError:
+                            pass
+                    else:
+                        await cond.wait()
+            except BaseException:
+                if entry in heap:
+                    heap.remove(entry)
+                    heapq.heapify(heap)
+                    cond.notify_all()
+                raise
+
+        stats = self.stats[resource]
+        stats.requests += 1
+        stats.throttled_seconds += time.monotonic() - started
+
+    def observe(self, resource: str, r: httpx.Response, attempt: int) -> Optional[float]:
+        """
+        Update the bucket from a response. Returns how long to wait before
+        retrying, or None if the response should be returned as is.
+        """
+        bucket = self.buckets[resource]
+        headers = r.headers
+        remaining = _int_header(headers, "X-RateLimit-Remaining")
+        reset = _int_header(headers, "X-RateLimit-Reset")
+        limit = _int_header(headers, "X-RateLimit-Limit")
+        bucket.sync(limit, remaining, reset)
+        if self.shared is not None and (limit or remaining is not None):
+            self.shared.sync_soon(resource, limit, remaining, reset)
+        if remaining is not None:
+            self.stats[resource].remaining = remaining
+
+        if r.status_code == 304:
+            # conditional hits are free on GitHub's side
+            bucket.refund()
+            if self.shared is not None:
+                self.shared.credit(resource)
+            return None
+
+        throttled = r.status_code in RETRY_STATUSES or (r.status_code == 403 and _is_rate_limited(r))
+        if not throttled or attempt >= self.max_retries:
+            return None
+
+        retry_after = _int_header(headers, "Retry-After")
+        if retry_after is not None:
+            delay = float(retry_after)
+        elif remaining == 0 and reset:
+            delay = max(0.0, reset - time.time()) + 1.0
+        else:
+            # exponential backoff with full jitter
+            delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+        bucket.block_until(time.monotonic() + delay)
+        if self.shared is not None:
+            self.shared.block_soon(resource, time.time() + delay)
+        return delay
+
+    async def backoff(self, resource: str, delay: float) -> None:
+        stats = self.stats[resource]
+        stats.retries += 1
+        stats.throttled_seconds += delay
+        await asyncio.sleep(delay)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {
+                "requests": s.requests,
+                "retries": s.retries,
+                "throttled_seconds": round(s.throttled_seconds, 3),
+                "remaining": s.remaining if s.remaining is not None else -1,
+            }
+            for name, s in self.stats.items()
+            if s.requests
+        }
+
+
+def _int_header(headers: httpx.Headers, name: str) -> Optional[int]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except ValueError:
+        return None
+
+
+def _is_rate_limited(r: httpx.Response) -> bool:
+    if r.headers.get("X-RateLimit-Remaining") == "0" or "Retry-After" in r.headers:
+        return True
+    # secondary rate limits come back as 403 with an explanatory message
+    try:
+        message = str(r.json().get("message", "")).lower()
+    except ValueError:
+        return False
+    return "rate limit" in message
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import fnmatch
+import posixpath
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set
+
+if TYPE_CHECKING:
+    from packages.github_client.client import GitHubClient
+
+
+@dataclass
+class TreeEntry:
+    sha: str
+    size: int = 0
+
+
+@dataclass(frozen=True)
+class RepoHead:
+    """Where the default branch points; the tree SHA changes whenever any file does."""
+
+    default_branch: str
+    commit_sha: str
+    tree_sha: str
+
+
+@dataclass
+class RepoSnapshot:
+    """
+    File listing of one commit, built from a single recursive git-tree fetch.
+
+    Existence checks are answered locally, so agents only request contents
+    for files that are actually there. If GitHub truncated the tree, lookups
+    fall back to the contents API instead of reporting files as missing.
+    """
+
+    gh: "GitHubClient"
+    full_name: str
+    default_branch: str
+    commit_sha: str
+    tree_sha: str
+    files: Dict[str, TreeEntry] = field(default_factory=dict)
+    truncated: bool = False
+
+    @classmethod
+    def from_tree(
+        cls,
+        gh: "GitHubClient",
+        full_name: str,
+        default_branch: str,
+        commit_sha: str,
+        tree: dict,
+    ) -> "RepoSnapshot":
+        files = {
+            item["path"]: TreeEntry(sha=item.get("sha", ""), size=item.get("size", 0))
+            for item in tree.get("tree", [])
+            if item.get("type") == "blob" and "path" in item
+        }
+        return cls(
+            gh=gh,
+            full_name=full_name,
+            default_branch=default_branch,
+            commit_sha=commit_sha,
+            tree_sha=tree.get("sha", ""),
+            files=files,
+            truncated=bool(tree.get("truncated")),
+        )
+
+    @property
+    def paths(self) -> List[str]:
+        return list(self.files)
+
+    def exists(self, path: str) -> bool:
+        return path in self.files
+
+    def glob(self, pattern: str) -> List[str]:
+        return [p for p in self.files if fnmatch.fnmatchcase(p, pattern)]
+
+    async def has_file(self, path: str) -> bool:
+        if path in self.files or not self.truncated:
+            return path in self.files
+        # any content at all answers the question
+        return bool(await self.gh.get_file_text(self.full_name, path, until=bool))
+
+    async def dir_files(self, path: str) -> Set[str]:
+        """Lower-cased names of the files directly under `path` ("" is the root)."""
+        path = path.strip("/")
+        if self.truncated:
+            items = await self.gh.list_dir(self.full_name, path)
+            return {it.get("name", "").lower() for it in items if it.get("type") == "file"}
+        return {
+            posixpath.basename(p).lower()
+            for p in self.files
+            if posixpath.dirname(p) == path
+        }
+
+    async def read_text(self, path: str, until: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """File text; `until` may stop the download early (see GitHubClient.get_file_text)."""
+        if path not in self.files and not self.truncated:
+            return None
+        return await self.gh.get_file_text(self.full_name, path, until=until)
@@ -1,23 +1,150 @@
 from __future__ import annotations
 
 import os
-from typing import Optional
+import json
+import random
+import asyncio
+import hashlib
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 from dotenv import load_dotenv
-from openai import OpenAI
+
+from packages.github_client import cache
+from packages.github_client.ratelimit import TokenBucket
+from packages.tracing import trace
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
 
 load_dotenv()
 
+# Bump whenever the summary prompt changes; old cache entries stop matching.
+PROMPT_VERSION = "readme-summary-v1"
+SUMMARY_TTL = 90 * 24 * 60 * 60
+
+DEFAULT_MAX_IN_FLIGHT = 4
+DEFAULT_RPM = 500
+DEFAULT_TPM = 200_000
+# Rough completion size used when budgeting tokens for a summary request
+SUMMARY_COMPLETION_TOKENS = 300
+MAX_RETRIES = 5
+BACKOFF_CAP = 60.0
+
+BATCH_POLL_SECONDS = 30.0
+BATCH_DONE = {"completed", "failed", "expired", "cancelled"}
+
+
+def _summary_prompt(text: str) -> str:
+    return (
+        "You are analyzing a GitHub repository README.\n"
+        "Task:\n"
+        "1) Write a 3-5 sentence summary of what the project does.\n"
+        "2) Add one line: 'Best for:' describing the target user.\n"
+        "Rules:\n"
+        "- Use only information present in the README.\n"
+        "- If info is missing, say 'Not specified'.\n"
+        "- Do NOT invent features.\n\n"
+        "README:\n"
+        f"{text}"
+    )
+
+
+def _estimate_tokens(prompt: str) -> int:
+    # ~4 characters per token for English text is close enough for budgeting
+    return len(prompt) // 4 + SUMMARY_COMPLETION_TOKENS
+
+
+def _retry_after(err: Exception) -> Optional[float]:
+    response = getattr(err, "response", None)
+    if response is None:
+        return None
+    ms = response.headers.get("retry-after-ms")
+    if ms:
+        try:
+            return float(ms) / 1000.0
+        except ValueError:
+            pass
+    value = response.headers.get("retry-after")
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
 
 class LLMClient:
     """
     Minimal OpenAI chat client wrapper.
     Requires: OPENAI_API_KEY in your .env
+
+    Summaries are memoized in the shared on-disk cache, keyed by the hash of
+    the (truncated) README, the model and PROMPT_VERSION.
+
+    The async methods bound requests in flight, budget requests and tokens per
+    minute, and retry 429/5xx responses honouring Retry-After. `base_url` (or
+    OPENAI_BASE_URL) points them at a stub server for tests and benchmarks.
+
+    The openai package (slow to import) is loaded when a client is first
+    needed, so cached summaries and commands that never call the LLM skip it.
     """
 
-    def __init__(self, model: str = "gpt-4o-mini") -> None:
+    def __init__(
+        self,
+        model: str = "gpt-4o-mini",
+        use_cache: bool = True,
+        base_url: Optional[str] = None,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        rpm: int = DEFAULT_RPM,
+        tpm: int = DEFAULT_TPM,
+    ) -> None:
         self.model = model
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.use_cache = use_cache
+        self.base_url = base_url
+        self.max_in_flight = max(1, max_in_flight)
+        self.requests_per_minute = TokenBucket(rpm, 60.0)
+        self.tokens_per_minute = TokenBucket(tpm, 60.0)
+        self._client: Optional[OpenAI] = None
+        self._aclient: Optional[AsyncOpenAI] = None
+        self._aclient_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._sem_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def client(self) -> OpenAI:
+        if self._client is None:
+            from openai import OpenAI
+
+            self._client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), base_url=self.base_url)
+        return self._client
+
+    @property
+    def aclient(self) -> AsyncOpenAI:
+        # Its connection pool belongs to one event loop; each run gets its own
+        loop = asyncio.get_running_loop()
+        if self._aclient is None or self._aclient_loop is not loop:
+            from openai import AsyncOpenAI
+
+            # retries are handled here so they go through the RPM/TPM budget
+            self._aclient = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), base_url=self.base_url, max_retries=0)
+            self._aclient_loop = loop
+        return self._aclient
+
+    def _in_flight(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._sem is None or self._sem_loop is not loop:
+            self._sem = asyncio.Semaphore(self.max_in_flight)
+            self._sem_loop = loop
+        return self._sem
+
+    def _summary_key(self, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"llm:summary:{PROMPT_VERSION}:{self.model}:{digest}"
+
+    def _cached_summary(self, text: str) -> Optional[str]:
+        return cache.get(self._summary_key(text)) if self.use_cache else None
+
+    def _store_summary(self, text: str, summary: str) -> None:
+        if self.use_cache and summary:
+            cache.set(self._summary_key(text), summary, ttl_seconds=SUMMARY_TTL)
 
     def summarize_repo_readme(self, readme_text: str, max_chars: int = 8000) -> str:
         text = (readme_text or "").strip()
@@ -27,27 +154,155 @@ class LLMClient:
         # Keep request bounded
         text = text[:max_chars]
 
-        prompt = (
-            "You are analyzing a GitHub repository README.\n"
-            "Task:\n"
-            "1) Write a 3-5 sentence summary of what the project does.\n"
-            "2) Add one line: 'Best for:' describing the target user.\n"
-            "Rules:\n"
-            "- Use only information present in the README.\n"
-            "- If info is missing, say 'Not specified'.\n"
-            "- Do NOT invent features.\n\n"
-            "README:\n"
-            f"{text}"
-        )
+        with trace.span("llm.summarize", "llm") as sp:
+            cached = self._cached_summary(text)
+            if cached is not None:
+                sp.set(cache="hit")
+                return cached
+
+            sp.set(cache="miss")
+            resp = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "user", "content": _summary_prompt(text)},
+                ],
+                temperature=0.2,
+            )
+
+            summary = (resp.choices[0].message.content or "").strip()
+            self._store_summary(text, summary)
+            return summary
+
+    async def asummarize_repo_readme(self, readme_text: str, max_chars: int = 8000) -> str:
+        text = (readme_text or "").strip()
+        if not text:
+            return "README not found or empty."
+
+        text = text[:max_chars]
+
+        with trace.span("llm.summarize", "llm") as sp:
+            cached = self._cached_summary(text)
+            if cached is not None:
+                sp.set(cache="hit")
+                return cached
+
+            prompt = _summary_prompt(text)
+            sp.set(cache="miss", est_tokens=_estimate_tokens(prompt))
+            resp = await self._create_with_retries(
+                _estimate_tokens(prompt),
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.2,
+            )
 
-        resp = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.2,
+            summary = (resp.choices[0].message.content or "").strip()
+            self._store_summary(text, summary)
+            return summary
+
+    async def _budget(self, tokens: int) -> None:
+        tokens = min(tokens, int(self.tokens_per_minute.capacity))
+        for bucket, amount in ((self.requests_per_minute, 1), (self.tokens_per_minute, tokens)):
+            while (wait := bucket.try_take(amount)) > 0:
+                await asyncio.sleep(wait)
+
+    async def _create_with_retries(self, est_tokens: int, **kwargs: Any) -> Any:
+        from openai import APIConnectionError, APIStatusError
+
+        attempt = 0
+        while True:
+            await self._budget(est_tokens)
+            trace.annotate(attempts=attempt + 1)
+            try:
+                async with self._in_flight():
+                    return await self.aclient.chat.completions.create(**kwargs)
+            except (APIStatusError, APIConnectionError) as err:
+                status = getattr(err, "status_code", None)
+                retryable = status is None or status == 429 or status >= 500
+                if not retryable or attempt >= MAX_RETRIES:
+                    raise
+                delay = _retry_after(err)
+                if delay is None:
+                    delay = random.uniform(0, min(BACKOFF_CAP, 2 ** attempt))
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def summarize_many(
+        self,
+        readmes: List[str],
+        max_chars: int = 8000,
+        batch: bool = False,
+        poll_seconds: float = BATCH_POLL_SECONDS,
+    ) -> List[str]:
+        """
+        Summaries for many READMEs, in input order.
+
+        By default uncached READMEs are summarized concurrently within the
+        in-flight/RPM/TPM limits. With batch=True they are submitted as one
+        OpenAI Batch job instead (cheaper, but may take hours to complete);
+        READMEs the job doesn't summarize, because it failed or expired or
+        their own request did, go through the concurrent path.
+        """
+        if not batch:
+            return list(await asyncio.gather(*(self.asummarize_repo_readme(r, max_chars) for r in readmes)))
+
+        texts = [(r or "").strip()[:max_chars] for r in readmes]
+        cached = [self._cached_summary(t) if t else None for t in texts]
+        todo = {f"r{i}": t for i, t in enumerate(texts) if t and cached[i] is None}
+        summaries = await self._run_batch(todo, poll_seconds) if todo else {}
+        for custom_id, summary in summaries.items():
+            self._store_summary(todo[custom_id], summary)
+
+        async def one(i: int, text: str) -> str:
+            found = summaries.get(f"r{i}") or cached[i]
+            return found if found is not None else await self.asummarize_repo_readme(text, max_chars)
+
+        return list(await asyncio.gather(*(one(i, t) for i, t in enumerate(texts))))
+
+    async def _run_batch(self, texts: Dict[str, str], poll_seconds: float) -> Dict[str, str]:
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": self.model,
+                        "messages": [{"role": "user", "content": _summary_prompt(text)}],
+                        "temperature": 0.2,
+                    },
+                }
+            )
+            for custom_id, text in texts.items()
+        ]
+        upload = await self.aclient.files.create(
+            file=("summaries.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch",
         )
+        job = await self.aclient.batches.create(
+            input_file_id=upload.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        while job.status not in BATCH_DONE:
+            await asyncio.sleep(poll_seconds)
+            job = await self.aclient.batches.retrieve(job.id)
+
+        trace.annotate(batch_status=job.status)
+        # A failed or expired job may still have finished some requests
+        if not job.output_file_id:
+            return {}
+        output = await self.aclient.files.content(job.output_file_id)
 
-        return (resp.choices[0].message.content or "").strip()
-    
-    
+        out: Dict[str, str] = {}
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code") != 200:
+                continue
+            choices = (response.get("body") or {}).get("choices") or []
+            summary = (choices[0]["message"].get("content") or "").strip() if choices else ""
+            if summary:
+                out[record["custom_id"]] = summary
+        return out
@@ -0,0 +1,168 @@
+"""
+Columnar batch scoring with NumPy (optional dependency: `pip install .[batch]`).
+
+`score_batch` and `top_k` reproduce `score_repo` / `rank_repos` exactly:
+terms are added in the same order as the scalar code, log10 and round() run
+through Python's math on the distinct values only, and ties keep input order.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from packages.models.schemas import RepoStats
+from packages.scoring.rank import BACKLOG_ISSUES, BACKLOG_PENALTY
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_US_PER_DAY = 86_400_000_000
+# pushed_at_us value for repos without a (parseable, tz-aware) push time
+MISSING = np.iinfo(np.int64).min
+
+
+def _epoch_us(dt: datetime) -> int:
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def _parse_pushed_at(iso_ts: str | None) -> int:
+    # Same acceptance rules as rank._days_since: naive or malformed -> missing
+    if not iso_ts:
+        return MISSING
+    try:
+        dt = datetime.fromisoformat(iso_ts.replace("Z", "+00:00"))
+        if dt.utcoffset() is None:
+            return MISSING
+        return _epoch_us(dt)
+    except Exception:
+        return MISSING
+
+
+@dataclass
+class ScoreColumns:
+    stars: np.ndarray  # int64
+    pushed_at_us: np.ndarray  # int64 epoch microseconds, MISSING if unknown
+    open_issues: np.ndarray  # int64
+    has_license: np.ndarray  # bool
+    has_topics: np.ndarray  # bool
+    has_description: np.ndarray  # bool
+
+    def __len__(self) -> int:
+        return len(self.stars)
+
+    @classmethod
+    def from_stats(cls, stats: Sequence[RepoStats]) -> "ScoreColumns":
+        return cls(
+            stars=np.fromiter((s.stars for s in stats), dtype=np.int64, count=len(stats)),
+            pushed_at_us=np.fromiter((_parse_pushed_at(s.pushed_at) for s in stats), dtype=np.int64, count=len(stats)),
+            open_issues=np.fromiter((s.open_issues for s in stats), dtype=np.int64, count=len(stats)),
+            has_license=np.fromiter((bool(s.license) for s in stats), dtype=bool, count=len(stats)),
+            has_topics=np.fromiter((bool(s.topics) for s in stats), dtype=bool, count=len(stats)),
+            has_description=np.fromiter((bool(s.description) for s in stats), dtype=bool, count=len(stats)),
+        )
+
+
+def _days(cols: ScoreColumns, now_us: int) -> np.ndarray:
+    known = cols.pushed_at_us != MISSING
+    days = np.zeros(len(cols), dtype=np.int64)
+    # floor division, like timedelta.days
+    days[known] = (now_us - cols.pushed_at_us[known]) // _US_PER_DAY
+    return np.where(known, days, np.iinfo(np.int64).max)
+
+
+def _exact(values: np.ndarray, fn) -> np.ndarray:
+    """Apply a Python float function elementwise, once per distinct value."""
+    uniq, inverse = np.unique(values, return_inverse=True)
+    mapped = np.fromiter((fn(v) for v in uniq.tolist()), dtype=np.float64, count=len(uniq))
+    return mapped[inverse.reshape(-1)]
+
+
+def raw_scores(cols: ScoreColumns, now: datetime | None = None) -> np.ndarray:
+    """Unrounded scores, bit-identical to score_repo before its final round()."""
+    now_us = _epoch_us(now or datetime.now(timezone.utc))
+    days = _days(cols, now_us)
+
+    score = np.where(cols.stars > 0, _exact(cols.stars, lambda s: math.log10(s + 1) * 10), 0.0)
+    score = score + np.select([days <= 30, days <= 90, days <= 365], [10.0, 5.0, 2.0], 0.0)
+    score = score + np.where(cols.has_license, 2.0, 0.0)
+    score = score + np.where(cols.has_topics, 1.0, 0.0)
+    score = score + np.where(cols.has_description, 1.0, 0.0)
+    score = score - np.where(cols.open_issues > BACKLOG_ISSUES, BACKLOG_PENALTY, 0.0)
+    return score
+
+
+def score_batch(cols: ScoreColumns, now: datetime | None = None) -> np.ndarray:
+    """Scores for every row, equal to score_repo(...)[0]."""
+    return _exact(raw_scores(cols, now), lambda v: round(v, 2))
+
+
+@dataclass
+class BatchResult:
+    index: int
+    score: float
+    _cols: ScoreColumns
+    _now_us: int
+    _reasons: Optional[List[str]] = None
+
+    @property
+    def reasons(self) -> List[str]:
+        """Built on first access, so only the winners pay for the strings."""
+        if self._reasons is None:
+            self._reasons = _reasons(self._cols, self.index, self._now_us)
+        return self._reasons
+
+
+def _reasons(cols: ScoreColumns, i: int, now_us: int) -> List[str]:
+    # Mirrors the reason strings in score_repo
+    reasons: List[str] = []
+    stars = int(cols.stars[i])
+    if stars > 0:
+        reasons.append(f"{stars} stars")
+
+    pushed = int(cols.pushed_at_us[i])
+    if pushed != MISSING:
+        days = (now_us - pushed) // _US_PER_DAY
+        if days <= 30:
+            reasons.append("updated in last 30 days")
+        elif days <= 90:
+            reasons.append("updated in last 90 days")
+        elif days <= 365:
+            reasons.append("updated in last year")
+
+    if cols.has_license[i]:
+        reasons.append("has license")
+    if cols.has_topics[i]:
+        reasons.append("has topics")
+    if cols.has_description[i]:
+        reasons.append("has description")
+    if cols.open_issues[i] > BACKLOG_ISSUES:
+        reasons.append("large open issue backlog")
+    return reasons
+
+
+def top_k(cols: ScoreColumns, k: int, now: datetime | None = None) -> List[BatchResult]:
+    """
+    The k best rows in rank_repos order (score desc, input order on ties),
+    selected with argpartition instead of a full sort.
+    """
+    now = now or datetime.now(timezone.utc)
+    now_us = _epoch_us(now)
+    n = len(cols)
+    k = min(k, n)
+    if k <= 0:
+        return []
+
+    scores = score_batch(cols, now)
+    if k < n:
+        kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        above = np.flatnonzero(scores > kth)
+        # among rows tied with the k-th score, the earliest ones win
+        tied = np.flatnonzero(scores == kth)[: k - len(above)]
+        winners = np.concatenate([above, tied])
+    else:
+        winners = np.arange(n)
+
+    order = winners[np.lexsort((winners, -scores[winners]))]
+    return [BatchResult(index=int(i), score=float(scores[i]), _cols=cols, _now_us=now_us) for i in order]
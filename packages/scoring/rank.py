@@ -1,23 +1,33 @@
 from __future__ import annotations
 
 import math
+import heapq
+import itertools
 from datetime import datetime, timezone
-from typing import List
+from typing import List, Optional, Tuple
 
 from packages.models.schemas import RepoCandidate, RepoStats
 
 
-def _days_since(iso_ts: str | None) -> int | None:
+def _days_since(iso_ts: str | None, now: datetime | None = None) -> int | None:
     if not iso_ts:
         return None
     try:
         dt = datetime.fromisoformat(iso_ts.replace("Z", "+00:00"))
-        return (datetime.now(timezone.utc) - dt).days
+        return ((now or datetime.now(timezone.utc)) - dt).days
     except Exception:
         return None
 
 
-def score_repo(stats: RepoStats) -> tuple[float, List[str]]:
+# More open issues than this draw the backlog penalty
+BACKLOG_ISSUES = 500
+BACKLOG_PENALTY = 2.0
+# Bounds assume a search hit's stars + 1 at most grow by this factor before
+# the hit is refreshed (+3 points on the log scale)
+STAR_GROWTH = 2
+
+
+def score_repo(stats: RepoStats, now: datetime | None = None) -> tuple[float, List[str]]:
     score = 0.0
     reasons: List[str] = []
 
@@ -28,7 +38,7 @@ def score_repo(stats: RepoStats) -> tuple[float, List[str]]:
         reasons.append(f"{stats.stars} stars")
 
     # Recency
-    days = _days_since(stats.pushed_at)
+    days = _days_since(stats.pushed_at, now)
     if days is not None:
         if days <= 30:
             score += 10
@@ -54,12 +64,70 @@ def score_repo(stats: RepoStats) -> tuple[float, List[str]]:
         reasons.append("has description")
 
     # Light penalty for huge issue backlog
-    if stats.open_issues > 500:
-        score -= 2
+    if stats.open_issues > BACKLOG_ISSUES:
+        score -= BACKLOG_PENALTY
         reasons.append("large open issue backlog")
 
     return round(score, 2), reasons
 
 
+def score_bounds(stats: RepoStats, now: datetime | None = None) -> tuple[float, float]:
+    """
+    (lowest, highest) score_repo can give once `stats`, taken from a search
+    hit, are refreshed. Search hits lag the repo: stars only grow (by at most
+    STAR_GROWTH), the last push only gets more recent, and the open-issue
+    count can move either way, so the backlog term is unknown. License,
+    topics and description are taken as reported.
+    """
+    now = now or datetime.now(timezone.utc)
+    worst = stats.model_copy(update={"open_issues": max(stats.open_issues, BACKLOG_ISSUES + 1)})
+    best = stats.model_copy(
+        update={
+            "stars": (stats.stars + 1) * STAR_GROWTH - 1,
+            "pushed_at": now.isoformat(),
+            "open_issues": min(stats.open_issues, BACKLOG_ISSUES),
+        }
+    )
+    return score_repo(worst, now)[0], score_repo(best, now)[0]
+
+
 def rank_repos(candidates: List[RepoCandidate]) -> List[RepoCandidate]:
     return sorted(candidates, key=lambda c: c.score, reverse=True)
+
+
+class TopK:
+    """
+    Bounded min-heap of the k best candidates pushed so far.
+
+    Memory stays O(k) however many candidates stream through, and
+    `results()` matches `rank_repos(all_candidates)[:k]`, ties included
+    (earlier candidates win, as with the stable sort).
+    """
+
+    def __init__(self, k: int) -> None:
+        self.k = k
+        self._heap: List[Tuple[float, int, RepoCandidate]] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, candidate: RepoCandidate) -> bool:
+        """Returns True if the candidate is (for now) in the top k."""
+        # -seq: on equal scores the earlier candidate compares greater and stays
+        entry = (candidate.score, -next(self._seq), candidate)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+            return True
+        if self.k and entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+            return True
+        return False
+
+    @property
+    def threshold(self) -> Optional[float]:
+        """Score a newcomer has to beat once the heap is full."""
+        return self._heap[0][0] if self.k and len(self._heap) >= self.k else None
+
+    def results(self) -> List[RepoCandidate]:
+        return [c for _, _, c in sorted(self._heap, key=lambda e: (-e[0], -e[1]))]
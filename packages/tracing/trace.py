@@ -0,0 +1,212 @@
+"""
+Span-style tracing for a run: agents, GitHub requests and LLM calls.
+
+Tracing is off unless `enable()` was called. While it is off, `span()`
+returns a shared no-op context manager and `annotate()` returns at once,
+so instrumented code pays about one global lookup per call.
+"""
+from __future__ import annotations
+
+import re
+import json
+import time
+import functools
+import itertools
+import contextvars
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Collapses concrete GitHub URLs into endpoint templates
+_ENDPOINTS = [
+    (re.compile(r"^/repos/[^/]+/[^/]+/git/trees/[^/]+$"), "/repos/{repo}/git/trees/{sha}"),
+    (re.compile(r"^/repos/[^/]+/[^/]+/git/commits/[^/]+$"), "/repos/{repo}/git/commits/{sha}"),
+    (re.compile(r"^/repos/[^/]+/[^/]+/git/ref/.+$"), "/repos/{repo}/git/ref/{ref}"),
+    (re.compile(r"^/repos/[^/]+/[^/]+/contents(/.*)?$"), "/repos/{repo}/contents/{path}"),
+    (re.compile(r"^/repos/[^/]+/[^/]+/tarball(/.*)?$"), "/repos/{repo}/tarball/{ref}"),
+    (re.compile(r"^/repos/[^/]+/[^/]+/([a-z]+)$"), r"/repos/{repo}/\1"),
+    (re.compile(r"^/repos/[^/]+/[^/]+$"), "/repos/{repo}"),
+]
+
+
+def endpoint(method: str, path: str) -> str:
+    """Endpoint template for a request, e.g. GET /repos/{repo}/readme."""
+    path = "/" + path.split("?", 1)[0].lstrip("/")
+    for pattern, template in _ENDPOINTS:
+        if pattern.match(path):
+            return f"{method} {pattern.sub(template, path)}"
+    return f"{method} {path}"
+
+
+@dataclass
+class Span:
+    id: int
+    parent: Optional[int]
+    name: str
+    kind: str  # run | agent | http | llm
+    start: float
+    end: Optional[float] = None
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+
+class _Active:
+    """Context manager for one open span."""
+
+    __slots__ = ("tracer", "span", "token")
+
+    def __init__(self, tracer: "Tracer", span: Span) -> None:
+        self.tracer = tracer
+        self.span = span
+        self.token: Optional[contextvars.Token] = None
+
+    def set(self, **attrs: Any) -> None:
+        self.span.attrs.update(attrs)
+
+    def __enter__(self) -> "_Active":
+        self.token = _current.set(self.span)
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.span.end = time.perf_counter()
+        if exc_type is not None:
+            self.span.attrs.setdefault("error", exc_type.__name__)
+        if self.token is not None:
+            _current.reset(self.token)
+
+
+class _Noop:
+    __slots__ = ()
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_Noop":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        pass
+
+
+_NOOP = _Noop()
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("scout_span", default=None)
+
+
+class Tracer:
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+        self.origin = time.perf_counter()
+        self._ids = itertools.count(1)
+
+    def span(self, name: str, kind: str, **attrs: Any) -> _Active:
+        parent = _current.get()
+        span = Span(
+            id=next(self._ids),
+            parent=parent.id if parent else None,
+            name=name,
+            kind=kind,
+            start=time.perf_counter(),
+            attrs=attrs,
+        )
+        self.spans.append(span)
+        return _Active(self, span)
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Per-kind, per-name aggregates: count, total/max seconds and attribute tallies."""
+        out: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+        for span in self.spans:
+            row = out[span.kind].setdefault(
+                span.name,
+                {"count": 0, "total_s": 0.0, "max_s": 0.0, "status": Counter(), "cache": Counter()},
+            )
+            d = span.duration
+            row["count"] += 1
+            row["total_s"] += d
+            row["max_s"] = max(row["max_s"], d)
+            if "status" in span.attrs:
+                row["status"][str(span.attrs["status"])] += 1
+            if "cache" in span.attrs:
+                row["cache"][span.attrs["cache"]] += 1
+            remaining = span.attrs.get("ratelimit_remaining")
+            if remaining is not None:
+                row["min_ratelimit_remaining"] = min(row.get("min_ratelimit_remaining", remaining), remaining)
+        return {kind: dict(rows) for kind, rows in out.items()}
+
+    def dump(self, path: Path | str) -> None:
+        """Writes the spans in Chrome trace-event format (chrome://tracing, Perfetto)."""
+        events = [
+            {
+                "name": span.name,
+                "cat": span.kind,
+                "ph": "X",
+                "ts": (span.start - self.origin) * 1e6,
+                "dur": span.duration * 1e6,
+                "pid": 1,
+                "tid": 1,
+                "args": {"id": span.id, "parent": span.parent, **span.attrs},
+            }
+            for span in self.spans
+        ]
+        Path(path).write_text(json.dumps({"traceEvents": events, "summary": self.summary()}, default=str), encoding="utf-8")
+
+
+_tracer: Optional[Tracer] = None
+
+
+def enable() -> Tracer:
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def disable() -> None:
+    global _tracer
+    _tracer = None
+
+
+def active() -> Optional[Tracer]:
+    return _tracer
+
+
+def span(name: str, kind: str = "agent", **attrs: Any) -> Any:
+    if _tracer is None:
+        return _NOOP
+    return _tracer.span(name, kind, **attrs)
+
+
+def http(method: str, url: str, **attrs: Any) -> Any:
+    """Span for one GitHub request, named by endpoint template."""
+    if _tracer is None:
+        return _NOOP
+    return _tracer.span(endpoint(method, url), "http", **attrs)
+
+
+def annotate(**attrs: Any) -> None:
+    """Adds attributes to the innermost open span, if any."""
+    if _tracer is None:
+        return
+    current = _current.get()
+    if current is not None:
+        current.attrs.update(attrs)
+
+
+def traced(name: str, kind: str = "agent") -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Wraps an async function in a span while tracing is enabled."""
+
+    def decorate(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            if _tracer is None:
+                return await fn(*args, **kwargs)
+            with _tracer.span(name, kind):
+                return await fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
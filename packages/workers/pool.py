@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import os
+import socket
+import asyncio
+import multiprocessing
+from multiprocessing.process import BaseProcess
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from packages.agents.coordinator import Coordinator
+from packages.github_client.client import DEFAULT_CONCURRENCY
+from packages.models.schemas import RepoCandidate
+from packages.workers.queue import RENEW_INTERVAL, DirQueue
+
+# Repos a worker analyzes at once; its client's semaphore still bounds requests
+DEFAULT_JOBS = 4
+POLL_INTERVAL = 0.2
+
+
+async def serve(
+    queue_dir: Path | str,
+    worker_id: Optional[str] = None,
+    jobs: int = DEFAULT_JOBS,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    archive: bool = False,
+    incremental: bool = True,
+) -> int:
+    """
+    Analyzes jobs from a queue directory until it is closed and drained.
+    Returns the number of jobs handled.
+
+    Each job is {"id", "candidate"}; its result is written back as
+    {"result": block} or {"error": repr}. The worker uses the default
+    on-disk cache and the queue's shared rate-limit budget.
+    """
+    queue = DirQueue(queue_dir)
+    coord = Coordinator(concurrency=concurrency, archive=archive, incremental=incremental)
+    coord.gh.scheduler.shared = queue.budget(coord.gh.scheduler.limits)
+    worker = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    running: Set[asyncio.Task] = set()
+    handled = 0
+    try:
+        while True:
+            while len(running) < jobs:
+                claimed = queue.claim(worker)
+                if claimed is None:
+                    break
+                running.add(asyncio.create_task(_job(coord, queue, *claimed)))
+            if not running:
+                if queue.closed and queue.idle():
+                    return handled
+                await asyncio.sleep(POLL_INTERVAL)
+                continue
+            finished, running = await asyncio.wait(running, timeout=POLL_INTERVAL, return_when=asyncio.FIRST_COMPLETED)
+            handled += len(finished)
+    finally:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        await coord.gh.aclose()
+
+
+async def _job(coord: Coordinator, queue: DirQueue, claimed: Path, job: Dict[str, Any]) -> None:
+    heartbeat = asyncio.create_task(_renew(queue, claimed))
+    try:
+        outcome = {"result": await coord.analyze(RepoCandidate.model_validate(job["candidate"]))}
+    except Exception as err:
+        # reported to the producer rather than killing the worker
+        outcome = {"error": repr(err)}
+    finally:
+        heartbeat.cancel()
+    queue.complete(claimed, job["id"], outcome)
+
+
+async def _renew(queue: DirQueue, claimed: Path) -> None:
+    # Keeps a long job from being requeued and run twice
+    while True:
+        await asyncio.sleep(RENEW_INTERVAL)
+        if not queue.renew(claimed):
+            return
+
+
+def _main(queue_dir: str, worker_id: str, options: Dict[str, Any]) -> None:
+    asyncio.run(serve(queue_dir, worker_id=worker_id, **options))
+
+
+def spawn(queue_dir: Path | str, n: int, options: Dict[str, Any]) -> List[BaseProcess]:
+    """Starts `n` local worker processes on a queue."""
+    # spawn, not fork: the parent has a running event loop and open sockets
+    ctx = multiprocessing.get_context("spawn")
+    procs = [
+        ctx.Process(target=_main, args=(str(queue_dir), f"{socket.gethostname()}-local{i}", options), daemon=True)
+        for i in range(n)
+    ]
+    for p in procs:
+        p.start()
+    return procs
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import os
+import json
+import time
+import uuid
+import itertools
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from packages.github_client.ratelimit import SharedBudget
+
+BUDGET_FILE = "budget.sqlite3"
+# Claimed jobs older than this are assumed lost (worker died) and requeued
+DEFAULT_LEASE = 600.0
+# Workers touch their claims this often, so long jobs keep their lease
+RENEW_INTERVAL = DEFAULT_LEASE / 3
+# Joins a job's file name and its worker in claimed/; job names never contain it
+CLAIM_SEP = "@"
+
+
+class DirQueue:
+    """
+    Work queue in a directory, usable by processes on one machine or on
+    several machines that mount the same directory.
+
+    Jobs move pending/ -> claimed/ -> done/ with os.rename, which is atomic,
+    so exactly one worker wins each job. A claim's mtime is its lease, which
+    the worker renews while the job runs. A `closed` marker tells workers no
+    more jobs are coming. The queue's rate-limit budget lives next to the
+    jobs, so everything working off one queue shares it.
+    """
+
+    def __init__(self, root: Path | str) -> None:
+        self.root = Path(root)
+        for sub in ("pending", "claimed", "done", "tmp"):
+            (self.root / sub).mkdir(parents=True, exist_ok=True)
+        self._seq = itertools.count()
+
+    def _write(self, folder: str, name: str, payload: Dict[str, Any]) -> None:
+        tmp = self.root / "tmp" / f"{name}.{uuid.uuid4().hex}"
+        tmp.write_text(json.dumps(payload), encoding="utf-8")
+        os.replace(tmp, self.root / folder / name)
+
+    def put(self, payload: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        # time + sequence prefix keeps claims roughly FIFO
+        name = f"{time.time():017.6f}-{next(self._seq):06d}-{job_id}.json"
+        self._write("pending", name, {"id": job_id, **payload})
+        return job_id
+
+    def budget(self, limits: Dict[str, Tuple[int, float]]) -> SharedBudget:
+        return SharedBudget(self.root / BUDGET_FILE, limits)
+
+    def close(self) -> None:
+        (self.root / "closed").touch()
+
+    @property
+    def closed(self) -> bool:
+        return (self.root / "closed").exists()
+
+    def claim(self, worker: str) -> Optional[Tuple[Path, Dict[str, Any]]]:
+        """Takes the oldest pending job, or returns None if there is none."""
+        for entry in sorted(os.listdir(self.root / "pending")):
+            claimed = self.root / "claimed" / f"{entry}{CLAIM_SEP}{worker}"
+            try:
+                os.rename(self.root / "pending" / entry, claimed)
+            except FileNotFoundError:
+                continue  # another worker got it first
+            # the rename keeps the old mtime; the lease starts now
+            os.utime(claimed)
+            return claimed, json.loads(claimed.read_text(encoding="utf-8"))
+        return None
+
+    def renew(self, claimed: Path) -> bool:
+        """Restarts a claim's lease; False if it was requeued meanwhile."""
+        try:
+            os.utime(claimed)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def complete(self, claimed: Path, job_id: str, result: Dict[str, Any]) -> None:
+        self._write("done", f"{job_id}.json", {"id": job_id, **result})
+        try:
+            claimed.unlink()
+        except FileNotFoundError:
+            pass
+
+    def results(self, job_ids: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Finished results among `job_ids`; each is removed once read."""
+        for job_id in list(job_ids):
+            path = self.root / "done" / f"{job_id}.json"
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                continue
+            path.unlink()
+            yield data
+
+    def requeue_stale(self, lease: float = DEFAULT_LEASE) -> int:
+        """Moves claims older than `lease` seconds back to pending."""
+        moved = 0
+        cutoff = time.time() - lease
+        for entry in os.listdir(self.root / "claimed"):
+            path = self.root / "claimed" / entry
+            try:
+                if path.stat().st_mtime > cutoff:
+                    continue
+                os.rename(path, self.root / "pending" / entry.split(CLAIM_SEP, 1)[0])
+                moved += 1
+            except FileNotFoundError:
+                continue
+        return moved
+
+    def idle(self) -> bool:
+        return not os.listdir(self.root / "pending")
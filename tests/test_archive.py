@@ -0,0 +1,68 @@
+import io
+import random
+import asyncio
+import tarfile
+
+import httpx
+import pytest
+
+from packages.github_client.archive import ArchiveTooLarge
+from packages.github_client.client import GitHubClient
+from packages.github_client.snapshot import RepoHead
+
+HEAD = RepoHead(default_branch="main", commit_sha="c0ffee", tree_sha="t1")
+CHUNK = 64 * 1024
+
+
+def _tarball(*extra) -> bytes:
+    buf = io.BytesIO()
+    members = [("o-r-c0ffee/README.md", b"# r\n"), ("o-r-c0ffee/package.json", b'{"dependencies": {}}'), *extra]
+    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+        for path, data in members:
+            info = tarfile.TarInfo(path)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+
+def _archive(body: bytes, chunks: int = 1, **kwargs):
+    sent = []
+
+    async def stream():
+        yield body
+        for _ in range(chunks - 1):
+            sent.append(CHUNK)
+            yield b"\0" * CHUNK
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=stream())
+
+    async def go():
+        gh = GitHubClient(transport=httpx.MockTransport(handler), use_cache=False)
+        try:
+            return await gh.get_archive("o/r", head=HEAD, **kwargs)
+        finally:
+            await gh.aclose()
+
+    return go, sent
+
+
+def test_archive_is_indexed_from_the_stream():
+    go, _ = _archive(_tarball())
+    archive = asyncio.run(go())
+    assert sorted(archive.files) == ["README.md", "package.json"]
+    assert archive.texts["README.md"] == "# r\n"
+
+
+def test_unreadable_archive_stops_the_download():
+    go, sent = _archive(b"not a tarball", chunks=2000)
+    with pytest.raises(tarfile.TarError):
+        asyncio.run(go())
+    # The reader gives up at once; the producer can't get more than its queue ahead
+    assert len(sent) < 100
+
+
+def test_oversized_archive_reports_its_size():
+    go, _ = _archive(_tarball(("o-r-c0ffee/big.bin", random.randbytes(40 * CHUNK))), max_archive_bytes=10 * CHUNK)
+    with pytest.raises(ArchiveTooLarge):
+        asyncio.run(go())
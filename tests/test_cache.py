@@ -0,0 +1,59 @@
+from packages.github_client.cache import Cache
+
+
+def _totals(cache: Cache) -> tuple[int, int]:
+    db = cache._db()
+    total = db.execute("SELECT value FROM meta WHERE name = 'total_bytes'").fetchone()[0]
+    actual = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+    return total, actual
+
+
+def test_overwrite_keeps_total_bytes_in_sync(tmp_path):
+    cache = Cache(tmp_path / "c.sqlite3", max_bytes=10_000, memory_items=0)
+    for i in range(50):
+        cache.set("k", {"n": i, "pad": "x" * 150})
+    total, actual = _totals(cache)
+    assert total == actual
+    assert cache.get("k")["n"] == 49
+
+
+def test_eviction_recovers_under_budget(tmp_path):
+    cache = Cache(tmp_path / "c.sqlite3", max_bytes=10_000, memory_items=0, compress_min_bytes=1 << 30)
+    for i in range(200):
+        cache.set(f"k{i % 20}", "x" * 900)
+    total, actual = _totals(cache)
+    assert total == actual <= 10_000
+    assert cache.get("k19") is not None
+
+
+def test_revalidation_leaves_cached_entries_alone(tmp_path, monkeypatch):
+    import asyncio
+
+    import httpx
+
+    from packages.github_client import cache
+    from packages.github_client.client import CACHE_TTLS, GitHubClient
+
+    monkeypatch.setattr(cache, "_default", Cache(tmp_path / "c.sqlite3"))
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"full_name": "o/r"}, headers={"ETag": '"v1"'})
+
+    async def go():
+        gh = GitHubClient(transport=httpx.MockTransport(handler), cache_ttls={k: 0 for k in CACHE_TTLS})
+        try:
+            await gh._read_through("/repos/o/r", None)
+            (key,) = list(cache._default._memory)
+            held = cache.get(key)
+            fetched_at = held["fetched_at"]
+            r = await gh._read_through("/repos/o/r", None)
+            return r, held, fetched_at, cache.get(key)
+        finally:
+            await gh.aclose()
+
+    r, held, fetched_at, fresh = asyncio.run(go())
+    assert r.headers["X-Scout-Cache"] == "revalidated"
+    assert held["fetched_at"] == fetched_at
+    assert fresh["fetched_at"] > fetched_at
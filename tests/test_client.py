@@ -0,0 +1,70 @@
+import json
+import asyncio
+
+import httpx
+
+from packages.github_client import client
+from packages.github_client.client import GRAPHQL_BATCH, SEARCH_PAGE_SIZE, GitHubClient
+
+
+def _node(stars: int) -> dict:
+    return {
+        "stargazerCount": stars,
+        "forkCount": 0,
+        "issues": {"totalCount": 1},
+        "pullRequests": {"totalCount": 0},
+        "pushedAt": None,
+        "description": None,
+        "repositoryTopics": {"nodes": []},
+        "licenseInfo": None,
+    }
+
+
+def test_failed_graphql_batch_falls_back_for_its_repos_only(monkeypatch):
+    monkeypatch.setattr(client, "TOKEN", "token")
+    names = [f"o/r{i}" for i in range(GRAPHQL_BATCH * 2)]
+    rest = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/graphql":
+            variables = json.loads(request.content)["variables"]
+            if "r0" in variables.values():
+                return httpx.Response(502, json={"message": "Bad gateway"})
+            return httpx.Response(200, json={"data": {f"r{i}": _node(1) for i in range(len(variables) // 2)}})
+        rest.append(request.url.path.removeprefix("/repos/"))
+        return httpx.Response(200, json={"stargazers_count": 2})
+
+    async def go():
+        gh = GitHubClient(transport=httpx.MockTransport(handler), use_cache=False)
+        gh.scheduler.max_retries = 0
+        try:
+            return await gh.get_repos(names)
+        finally:
+            await gh.aclose()
+
+    stats = asyncio.run(go())
+    assert sorted(rest) == sorted(names[:GRAPHQL_BATCH])
+    assert [stats[n].stars for n in names] == [2] * GRAPHQL_BATCH + [1] * GRAPHQL_BATCH
+
+
+def test_code_search_follows_pages_up_to_top_n():
+    pages = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params.get("page", "1"))
+        pages.append(page)
+        items = [{"path": f"p{page}-{i}"} for i in range(SEARCH_PAGE_SIZE)]
+        nxt = f'<https://api.github.com/search/code?q=x&per_page={SEARCH_PAGE_SIZE}&page={page + 1}>; rel="next"'
+        return httpx.Response(200, json={"items": items}, headers={"Link": nxt})
+
+    async def go():
+        gh = GitHubClient(transport=httpx.MockTransport(handler), use_cache=False)
+        try:
+            return await gh.search_code("x", top_n=SEARCH_PAGE_SIZE + 5)
+        finally:
+            await gh.aclose()
+
+    items = asyncio.run(go())
+    assert len(items) == SEARCH_PAGE_SIZE + 5
+    assert items[-1]["path"] == "p2-4"
+    assert pages == [1, 2]
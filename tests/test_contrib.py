@@ -0,0 +1,95 @@
+import random
+import asyncio
+
+import pytest
+
+from packages.agents.contrib import MAX_QUERY_CHARS, ContributionAgent, _labels, issue_query, pack_queries
+from packages.agents.coordinator import Coordinator
+
+
+def _issues(name: str, n: int) -> list:
+    return [
+        {
+            "title": f"issue {i}",
+            "html_url": f"https://github.com/{name}/issues/{i}",
+            "repository_url": f"https://api.github.com/repos/{name}",
+            "labels": [{"name": "good first issue"}],
+            "updated_at": "2026-10-01T00:00:00Z",
+        }
+        for i in range(n)
+    ]
+
+
+class FakeGitHub:
+    """Issue search over fixed per-repo issues; a query naming a repo in `bad` fails."""
+
+    def __init__(self, issues, bad=()):
+        self.issues, self.bad, self.queries = issues, set(bad), []
+
+    async def iter_search_pages(self, url, params, max_results=1000):
+        repos = [part[len("repo:"):] for part in params["q"].split() if part.startswith("repo:")]
+        self.queries.append(repos)
+        if self.bad & set(repos):
+            raise RuntimeError("422 Validation Failed")
+        for name in repos:
+            for item in self.issues.get(name, [])[:max_results]:
+                yield item
+
+    async def search_repositories(self, query, top_n):
+        return [
+            {"full_name": name, "name": name.split("/")[1], "owner": {"login": "o"}, "html_url": "u", "stargazers_count": 1}
+            for name in sorted(self.issues)[:top_n]
+        ]
+
+    async def get_repos(self, names):
+        from packages.models.schemas import RepoStats
+
+        return {name: RepoStats(stars=1) for name in names}
+
+    async def aclose(self):
+        pass
+
+
+def test_pack_queries_fits_and_keeps_order():
+    rng = random.Random(0)
+    labels = _labels()
+    for _ in range(200):
+        names = [f"owner{rng.randint(0, 10**6)}/repo-{'x' * rng.randint(1, 60)}" for _ in range(rng.randint(1, 40))]
+        groups = pack_queries(names, labels)
+        assert [n for g in groups for n in g] == names
+        assert all(len(g) == 1 or len(issue_query(g, labels)) <= MAX_QUERY_CHARS for g in groups)
+        # Greedy: the next group's first repo didn't fit in the one before
+        for prev, nxt in zip(groups, groups[1:]):
+            assert len(issue_query(prev + nxt[:1], labels)) > MAX_QUERY_CHARS
+
+
+def test_fetch_many_maps_hits_back_to_repos():
+    issues = {"o/a": _issues("o/a", 3), "o/b": _issues("o/b", 12), "o/c": []}
+    gh = FakeGitHub(issues)
+    out = asyncio.run(ContributionAgent(gh).fetch_many(["o/a", "o/b", "o/c"], top_n=10))
+    assert [len(results[0]) for results in out.values()] == [3, 10, 0]
+    assert gh.queries[0] == ["o/a", "o/b", "o/c"]
+
+
+def test_failed_shared_search_falls_back_per_repo():
+    issues = {"o/a": _issues("o/a", 2), "o/b": _issues("o/b", 1), "o/bad": []}
+    gh = FakeGitHub(issues, bad={"o/bad"})
+    agent = ContributionAgent(gh)
+
+    async def go():
+        agent.prefetch(["o/a", "o/bad", "o/b"])
+        a = await agent.fetch("o/a")
+        b = await agent.fetch("o/b")
+        with pytest.raises(RuntimeError):
+            await agent.fetch("o/bad")
+        return a, b
+
+    (a, _), (b, _) = asyncio.run(go())
+    assert len(a[0]) == 2 and len(b[0]) == 1
+
+
+def test_ranking_only_run_builds_just_the_finder():
+    coord = Coordinator(gh=FakeGitHub({"o/a": [], "o/b": []}), incremental=False)
+    result = asyncio.run(coord.arun(query="q", top_n=2, analyze_n=0))
+    assert len(result["top"]) == 2
+    assert coord.agents.loaded() == ("finder",)
@@ -0,0 +1,54 @@
+import asyncio
+
+from packages.agents.crawler import CorpusCrawler
+from packages.corpus.store import Corpus
+from packages.models.schemas import RepoStats
+
+
+def _item(i: int, updated_at: str = "2026-09-01T00:00:00Z") -> dict:
+    return {
+        "full_name": f"o/r{i}",
+        "name": f"r{i}",
+        "owner": {"login": "o"},
+        "html_url": f"https://github.com/o/r{i}",
+        "stargazers_count": 100 - i,
+        "pushed_at": "2026-09-01T00:00:00Z",
+        "updated_at": updated_at,
+        "language": "Python",
+    }
+
+
+class FakeGitHub:
+    """Search hits lag the repos: refreshed stats always report a later push."""
+
+    def __init__(self, items):
+        self.items, self.refreshed = items, []
+
+    async def iter_search_repositories(self, query, max_results):
+        for item in self.items[:max_results]:
+            yield item
+
+    async def get_repos(self, names):
+        self.refreshed += names
+        return {name: RepoStats(stars=1, pushed_at="2026-10-01T00:00:00Z") for name in names}
+
+
+def test_unchanged_hits_are_not_refetched(tmp_path):
+    corpus = Corpus(tmp_path / "corpus.sqlite3")
+    gh = FakeGitHub([_item(i) for i in range(5)])
+    crawler = CorpusCrawler(gh, corpus)
+
+    first = asyncio.run(crawler.crawl("q"))
+    assert (first.added, first.refreshed, first.unchanged) == (5, 0, 0)
+
+    gh.refreshed = []
+    second = asyncio.run(crawler.crawl("q"))
+    assert (second.added, second.refreshed, second.unchanged) == (0, 0, 5)
+    assert gh.refreshed == []
+
+    gh.items[2] = _item(2, updated_at="2026-09-15T00:00:00Z")
+    third = asyncio.run(crawler.crawl("q"))
+    assert (third.refreshed, third.unchanged) == (1, 4)
+    assert gh.refreshed == ["o/r2"]
+    # Ranking still uses the refreshed stats
+    assert corpus.search("language:python", top_n=1)[0].stats.pushed_at == "2026-10-01T00:00:00Z"
@@ -0,0 +1,73 @@
+import random
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from packages.agents.finder import RepoFinderAgent, _candidate, _ref_from_item
+from packages.github_client.client import repo_stats_from_json
+from packages.scoring.rank import STAR_GROWTH, rank_repos, score_bounds
+
+NOW = datetime.now(timezone.utc)
+
+
+def _item(rng: random.Random, i: int) -> dict:
+    pushed = NOW - timedelta(days=rng.choice([3, 45, 200, 900]))
+    return {
+        "full_name": f"o/r{i}",
+        "name": f"r{i}",
+        "owner": {"login": "o"},
+        "html_url": f"https://github.com/o/r{i}",
+        "stargazers_count": int(10 ** rng.uniform(0, 5)),
+        "open_issues_count": rng.choice([0, 40, 499, 500, 501, 2000]),
+        "pushed_at": pushed.isoformat(),
+        "description": rng.choice([None, "d"]),
+        "topics": rng.choice([[], ["cli"]]),
+        "license": rng.choice([None, {"name": "MIT"}]),
+    }
+
+
+def _refreshed(rng: random.Random, item: dict):
+    # What the repo looks like now: anything score_bounds allows for a lagging hit
+    stats = repo_stats_from_json(item)
+    stats.stars = rng.randint(stats.stars, (stats.stars + 1) * STAR_GROWTH - 1)
+    stats.open_issues = rng.randint(0, 1000)
+    if rng.random() < 0.5:
+        stats.pushed_at = (NOW - timedelta(days=rng.randint(0, 400))).isoformat()
+        if stats.pushed_at < item["pushed_at"]:
+            stats.pushed_at = item["pushed_at"]
+    return stats
+
+
+class FakeGitHub:
+    def __init__(self, items, live):
+        self.items, self.live, self.refreshed = items, live, 0
+
+    async def iter_search_repositories(self, query, max_results):
+        for item in self.items[:max_results]:
+            yield item
+
+    async def get_repos(self, names):
+        self.refreshed += len(names)
+        return {name: self.live[name] for name in names}
+
+
+def test_bounds_contain_refreshed_score():
+    rng = random.Random(0)
+    for i in range(2000):
+        item = _item(rng, i)
+        low, high = score_bounds(repo_stats_from_json(item), NOW)
+        score = _candidate(_ref_from_item(item), _refreshed(rng, item)).score
+        assert low <= score <= high
+
+
+def test_bound_ranking_matches_full_refresh():
+    rng = random.Random(1)
+    for _ in range(100):
+        items = sorted((_item(rng, i) for i in range(rng.randint(1, 300))), key=lambda it: -it["stargazers_count"])
+        live = {item["full_name"]: _refreshed(rng, item) for item in items}
+        top, scan = rng.randint(1, 30), rng.choice([50, 300])
+        gh = FakeGitHub(items, live)
+
+        got = asyncio.run(RepoFinderAgent(gh).find("q", top_n=top, scan=scan, rank="bound"))
+        full = rank_repos([_candidate(_ref_from_item(item), live[item["full_name"]]) for item in items[:scan]])[:top]
+        assert [(c.repo.full_name, c.score) for c in got] == [(c.repo.full_name, c.score) for c in full]
+        assert gh.refreshed <= min(scan, len(items))
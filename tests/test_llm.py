@@ -0,0 +1,94 @@
+import json
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from packages.github_client import cache
+from packages.github_client.cache import Cache
+from packages.llm.client import LLMClient
+
+
+def _completion(content: str) -> SimpleNamespace:
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class FakeOpenAI:
+    """The Batch API calls summarize_many makes, answering `records` once the job ends as `status`."""
+
+    def __init__(self, status: str, records: list):
+        self.status, self.records, self.chats = status, records, 0
+        self.files = SimpleNamespace(create=self._upload, content=self._content)
+        self.batches = SimpleNamespace(create=self._create, retrieve=self._retrieve)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat))
+
+    async def _upload(self, file, purpose):
+        self.uploaded = [json.loads(line)["custom_id"] for line in file[1].decode("utf-8").splitlines()]
+        return SimpleNamespace(id="in")
+
+    async def _create(self, **kwargs):
+        return SimpleNamespace(id="job", status="in_progress", output_file_id=None)
+
+    async def _retrieve(self, job_id):
+        return SimpleNamespace(id=job_id, status=self.status, output_file_id="out" if self.records else None)
+
+    async def _content(self, file_id):
+        return SimpleNamespace(text="\n".join(json.dumps(r) for r in self.records))
+
+    async def _chat(self, **kwargs):
+        self.chats += 1
+        return _completion("from chat")
+
+
+def _ok(custom_id: str, content: str) -> dict:
+    body = {"choices": [{"message": {"content": content}}]}
+    return {"custom_id": custom_id, "response": {"status_code": 200, "body": body}, "error": None}
+
+
+@pytest.fixture
+def llm(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "_default", Cache(tmp_path / "c.sqlite3"))
+    return LLMClient(use_cache=True)
+
+
+def _summarize(llm, monkeypatch, fake, readmes):
+    monkeypatch.setattr(LLMClient, "aclient", property(lambda self: fake))
+    return asyncio.run(llm.summarize_many(readmes, batch=True, poll_seconds=0))
+
+
+def test_batch_results_fill_the_summary_cache(llm, monkeypatch):
+    fake = FakeOpenAI("completed", [_ok("r0", "from batch")])
+    assert _summarize(llm, monkeypatch, fake, ["# a"]) == ["from batch"]
+    assert fake.chats == 0
+    # Cached now: a second call submits nothing
+    fake = FakeOpenAI("completed", [])
+    assert _summarize(llm, monkeypatch, fake, ["# a"]) == ["from batch"]
+    assert not hasattr(fake, "uploaded")
+
+
+def test_failed_requests_fall_back_to_chat(llm, monkeypatch):
+    failed = {"custom_id": "r1", "response": {"status_code": 500, "body": {"error": {"message": "boom"}}}, "error": None}
+    empty = _ok("r2", "  ")
+    fake = FakeOpenAI("completed", [_ok("r0", "from batch"), failed, empty])
+    out = _summarize(llm, monkeypatch, fake, ["# a", "# b", "# c", "# d", ""])
+    assert out == ["from batch", "from chat", "from chat", "from chat", "README not found or empty."]
+    assert fake.uploaded == ["r0", "r1", "r2", "r3"]
+    assert fake.chats == 3
+
+
+def test_expired_job_falls_back_to_chat(llm, monkeypatch):
+    fake = FakeOpenAI("expired", [])
+    assert _summarize(llm, monkeypatch, fake, ["# a", "# b"]) == ["from chat", "from chat"]
+    assert llm._cached_summary("# a") == "from chat"
+
+
+def test_async_client_is_per_event_loop(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    llm = LLMClient(use_cache=False)
+
+    async def get():
+        return llm.aclient, llm.aclient
+
+    (a1, a2), (b1, _) = asyncio.run(get()), asyncio.run(get())
+    assert a1 is a2
+    assert a1 is not b1
@@ -0,0 +1,51 @@
+import os
+import time
+import asyncio
+
+from packages.github_client.ratelimit import SharedBudget
+from packages.workers.queue import DEFAULT_LEASE, DirQueue
+
+
+def _age(path, seconds: float) -> None:
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+def test_stale_claim_is_requeued_under_its_own_name(tmp_path):
+    queue = DirQueue(tmp_path)
+    job_id = queue.put({"n": 1})
+    pending = os.listdir(tmp_path / "pending")
+    claimed, job = queue.claim("host.example.com-42")
+    assert job == {"id": job_id, "n": 1}
+
+    assert queue.requeue_stale() == 0
+    _age(claimed, DEFAULT_LEASE + 1)
+    assert queue.requeue_stale() == 1
+    assert os.listdir(tmp_path / "pending") == pending
+    assert queue.claim("other")[1]["id"] == job_id
+
+
+def test_renewed_claim_keeps_its_lease(tmp_path):
+    queue = DirQueue(tmp_path)
+    queue.put({})
+    claimed, job = queue.claim("w")
+    _age(claimed, DEFAULT_LEASE + 1)
+    assert queue.renew(claimed)
+    assert queue.requeue_stale() == 0
+
+    queue.complete(claimed, job["id"], {"result": 1})
+    assert not queue.renew(claimed)
+    assert list(queue.results([job["id"]])) == [{"id": job["id"], "result": 1}]
+    assert queue.idle() and not os.listdir(tmp_path / "claimed")
+
+
+def test_budget_close_waits_for_background_writes(tmp_path):
+    budget = SharedBudget(tmp_path / "b.sqlite3", {"core": (100, 60.0)})
+
+    async def go():
+        budget.block_soon("core", time.time() + 30)
+        await budget.aclose()
+
+    asyncio.run(go())
+    assert budget._conn is None
+    assert budget.try_take("core")[0] > 0
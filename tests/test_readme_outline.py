@@ -0,0 +1,83 @@
+import re
+import random
+from typing import Optional
+
+from packages.agents.readme_outline import ReadmeOutline
+
+INSTALL = ["Installation", "Install", "Setup"]
+USAGE = ["Usage", "Quickstart", "Getting Started", "Run"]
+
+
+# The per-call helpers ReadmeOutline replaced, kept as the reference
+def _old_section(md: str, names: list) -> Optional[str]:
+    pattern = r"(?im)^(#{1,6})\s*(" + "|".join(map(re.escape, names)) + r")\s*$"
+    m = re.search(pattern, md)
+    if not m:
+        return None
+    start = m.end()
+    m2 = re.search(r"(?im)^#{1,6}\s+.+$", md[start:])
+    end = start + (m2.start() if m2 else len(md[start:]))
+    section = md[start:end].strip()
+    return section if section else None
+
+
+def _old_first_paragraph(md: str) -> Optional[str]:
+    cleaned = []
+    for ln in (ln.strip() for ln in md.splitlines()):
+        if ln.startswith("![") or ln.startswith("[![") or ln.startswith("<img"):
+            continue
+        cleaned.append(ln)
+    text = "\n".join(cleaned).strip()
+    parts = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+    return parts[0] if parts else None
+
+
+LINES = [
+    "# Project", "## Install", "### Installation", "##Setup", "## USAGE", "# Usage  ", "#### Run",
+    "## Getting Started", "####### Usage", " # indented", "## Other", "#nospace", "pip install x",
+    "text", "more text", "", "", "  ", "![badge](b.svg)", "[![ci](c.svg)](u)", "<img src=x>",
+]
+
+
+def test_outline_matches_the_old_helpers_without_fences():
+    rng = random.Random(0)
+    for _ in range(3000):
+        md = "\n".join(rng.choice(LINES) for _ in range(rng.randint(0, 25)))
+        outline = ReadmeOutline.parse(md)
+        assert outline.section(INSTALL) == _old_section(md, INSTALL), md
+        assert outline.section(USAGE) == _old_section(md, USAGE), md
+        assert outline.first_paragraph == _old_first_paragraph(md), md
+
+
+def test_headings_in_fenced_code_are_ignored():
+    md = "\n".join([
+        "# Install",
+        "```bash",
+        "# Usage",
+        "pip install x",
+        "```",
+        "then:",
+        "~~~~",
+        "```",
+        "## Run",
+        "~~~~",
+        "# Usage ##",
+        "x --help",
+        "````",
+        "# Later",
+        "```",
+    ])
+    outline = ReadmeOutline.parse(md)
+    assert outline.section(INSTALL) == "```bash\n# Usage\npip install x\n```\nthen:\n~~~~\n```\n## Run\n~~~~"
+    # Closing hashes don't belong to the title; an unclosed fence runs to the end
+    assert outline.section(USAGE) == "x --help\n````\n# Later\n```"
+    assert outline.section(["Run", "Later"]) is None
+
+
+def test_outline_round_trips_through_to_dict():
+    md = "# Install\npip install x\n\n## Usage\nx run\n"
+    outline = ReadmeOutline.parse(md)
+    restored = ReadmeOutline.from_dict(md, outline.to_dict())
+    assert restored.spans == outline.spans
+    assert restored.section(USAGE) == "x run"
+    assert ReadmeOutline.from_dict(md, {**outline.to_dict(), "version": 0}) is None
@@ -0,0 +1,73 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from packages.models.schemas import RepoCandidate, RepoRef, RepoStats
+from packages.scoring.rank import BACKLOG_ISSUES, TopK, rank_repos, score_repo
+
+np = pytest.importorskip("numpy")
+from packages.scoring.batch import ScoreColumns, score_batch, top_k  # noqa: E402
+
+NOW = datetime(2026, 10, 1, 12, tzinfo=timezone.utc)
+
+
+def _pushed_at(rng: random.Random) -> str | None:
+    kind = rng.randrange(6)
+    if kind == 0:
+        return None
+    if kind == 1:
+        return rng.choice(["garbage", "2026-09-01T00:00:00"])  # malformed, naive
+    # around the 30/90/365-day edges, with Z and offset spellings
+    days = rng.choice([0, 29, 30, 31, 89, 90, 91, 364, 365, 366, 2000])
+    dt = NOW - timedelta(days=days, seconds=rng.choice([-1, 0, 1]))
+    return dt.isoformat().replace("+00:00", rng.choice(["Z", "+00:00"]))
+
+
+def _stats(rng: random.Random, n: int) -> list:
+    # Few distinct values, so many rows tie
+    return [
+        RepoStats(
+            stars=rng.choice([0, 1, 9, 99, 1000, rng.randrange(10**6)]),
+            pushed_at=_pushed_at(rng),
+            open_issues=rng.choice([0, BACKLOG_ISSUES, BACKLOG_ISSUES + 1]),
+            license=rng.choice([None, "MIT"]),
+            topics=rng.choice([[], ["x"]]),
+            description=rng.choice([None, "", "d"]),
+        )
+        for _ in range(n)
+    ]
+
+
+def _candidates(stats: list) -> list:
+    out = []
+    for i, s in enumerate(stats):
+        score, reasons = score_repo(s, NOW)
+        ref = RepoRef(owner="o", name=f"r{i}", full_name=f"o/r{i}", url="u")
+        out.append(RepoCandidate(repo=ref, stats=s, score=score, reasons=reasons))
+    return out
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_scores_match_score_repo(seed):
+    stats = _stats(random.Random(seed), 500)
+    scores = score_batch(ScoreColumns.from_stats(stats), NOW)
+    assert scores.tolist() == [score_repo(s, NOW)[0] for s in stats]
+
+
+@pytest.mark.parametrize("k", [0, 1, 7, 50, 499, 500, 600])
+def test_top_k_matches_rank_repos_with_ties(k):
+    stats = _stats(random.Random(k), 500)
+    expected = rank_repos(_candidates(stats))[:k]
+    got = top_k(ScoreColumns.from_stats(stats), k, NOW)
+    assert [f"o/r{r.index}" for r in got] == [c.repo.full_name for c in expected]
+    assert [(r.score, r.reasons) for r in got] == [(c.score, c.reasons) for c in expected]
+
+
+@pytest.mark.parametrize("k", [0, 1, 10, 500])
+def test_streaming_top_k_matches_rank_repos(k):
+    candidates = _candidates(_stats(random.Random(k), 300))
+    heap = TopK(k)
+    for c in candidates:
+        heap.push(c)
+    assert [c.repo.full_name for c in heap.results()] == [c.repo.full_name for c in rank_repos(candidates)[:k]]
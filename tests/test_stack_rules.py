@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from packages.agents.stack_rules import AUTOMATON_MIN_PATTERNS, RULES, Automaton, Rule, RulePack, Substrings
+
+
+def _words(rng: random.Random, n: int, longest: int = 6) -> list:
+    # A tiny alphabet, so patterns overlap and nest inside each other
+    return list(dict.fromkeys("".join(rng.choice("abc") for _ in range(rng.randint(1, longest))) for _ in range(n)))
+
+
+def _chunks(rng: random.Random, text: str) -> list:
+    cuts = sorted(rng.sample(range(len(text) + 1), min(len(text) + 1, 4)))
+    return [text[i:j] for i, j in zip([0, *cuts], [*cuts, len(text)])]
+
+
+@pytest.mark.parametrize("matcher", [Automaton, Substrings])
+def test_matchers_find_every_pattern_across_chunks(matcher):
+    rng = random.Random(0)
+    for _ in range(300):
+        patterns = _words(rng, rng.randint(1, 30))
+        text = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 80)))
+        m = matcher(patterns)
+        expected = {i for i, p in enumerate(patterns) if p in text}
+        assert m.scan(text)[1] == expected
+        # Resuming from the previous state catches matches spanning chunks
+        state, found = m.start, set()
+        for chunk in _chunks(rng, text):
+            state, new = m.scan(chunk, state)
+            found |= new
+        assert found == expected
+
+
+def _naive(rules: list, text: str) -> list:
+    # How detection worked before the pack: each rule checks its own patterns
+    low = text.lower()
+    return [r for r in rules if not r.patterns or any(p.lower() in low for p in r.patterns)]
+
+
+@pytest.mark.parametrize("extra", [0, AUTOMATON_MIN_PATTERNS])
+def test_rule_pack_matches_per_rule_checks(extra):
+    rng = random.Random(extra)
+    generated = [Rule("package.json", f"L{i}", "framework", tuple(_words(rng, 3, longest=8))) for i in range(extra)]
+    pack = RulePack(RULES + generated)
+    if extra:
+        assert isinstance(pack._matchers["package.json"], Automaton)
+    for _ in range(200):
+        text = "".join(rng.choice(["a", "b", "c", "A", "B", " ", '"react"', "Express", "\n"]) for _ in range(rng.randint(0, 120)))
+        for glob, rules in pack.globs.items():
+            assert pack.match(glob, text) == _naive(rules, text)
+
+
+def test_detector_stops_once_every_rule_has_matched():
+    pack = RulePack(RULES)
+    done = pack.detector("package.json")
+    text = '{"dependencies": {"react": "1", "next": "1"'
+    # Fed the growing text; false until the last rule's pattern is complete
+    assert not any(done(text[:i]) for i in range(len(text) + 1))
+    assert not done(text + ', "expr')
+    assert done(text + ', "express"')
+    # A different text starts over
+    assert not done('{"react"')